@@ -10,6 +10,7 @@ from flask_mail import Mail
 from .models import db
 from .config import config_by_name
 from .utils.redis_service import redis_service
+from .utils.decorators import reference_cache
 from .services.email_service import mail, get_email_service
 from .services.pokemon_service import PokemonDataService
 
@@ -39,35 +40,42 @@ def create_app(config_name='development'):
     from .api.admin import admin_bp
     from .api.pokemon import bp as pokemon_bp
     from .api.notification import notification_bp
+    from .api.search import search_bp
+    from .api.bundles import bundles_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(team_bp, url_prefix='/api/team')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
     app.register_blueprint(pokemon_bp)
     app.register_blueprint(notification_bp)
+    app.register_blueprint(search_bp, url_prefix='/api/search')
+    app.register_blueprint(bundles_bp, url_prefix='/api/bundles')
 
     # 新增：注册宝可梦相关开放API（批量特性/招式/道具等）
     @app.route('/api/abilities', methods=['GET'])
+    @reference_cache
     def get_abilities():
         limit = int(request.args.get('limit', 10000))
         offset = int(request.args.get('offset', 0))
-        generation_id = request.args.get('generation_id')
-        abilities = PokemonDataService.get_ability_list(limit=limit, offset=offset, generation_id=generation_id)
-        return jsonify(abilities)
+        generation_id = request.args.get('generation_id', type=int)
+        payload = PokemonDataService.get_ability_list_payload(limit=limit, offset=offset, generation_id=generation_id)
+        return app.response_class(payload, mimetype='application/json')
 
     @app.route('/api/moves', methods=['GET'])
+    @reference_cache
     def get_moves():
         limit = int(request.args.get('limit', 10000))
         offset = int(request.args.get('offset', 0))
-        generation_id = request.args.get('generation_id')
-        moves = PokemonDataService.get_move_list(limit=limit, offset=offset, generation_id=generation_id)
-        return jsonify(moves)
+        generation_id = request.args.get('generation_id', type=int)
+        payload = PokemonDataService.get_move_list_payload(limit=limit, offset=offset, generation_id=generation_id)
+        return app.response_class(payload, mimetype='application/json')
 
     @app.route('/api/items', methods=['GET'])
+    @reference_cache
     def get_items():
         limit = int(request.args.get('limit', 10000))
         offset = int(request.args.get('offset', 0))
-        generation_id = request.args.get('generation_id')
+        generation_id = request.args.get('generation_id', type=int)
         items = PokemonDataService.get_item_list(limit=limit, offset=offset, generation_id=generation_id)
         return jsonify(items)
 
@@ -7,6 +7,11 @@ from ..models import db, User, Team, SensitiveWord
 from ..services.sensitive_word_service import sensitive_word_filter
 from ..services.team_service import team_service
 from ..services.report_service import report_service
+from ..services.pokemon_service import PokemonDataService
+from ..utils.sync_metrics import sync_metrics, SyncMetrics
+from ..utils.http_client import outbound_blocked_count
+from ..utils.near_cache import near_cache
+from ..utils.redis_service import redis_service
 from datetime import datetime, timezone
 
 admin_bp = Blueprint('admin', __name__)
@@ -238,3 +243,23 @@ def get_report_history():
         return jsonify(reports_data), 200
     except Exception as e:
         return jsonify({"message": "获取举报历史失败", "error": str(e)}), 500
+
+@admin_bp.route('/sync/metrics', methods=['GET'])
+@admin_required
+def get_sync_metrics():
+    """获取数据同步指标：当前一轮的分阶段统计、队列深度及最近若干轮的汇总"""
+    limit = request.args.get('limit', 5, type=int)
+    # 同步可能在其他进程（如 sync_worker）中运行，本进程没有进行中的同步时读取其发布的快照
+    current = sync_metrics.snapshot() if sync_metrics.run_id else SyncMetrics.published()
+    try:
+        queues = PokemonDataService.get_sync_queue_progress()
+    except Exception as e:
+        queues = {'error': str(e)}
+    return jsonify({
+        'current': current,
+        'queues': queues,
+        'history': SyncMetrics.history(limit),
+        'outbound_blocked': outbound_blocked_count(),
+        'near_cache': near_cache.stats(),
+        'redis_breaker': redis_service.breaker.stats(),
+    }), 200
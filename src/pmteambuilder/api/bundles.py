@@ -0,0 +1,57 @@
+"""
+静态参考数据包API路由
+
+生产环境建议由 nginx / CDN 直接托管数据包目录（文件名带内容哈希，可永久缓存）；
+这里的文件路由用于开发环境或未配置静态服务器时，按 Accept-Encoding 返回预压缩文件。
+"""
+import hashlib
+import json
+import os
+
+from flask import Blueprint, current_app, jsonify, request, send_from_directory, abort
+from ..services.reference_bundles import BUNDLE_FILE_PATTERN, ENCODING_SUFFIXES, bundle_root, read_manifest_bytes
+
+bundles_bp = Blueprint('bundles', __name__)
+
+# 文件名带内容哈希，内容永不变化
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+@bundles_bp.route('/manifest', methods=['GET'])
+def manifest():
+    """
+    数据包清单：版本号与 "<世代>/<语言>" -> 文件名、大小、哈希；base_url 为下载前缀（可配置为 CDN 地址）。
+    ETag 取自 manifest 文件本身的内容而不是数据集版本号：版本号先于新 manifest 写入递增，
+    按版本号生成的 ETag 会让客户端把旧 manifest 当作新版本长期缓存。
+    """
+    raw = read_manifest_bytes()
+    if raw is None:
+        return jsonify({'error': '静态数据包尚未生成'}), 404
+    base_url = current_app.config.get('REFERENCE_BUNDLE_URL') or '/api/bundles/files/'
+    data = json.loads(raw)
+    data['base_url'] = base_url
+    response = jsonify(data)
+    response.set_etag(hashlib.sha256(raw + base_url.encode('utf-8')).hexdigest()[:20])
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get('REFERENCE_BUNDLE_MANIFEST_MAX_AGE', 60)
+    return response.make_conditional(request)
+
+
+@bundles_bp.route('/files/<filename>', methods=['GET'])
+def bundle_file(filename):
+    """返回数据包文件；客户端接受 br / gzip 时直接返回对应的预压缩文件"""
+    if not BUNDLE_FILE_PATTERN.match(filename) or not filename.endswith('.json'):
+        abort(404)
+    root = bundle_root()
+    served, encoding = filename, None
+    for candidate in ('br', 'gzip'):
+        if candidate in request.accept_encodings and os.path.exists(os.path.join(root, filename + ENCODING_SUFFIXES[candidate])):
+            served, encoding = filename + ENCODING_SUFFIXES[candidate], candidate
+            break
+    response = send_from_directory(root, served, mimetype='application/json', max_age=IMMUTABLE_MAX_AGE)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
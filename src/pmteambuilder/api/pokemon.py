@@ -1,5 +1,8 @@
 from flask import Blueprint, jsonify, request, current_app
 from ..services.pokemon_service import PokemonDataService
+from ..services.pokemon_index import STAT_COLUMNS
+from ..services.search_index import SEARCH_KINDS
+from ..utils.decorators import reference_cache
 from ..models import PokemonMoveLearnset, Move, VersionGroup, Ability, PokemonFormAbilityMap
 
 bp = Blueprint('pokemon', __name__, url_prefix='/api/pokemon')
@@ -8,6 +11,7 @@ bp = Blueprint('pokemon', __name__, url_prefix='/api/pokemon')
 pokemon_data_service_instance = PokemonDataService()
 
 @bp.route('/list')
+@reference_cache
 def pokemon_list():
     limit = request.args.get('limit', default=50, type=int)
     offset = request.args.get('offset', default=0, type=int)
@@ -15,6 +19,14 @@ def pokemon_list():
     search_query = request.args.get('search_query', default=None, type=str)
     types_str = request.args.get('types', default=None, type=str)
     types = types_str.split(',') if types_str else []
+    ability_id = request.args.get('ability_id', default=None, type=int)
+    # 种族值区间：min_<stat> / max_<stat>，stat 取 hp、attack、defense、special-attack、special-defense、speed、total
+    stat_ranges = {
+        stat: (request.args.get(f'min_{stat}', type=int), request.args.get(f'max_{stat}', type=int))
+        for stat in STAT_COLUMNS
+    }
+    sort_by = request.args.get('sort_by', default=None, type=str)
+    descending = request.args.get('order', default='desc', type=str).lower() != 'asc'
     
     # Use the instance to call the method
     data = pokemon_data_service_instance.get_pokemon_list(
@@ -22,18 +34,32 @@ def pokemon_list():
         offset=offset, 
         generation_id=generation_id, 
         search_query=search_query,
-        types=types
+        types=types,
+        ability_id=ability_id,
+        stat_ranges=stat_ranges,
+        sort_by=sort_by,
+        descending=descending
     )
     return jsonify(data)
 
+@bp.route('/search')
+def search_names():
+    query = request.args.get('q', default='', type=str)
+    kinds_str = request.args.get('kinds', default=None, type=str)
+    kinds = [k for k in kinds_str.split(',') if k in SEARCH_KINDS] if kinds_str else None
+    limit = min(request.args.get('limit', default=20, type=int), 100)
+    return jsonify(pokemon_data_service_instance.search_names(query, kinds, limit))
+
 @bp.route('/move/list')
+@reference_cache
 def move_list_endpoint():
     generation_id = request.args.get('generation_id', type=int)
     # Use the instance to call the method
-    data = pokemon_data_service_instance.get_move_list(limit=10000, generation_id=generation_id)
-    return jsonify(data)
+    payload = pokemon_data_service_instance.get_move_list_payload(limit=10000, generation_id=generation_id)
+    return current_app.response_class(payload, mimetype='application/json')
 
 @bp.route('/item/list')
+@reference_cache
 def item_list_endpoint():
     generation_id = request.args.get('generation_id', type=int)
     categories_str = request.args.get('categories')
@@ -43,31 +69,44 @@ def item_list_endpoint():
     return jsonify(data)
 
 @bp.route('/ability/list')
+@reference_cache
 def ability_list_endpoint():
     generation_id = request.args.get('generation_id', type=int)
     # Use the instance to call the method
-    data = pokemon_data_service_instance.get_ability_list(limit=10000, generation_id=generation_id)
-    return jsonify(data)
+    payload = pokemon_data_service_instance.get_ability_list_payload(limit=10000, generation_id=generation_id)
+    return current_app.response_class(payload, mimetype='application/json')
 
 @bp.route('/learnable-moves/<int:species_id>/<int:version_group_id>')
+@reference_cache
 def learnable_moves(species_id: int, version_group_id: int):
     # Use the instance to call the method
     data = pokemon_data_service_instance.get_pokemon_learnable_moves(species_id, version_group_id)
     return jsonify(data)
 
+@bp.route('/learnable-moves/batch/<int:version_group_id>')
+@reference_cache
+def learnable_moves_batch(version_group_id: int):
+    """一次获取多个物种的可学习招式：?species_ids=1,4,7，返回 {species_id: 招式列表}"""
+    species_ids = [int(s) for s in request.args.get('species_ids', '').split(',') if s.strip().isdigit()]
+    data = pokemon_data_service_instance.get_pokemon_learnable_moves_batch(species_ids[:50], version_group_id)
+    return jsonify({str(species_id): moves for species_id, moves in data.items()})
+
 @bp.route('/form-abilities/<int:pokemon_form_id>')
+@reference_cache
 def pokemon_form_abilities(pokemon_form_id: int):
     # Use the instance to call the method
     data = pokemon_data_service_instance.get_form_abilities_rich(pokemon_form_id)
     return jsonify(data)
 
 @bp.route('/generations-with-version-groups')
+@reference_cache
 def generations_with_version_groups_endpoint():
     # Use the instance to call the method
     data = pokemon_data_service_instance.get_generations_with_version_groups()
     return jsonify(data)
 
 @bp.route('/learnable-moves-by-generation/<int:species_id>/<int:generation_id>')
+@reference_cache
 def learnable_moves_by_generation(species_id: int, generation_id: int):
     """
     根据宝可梦物种ID和世代ID获取可学习的去重招式列表。
@@ -0,0 +1,18 @@
+"""
+名称搜索相关API路由
+"""
+from flask import Blueprint, request, jsonify
+from ..services.pokemon_service import PokemonDataService
+from ..services.search_index import SEARCH_KINDS
+
+search_bp = Blueprint('search', __name__)
+
+
+@search_bp.route('/suggest', methods=['GET'])
+def suggest():
+    """输入联想：q 为已输入的前缀，kinds 为逗号分隔的类别（species,pokemon,move,ability,item），limit 默认 10"""
+    prefix = request.args.get('q', default='', type=str)
+    kinds_str = request.args.get('kinds', default=None, type=str)
+    kinds = [k for k in kinds_str.split(',') if k in SEARCH_KINDS] if kinds_str else None
+    limit = max(1, min(request.args.get('limit', default=10, type=int), 50))
+    return jsonify(PokemonDataService.suggest_names(prefix, kinds, limit))
@@ -36,6 +36,13 @@ class Config:
     
     # Redis配置
     REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+    REDIS_SOCKET_TIMEOUT = float(os.environ.get('REDIS_SOCKET_TIMEOUT', 0.5))  # Redis 卡顿时快速失败，交给熔断器处理
+    REDIS_SOCKET_CONNECT_TIMEOUT = float(os.environ.get('REDIS_SOCKET_CONNECT_TIMEOUT', 0.5))
+    REDIS_BREAKER_ENABLED = os.environ.get('REDIS_BREAKER_ENABLED', 'True').lower() == 'true'
+    REDIS_BREAKER_FAILURE_RATE = 0.5  # 最近 20 次调用中失败（含慢调用）比例达到该值时熔断
+    REDIS_BREAKER_SLOW_CALL_SECONDS = 0.25  # 超过该耗时的调用计为失败
+    REDIS_BREAKER_OPEN_SECONDS = 5.0  # 熔断持续时间，之后放行一个探测调用
+    REDIS_BULK_SOCKET_TIMEOUT = float(os.environ.get('REDIS_BULK_SOCKET_TIMEOUT', 10.0))  # 数据同步（redis_service.bulk()）使用的 socket 超时，不经过熔断器
     
     # 敏感词配置
     SENSITIVE_WORDS_CACHE_KEY = 'sensitive_words'
@@ -43,11 +50,75 @@ class Config:
 
     # 拉取数据时是否显示进度
     SHOW_FETCH_PROGRESS = True
-    # 拉取数据时是否保存进度
+    # 拉取数据时是否保存进度（写入 sync_checkpoints 表，支持断点续拉与多进程协作）
     SAVE_FETCH_PROGRESS = True
+    # 同步检查点认领租约（秒），进程中断后租约过期的资源可被其他进程接手
+    SYNC_JOURNAL_LEASE_SECONDS = 1800
     # 是否每次启动都强制重新拉取
     FORCE_FETCH_ON_STARTUP = True
 
+    # 招式学习表同步时是否删除 PokeAPI 中已不存在的记录
+    LEARNSET_SYNC_PRUNE = False
+    # 参考数据同步时按内容指纹跳过未变化的行（指纹存于 sync_fingerprints 表）
+    SYNC_FINGERPRINT_ENABLED = True
+
+    # 参考数据进程内快照：同步完成后发布新版本，各进程按间隔检查并整体替换
+    REFERENCE_SNAPSHOT_ENABLED = os.environ.get('REFERENCE_SNAPSHOT_ENABLED', 'True').lower() == 'true'
+    REFERENCE_SNAPSHOT_CHECK_INTERVAL = 5  # 检查 Redis 中快照版本号的间隔（秒）
+
+    # 带数据集版本号的缓存：同步完成后版本号递增，旧键立即不可达并在后台清理
+    DATASET_VERSION_CHECK_INTERVAL = 1  # 进程内缓存版本号的时长（秒）
+    DATASET_CACHE_MAX_TTL = 7 * 24 * 3600  # 兜底 TTL（带 ±10% 抖动），防止查询组合类键无限增长；0 表示不设 TTL
+    DATASET_CACHE_LEASE_SECONDS = 10  # 跨进程填充租约时长（秒），持有者崩溃时自动释放
+    DATASET_CACHE_FILL_WAIT = 2.0  # 非计算者等待填充结果的最长时间（秒），超时后自行计算
+    DATASET_CACHE_EARLY_REFRESH_BETA = float(os.environ.get('DATASET_CACHE_EARLY_REFRESH_BETA', 0))  # XFetch 提前刷新系数，0 表示关闭
+    NEAR_CACHE_ENABLED = os.environ.get('NEAR_CACHE_ENABLED', 'true').lower() == 'true'  # Redis 前的进程内 LRU 缓存
+    NEAR_CACHE_MAX_BYTES = int(os.environ.get('NEAR_CACHE_MAX_BYTES', 64 * 1024 * 1024))  # 每个进程近端缓存的字节上限
+    NEAR_CACHE_MAX_AGE = 300  # 近端缓存条目最长存活时间（秒），丢失失效消息时的兜底
+    CACHE_CODEC = os.environ.get('CACHE_CODEC', 'msgpack')  # 缓存值序列化方式：msgpack / json
+    CACHE_COMPRESS_THRESHOLD = 1024  # 序列化后超过该字节数时 zlib 压缩；负数表示不压缩
+    CACHE_COMPRESS_LEVEL = 1  # zlib 压缩级别，低级别解压同样快且压缩耗时最少
+
+    # 严格离线服务：请求处理过程中只查询本地表，禁止访问 PokeAPI（网络访问只允许在同步 worker / 后台线程中进行）
+    # 默认关闭：开启后宝可梦详情、物种、招式详情接口返回由本地表组装的精简结构，需确认前端兼容后再开启
+    OFFLINE_SERVING = os.environ.get('OFFLINE_SERVING', 'False').lower() == 'true'
+    REFERENCE_CACHE_MAX_AGE = 300  # 参考数据接口的浏览器/代理缓存时长（秒），过期后带 If-None-Match 重新验证
+    REFERENCE_CACHE_STALE_WHILE_REVALIDATE = 86400  # 过期后仍可先用旧响应、后台重新验证的时长（秒）
+    REFERENCE_CACHE_ETAG_SALT = os.environ.get('REFERENCE_CACHE_ETAG_SALT', '')  # 响应格式变化时修改，使旧 ETag 全部失效
+    REFERENCE_BUNDLES_ENABLED = os.environ.get('REFERENCE_BUNDLES_ENABLED', 'True').lower() == 'true'  # 同步后生成静态数据包
+    REFERENCE_BUNDLE_DIR = os.environ.get('REFERENCE_BUNDLE_DIR')  # 数据包目录，默认 src/instance/reference_bundles
+    REFERENCE_BUNDLE_URL = os.environ.get('REFERENCE_BUNDLE_URL')  # 数据包下载前缀（如 CDN 地址），默认 /api/bundles/files/
+    REFERENCE_BUNDLE_RETENTION = 86400  # 不再被 manifest 引用的旧数据包保留时长（秒）
+    REFERENCE_BUNDLE_MANIFEST_MAX_AGE = 60  # manifest 的缓存时长（秒），ETag 取自 manifest 内容，过期后重新验证
+
+    # 分布式同步队列（学习表/形态特性按物种、形态拆分为任务，多个 worker 进程并行认领）
+    SYNC_WORK_QUEUE_ENABLED = os.environ.get('SYNC_WORK_QUEUE_ENABLED', 'False').lower() == 'true'
+    SYNC_QUEUE_VISIBILITY_TIMEOUT = 600  # 认领后超过该秒数未确认的任务重新入队
+    SYNC_QUEUE_MAX_ATTEMPTS = 3  # 超过最大尝试次数的任务进入死信列表
+    SYNC_QUEUE_RETRY_BACKOFF = 5.0  # 失败任务的首次重试延迟（秒），之后每次翻倍，不超过可见性超时
+    SYNC_QUEUE_POLL_INTERVAL = 1.0  # 队列为空但仍有任务处理中时的轮询间隔（秒）
+    # 同步指标 JSON 行日志路径，默认 <工作目录>/logs/sync_metrics.jsonl
+    SYNC_METRICS_LOG_FILE = os.environ.get('SYNC_METRICS_LOG_FILE')
+
+    # PokeAPI 拉取配置
+    POKEAPI_PROXY = os.environ.get('POKEAPI_PROXY', 'http://127.0.0.1:7890')  # 设为空字符串则直连
+    POKEAPI_VERIFY_SSL = os.environ.get('POKEAPI_VERIFY_SSL', 'False').lower() == 'true'
+    POKEAPI_FETCH_CONCURRENCY = int(os.environ.get('POKEAPI_FETCH_CONCURRENCY', 32))  # 同时进行的请求数
+    POKEAPI_FETCH_LIMIT_PER_HOST = int(os.environ.get('POKEAPI_FETCH_LIMIT_PER_HOST', 32))  # 单个主机的连接池大小
+    POKEAPI_FETCH_TIMEOUT = int(os.environ.get('POKEAPI_FETCH_TIMEOUT', 30))  # 单次请求超时（秒）
+    POKEAPI_CONNECT_TIMEOUT = int(os.environ.get('POKEAPI_CONNECT_TIMEOUT', 5))  # 建立连接超时（秒）
+    POKEAPI_MAX_RETRIES = int(os.environ.get('POKEAPI_MAX_RETRIES', 4))  # 429/5xx/连接错误时的最大重试次数
+    POKEAPI_BACKOFF_FACTOR = 0.5  # 指数退避基数（秒），第 n 次重试约等待 factor * 2^n
+    POKEAPI_BACKOFF_MAX = 30  # 单次退避上限（秒）
+    POKEAPI_RATE_LIMIT = float(os.environ.get('POKEAPI_RATE_LIMIT', 50))  # 所有进程合计每秒请求数上限，0 表示不限流
+    POKEAPI_RATE_BURST = int(os.environ.get('POKEAPI_RATE_BURST', 50))  # 允许的突发请求数
+
+    # PokeAPI 响应磁盘缓存：off / readwrite / replay（只读缓存，不联网）
+    POKEAPI_CACHE_MODE = os.environ.get('POKEAPI_CACHE_MODE', 'readwrite')
+    POKEAPI_CACHE_DIR = os.environ.get('POKEAPI_CACHE_DIR')  # 默认 src/instance/pokeapi_cache
+    POKEAPI_CACHE_TTL = int(os.environ.get('POKEAPI_CACHE_TTL', 0)) or None  # 单个资源的有效期（秒），为空则永久有效
+    POKEAPI_CACHE_LISTING_TTL = int(os.environ.get('POKEAPI_CACHE_LISTING_TTL', 86400)) or None  # 分页列表的有效期（秒）
+
 class DevelopmentConfig(Config):
     """开发环境配置"""
     DEBUG = True
@@ -0,0 +1,22 @@
+"""add generation to abilities
+
+Revision ID: 20261018_add_generation_to_abilities
+Revises: 20261018_add_sync_fingerprints
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_add_generation_to_abilities'
+down_revision = '20261018_add_sync_fingerprints'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('abilities', sa.Column('generation', sa.String(length=20), nullable=True))
+    op.create_index('ix_ability_generation', 'abilities', ['generation'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_ability_generation', table_name='abilities')
+    op.drop_column('abilities', 'generation')
@@ -0,0 +1,40 @@
+"""add sync_checkpoints table
+
+Revision ID: 20261018_add_sync_checkpoints
+Revises: 50dc159cca3d
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_add_sync_checkpoints'
+down_revision = '50dc159cca3d'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('sync_checkpoints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=50), nullable=False),
+    sa.Column('stage', sa.String(length=50), nullable=False),
+    sa.Column('resource_id', sa.String(length=100), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('worker', sa.String(length=100), nullable=True),
+    sa.Column('claim_token', sa.String(length=64), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('entity', 'stage', 'resource_id', name='uq_sync_checkpoint_resource')
+    )
+    with op.batch_alter_table('sync_checkpoints', schema=None) as batch_op:
+        batch_op.create_index('ix_sync_checkpoint_entity_stage_status', ['entity', 'stage', 'status'], unique=False)
+        batch_op.create_index('ix_sync_checkpoint_claim_token', ['claim_token'], unique=False)
+
+def downgrade():
+    with op.batch_alter_table('sync_checkpoints', schema=None) as batch_op:
+        batch_op.drop_index('ix_sync_checkpoint_claim_token')
+        batch_op.drop_index('ix_sync_checkpoint_entity_stage_status')
+    op.drop_table('sync_checkpoints')
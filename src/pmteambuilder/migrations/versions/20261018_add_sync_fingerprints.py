@@ -0,0 +1,26 @@
+"""add sync_fingerprints table
+
+Revision ID: 20261018_add_sync_fingerprints
+Revises: 20261018_add_sync_checkpoints
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_add_sync_fingerprints'
+down_revision = '20261018_add_sync_checkpoints'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('sync_fingerprints',
+    sa.Column('entity', sa.String(length=50), nullable=False),
+    sa.Column('resource_id', sa.String(length=100), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('entity', 'resource_id')
+    )
+
+def downgrade():
+    op.drop_table('sync_fingerprints')
@@ -24,3 +24,5 @@ from .pokemon_move_learnset import PokemonMoveLearnset
 from .pokemon_form_ability_map import PokemonFormAbilityMap
 from .team_like import TeamLike
 from .notification import Notification
+from .sync_checkpoint import SyncCheckpoint
+from .sync_fingerprint import SyncFingerprint
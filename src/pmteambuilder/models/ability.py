@@ -8,10 +8,11 @@ class Ability(db.Model):
     name_zh_hans = db.Column(db.String(100), nullable=True)
     description_en = db.Column(db.Text, nullable=True)
     description_zh_hans = db.Column(db.Text, nullable=True)
-    # 可扩展 generation_id 等字段
+    generation = db.Column(db.String(20), nullable=True)  # 初登场世代名称，如 "generation-iii"
 
     __table_args__ = (
         Index('ix_ability_name_zh_hans', 'name_zh_hans'),
+        Index('ix_ability_generation', 'generation'),
     )
 
     def __repr__(self):
@@ -0,0 +1,31 @@
+"""
+数据同步检查点模型定义
+"""
+from datetime import datetime, timezone
+from . import db
+from sqlalchemy import Index
+
+class SyncCheckpoint(db.Model):
+    """同步检查点：记录每个实体、每个阶段中各资源的处理状态，用于断点续拉和多进程协作"""
+    __tablename__ = 'sync_checkpoints'
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(50), nullable=False)  # ability、move、pokemon、learnset 等
+    stage = db.Column(db.String(50), nullable=False)  # sync 等阶段名
+    resource_id = db.Column(db.String(100), nullable=False)  # PokeAPI 资源ID；'*' 表示整个阶段
+    status = db.Column(db.String(20), nullable=False, default='running')  # running / done / failed
+    worker = db.Column(db.String(100), nullable=True)  # 认领该资源的进程标识
+    claim_token = db.Column(db.String(64), nullable=True)  # 单次认领的唯一标识
+    lease_expires_at = db.Column(db.DateTime, nullable=True)  # 认领租约到期时间，过期后可被其他进程接手
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        db.UniqueConstraint('entity', 'stage', 'resource_id', name='uq_sync_checkpoint_resource'),
+        Index('ix_sync_checkpoint_entity_stage_status', 'entity', 'stage', 'status'),
+        Index('ix_sync_checkpoint_claim_token', 'claim_token'),
+    )
+
+    def __repr__(self):
+        return f'<SyncCheckpoint {self.entity}/{self.stage}/{self.resource_id} {self.status}>'
@@ -0,0 +1,17 @@
+"""
+同步内容指纹模型定义
+"""
+from datetime import datetime, timezone
+from . import db
+
+class SyncFingerprint(db.Model):
+    """记录每个参考数据行最近一次写入时的内容哈希，内容未变化的行在同步时直接跳过"""
+    __tablename__ = 'sync_fingerprints'
+
+    entity = db.Column(db.String(50), primary_key=True)  # 表名，如 abilities、moves
+    resource_id = db.Column(db.String(100), primary_key=True)  # 行主键
+    content_hash = db.Column(db.String(64), nullable=False)  # 规范化后行内容的 sha256
+    updated_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<SyncFingerprint {self.entity}/{self.resource_id} {self.content_hash[:8]}>'
@@ -0,0 +1,146 @@
+"""
+宝可梦列式筛选索引
+
+基于参考数据快照，把所有形态按列存入 NumPy 数组：
+    - 属性编码（type_1 / type_2）
+    - 六项种族值与种族值总和
+    - 可用世代位掩码（第 n 世代对应第 n 位）
+    - 特性 ID 矩阵（按形态补齐，空位为 -1）
+    - 名称搜索文本（英文形态名、中文种族名、中文形态名）
+任意筛选条件组合（属性、种族值区间、特性、世代、名称）都转换为布尔掩码按位与，
+排序用 argsort 完成，查询时不访问数据库与 Redis。
+"""
+import numpy as np
+
+# 对外的种族值名称 -> 列下标，与列表接口 base_stats 的键保持一致
+STAT_COLUMNS = {
+    'hp': 0,
+    'attack': 1,
+    'defense': 2,
+    'special-attack': 3,
+    'special-defense': 4,
+    'speed': 5,
+    'total': 6,
+}
+
+_NO_TYPE = -1
+_NO_ABILITY = -1
+
+
+class PokemonColumnIndex:
+    """某一版本快照上的只读列式索引"""
+
+    def __init__(self, forms, ids, species_names, type_codes, type_1, type_2, stats, generation_mask, abilities, search_text):
+        self.forms = forms                      # 与各列行号一一对应的 PokemonRecord 元组（按 ID 升序）
+        self.ids = ids                          # 形态 ID 列
+        self.species_names = species_names      # 每行对应的物种中文名
+        self.type_codes = type_codes            # 属性英文名 -> 编码
+        self.type_1 = type_1
+        self.type_2 = type_2
+        self.stats = stats                      # (N, 7)：六项种族值 + 总和
+        self.generation_mask = generation_mask
+        self.abilities = abilities              # (N, K)
+        self.search_text = search_text
+
+    def __len__(self):
+        return len(self.forms)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """由参考数据快照构建；只收录能找到所属物种的形态"""
+        forms = tuple(form for form in snapshot.pokemon.values() if form.species_id in snapshot.species)
+        size = len(forms)
+
+        type_codes = {name: code for code, name in enumerate(sorted(snapshot.types_by_name))}
+
+        def type_code(name):
+            if not name:
+                return _NO_TYPE
+            return type_codes.setdefault(name, len(type_codes))
+
+        all_generations = 0
+        for generation_id in snapshot.generations:
+            all_generations |= 1 << generation_id
+
+        type_1 = np.empty(size, dtype=np.int16)
+        type_2 = np.empty(size, dtype=np.int16)
+        stats = np.zeros((size, 7), dtype=np.int32)
+        generation_mask = np.zeros(size, dtype=np.uint64)
+        width = max((len(v) for v in snapshot.form_abilities.values()), default=0) or 1
+        abilities = np.full((size, width), _NO_ABILITY, dtype=np.int32)
+        species_names = []
+        search_text = []
+
+        for row, form in enumerate(forms):
+            species = snapshot.species[form.species_id]
+            species_names.append(species.name_zh)
+            type_1[row] = type_code(form.type_1)
+            type_2[row] = type_code(form.type_2)
+            values = (form.base_hp, form.base_atk, form.base_def, form.base_spa, form.base_spd, form.base_spe)
+            stats[row, :6] = [v or 0 for v in values]
+
+            # 物种收录世代；尚未同步世代关系的物种视为全部世代可用，再排除形态初登场之前的世代
+            mask = snapshot.species_generations.get(form.species_id, all_generations)
+            if form.first_generation_id:
+                mask &= ~((1 << form.first_generation_id) - 1)
+            generation_mask[row] = mask
+
+            for col, entry in enumerate(snapshot.form_abilities.get(form.id, ())):
+                abilities[row, col] = entry.ability_id
+
+            search_text.append('\n'.join((form.name or '', species.name_zh or '', form.form_name_zh or '')).lower())
+
+        stats[:, 6] = stats[:, :6].sum(axis=1)
+        return cls(
+            forms, np.array([form.id for form in forms], dtype=np.int64), tuple(species_names), type_codes,
+            type_1, type_2, stats, generation_mask, abilities, np.array(search_text, dtype=str),
+        )
+
+    def query(self, search_query=None, types=None, generation_id=None, ability_id=None,
+              stat_ranges=None, sort_by=None, descending=True, form_ids=None):
+        """
+        返回满足全部条件的行号数组（已排序）。
+        form_ids: 只保留这些形态（如搜索索引按拼音匹配出的形态），为 None 时不限。
+        types: 1 个属性时匹配任一属性位；2 个属性时按无序组合精确匹配；超过 2 个时忽略。
+        stat_ranges: {stat_name: (min, max)}，端点为 None 表示不限。
+        sort_by: STAT_COLUMNS 中的名称；默认按形态 ID 升序。
+        """
+        mask = np.ones(len(self.forms), dtype=bool)
+
+        if form_ids is not None:
+            mask &= np.isin(self.ids, np.fromiter(form_ids, dtype=np.int64, count=len(form_ids)))
+
+        if search_query:
+            mask &= np.char.find(self.search_text, search_query.lower()) >= 0
+
+        type_filter = [t.lower() for t in types] if types and len(types) <= 2 else []
+        if type_filter:
+            codes = [self.type_codes.get(t) for t in type_filter]
+            if any(code is None for code in codes):
+                return np.empty(0, dtype=np.intp)
+            if len(codes) == 1:
+                mask &= (self.type_1 == codes[0]) | (self.type_2 == codes[0])
+            else:
+                first, second = codes
+                mask &= ((self.type_1 == first) & (self.type_2 == second)) | ((self.type_1 == second) & (self.type_2 == first))
+
+        if generation_id:
+            mask &= (self.generation_mask & np.uint64(1 << generation_id)) != 0
+
+        if ability_id:
+            mask &= (self.abilities == ability_id).any(axis=1)
+
+        for stat, (low, high) in (stat_ranges or {}).items():
+            column = self.stats[:, STAT_COLUMNS[stat]]
+            if low is not None:
+                mask &= column >= low
+            if high is not None:
+                mask &= column <= high
+
+        rows = np.flatnonzero(mask)
+        if sort_by:
+            column = self.stats[rows, STAT_COLUMNS[sort_by]]
+            # 稳定排序，种族值相同时保持形态 ID 升序
+            order = np.argsort(-column if descending else column, kind='stable')
+            rows = rows[order]
+        return rows
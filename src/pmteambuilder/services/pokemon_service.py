@@ -2,71 +2,76 @@
 """
 宝可梦数据服务模块，提供宝可梦数据相关功能
 """
+import asyncio
 import json
 import requests
 import threading
 import time
 import os
-import pickle
 import urllib3
 import hashlib
 import random
-from flask import current_app
+from flask import current_app, has_request_context
 from ..utils.redis_service import redis_service
+from ..utils.dataset_cache import dataset_cache
+from ..utils.async_fetcher import AsyncPokeAPIFetcher
+from ..utils.response_cache import ResponseCache
+from ..utils.http_client import get_http_client
 from ..models import db, Ability, Move, Item, PokemonSpecies, Type, Generation, VersionGroup, Pokemon, PokemonMoveLearnset, PokemonFormAbilityMap
-from sqlalchemy import or_ # 导入 or_
-
-# 关闭 InsecureRequestWarning，消除 requests verify=False 带来的警告
+from ..models.pokemon_species import generation_pokemon_species
+from ..utils.bulk_upsert import bulk_upsert
+from ..utils.fingerprint import fingerprint_upsert
+from ..utils.work_queue import RedisWorkQueue
+from ..utils.sync_metrics import sync_metrics
+from .sync_journal import SyncJournal
+from .reference_snapshot import reference_snapshot
+from .search_index import search_index
+from .pokemon_index import STAT_COLUMNS
+from sqlalchemy import func, or_, select # 导入 or_
+
+# 关闭 InsecureRequestWarning，消除 verify=False 带来的警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-# 代理配置（如有需要请修改为你的代理地址）
-PROXIES = {
-    "http": "http://127.0.0.1:7890",
-    "https": "http://127.0.0.1:7890"
-}
-REQUESTS_KWARGS = {"proxies": PROXIES, "verify": False}
 
 class PokemonDataService:
     """宝可梦数据服务类"""
     POKEAPI_BASE_URL = "https://pokeapi.co/api/v2"
-    DEFAULT_FETCH_PROGRESS_FILENAME = "fetch_progress.pkl"
-
-    @staticmethod
-    def _get_progress_file_path():
-        # 优先从应用配置中获取，若无则使用 instance_path
-        # 这使得在 manual_sync.py 中设置的路径可以被服务感知
-        configured_path = current_app.config.get('FETCH_PROGRESS_PATH_OVERRIDE')
-        if configured_path:
-            return configured_path
-        # 默认使用 Flask app 的 instance_path，这是推荐的做法
-        # 需要确保 app.instance_path 在您的项目中被正确设置或可访问
-        # 通常，instance_path 指向与 manage.py 或 wsgi.py 文件所在级别的一个 'instance' 文件夹
-        # 如果您的项目结构是 d:/VSCDocument/pmteambuilder/src/instance/
-        # 且您的 app 的根目录是 d:/VSCDocument/pmteambuilder/
-        # 那么 app.instance_path 应该指向 d:/VSCDocument/pmteambuilder/instance/ (如果您的 src 是一个包，且 __init__.py 中创建 app 时正确设置了 instance_path)
-        # 假设您的 dev.db 在 src/instance/，那么进度文件也应该在 src/instance/
-        # 最可靠的是确保 create_app 时 instance_path 设置正确，或者在 config 中明确指定
-        
-        # 修正路径，以确保它指向 src/instance/ 目录下的文件
-        # Flask 的 instance_path 通常指向项目根目录下的 'instance' 文件夹。
-        # 如果你的项目结构是 d:/VSCDocument/pmteambuilder/ (根)
-        #   - src/
-        #     - pmteambuilder/
-        #     - instance/ (你的目标)
-        # 那么 instance_path 应该被配置为 os.path.join(current_app.root_path, '..', 'instance')
-        # 或者，如果 current_app.root_path 指向 src/pmteambuilder/，则应为 os.path.join(current_app.root_path, '..', 'instance')
-        # 假设您希望它在 src/instance/
-        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "instance")) # 从 services.py 退两级到 src/ 再到 instance/
-        if not os.path.exists(base_dir):
-            os.makedirs(base_dir, exist_ok=True)
-        return os.path.join(base_dir, PokemonDataService.DEFAULT_FETCH_PROGRESS_FILENAME)
-
-    @staticmethod
-    def get_pokemon_list(limit=1000, offset=0, generation_id=None, search_query=None, types: list[str] | None = None):
-        """获取宝可梦列表，从本地数据库查询，支持世代筛选、搜索和本地化。
+
+    @staticmethod
+    def _get_json(url):
+        """同步拉取 PokeAPI JSON，优先读取磁盘响应缓存，过期时带条件请求头重新验证"""
+        def do_get(headers):
+            # 重试、限流与 HTTP 指标由共享客户端记录
+            response = get_http_client().get(url, headers=headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response.status_code, response.content, response.headers
+
+        return ResponseCache.from_config().cached_fetch(url, do_get)
+
+    @staticmethod
+    def get_pokemon_list(limit=1000, offset=0, generation_id=None, search_query=None, types: list[str] | None = None,
+                         ability_id=None, stat_ranges: dict | None = None, sort_by=None, descending=True):
+        """获取宝可梦列表，支持世代、名称、属性、特性、种族值区间筛选与按种族值排序。
            返回的数据应包含前端 SelectionPanel 所需的全部字段。
+           stat_ranges: {stat_name: (min, max)}，stat_name 与 sort_by 取 STAT_COLUMNS 中的名称。
         """
         actual_limit = min(limit, 2000)
+        stat_ranges = {k: v for k, v in (stat_ranges or {}).items() if k in STAT_COLUMNS and v != (None, None)}
+        if sort_by not in STAT_COLUMNS:
+            sort_by = None
+
+        snapshot = reference_snapshot.current()
+        if snapshot is not None:
+            # 快照可用时由列式索引完成全部筛选与排序，不访问数据库与 Redis；名称（含拼音、首字母）由搜索索引匹配
+            form_ids = None
+            names = search_index.current()
+            if search_query and names is not None:
+                form_ids, search_query = names.match_pokemon_forms(search_query, snapshot), None
+            rows = snapshot.column_index.query(
+                search_query, types, generation_id, ability_id, stat_ranges, sort_by, descending, form_ids=form_ids
+            )
+            return PokemonDataService._pokemon_list_from_index(snapshot, rows, actual_limit, offset)
 
         cache_key_parts = ["pokemon_list_local_db", str(actual_limit), str(offset)]
         if generation_id:
@@ -77,16 +82,26 @@ class PokemonDataService:
             # Sort types to ensure consistent cache key regardless of input order
             sorted_types = sorted([t.lower() for t in types])
             cache_key_parts.append(f"types:{','.join(sorted_types)}")
+        if ability_id:
+            cache_key_parts.append(f"ability:{ability_id}")
+        for stat, (low, high) in sorted(stat_ranges.items()):
+            cache_key_parts.append(f"{stat}:{'' if low is None else low}-{'' if high is None else high}")
+        if sort_by:
+            cache_key_parts.append(f"sort:{sort_by}:{'desc' if descending else 'asc'}")
         cache_key = ":".join(cache_key_parts)
 
-        cached_data = redis_service.get(cache_key)
-        if cached_data:
-            current_app.logger.debug(f"Cache hit for {cache_key}")
-            return json.loads(cached_data.decode('utf-8'))
-        current_app.logger.debug(f"Cache miss for {cache_key}, querying DB.")
+        # 热门组合（如首页 50:0）缓存失效时只由一个请求查询数据库，其余请求等待结果
+        return dataset_cache.get_or_fill(cache_key, lambda: PokemonDataService._pokemon_list_from_db(
+            actual_limit, offset, generation_id, search_query, types, ability_id, stat_ranges, sort_by, descending
+        ))
 
+    @staticmethod
+    def _pokemon_list_from_db(actual_limit, offset, generation_id=None, search_query=None, types=None,
+                              ability_id=None, stat_ranges=None, sort_by=None, descending=True):
+        """在数据库上完成宝可梦列表的筛选、排序与分页（快照未启用时使用）"""
+        current_app.logger.debug("Pokemon list cache miss, querying DB.")
         # 获取属性英文名到中文名的映射
-        type_zh_map = {t.name: t.name_zh_hans for t in Type.query.all()}
+        type_zh_map = PokemonDataService._type_zh_map()
 
         query = db.session.query(
             Pokemon.id,
@@ -107,14 +122,31 @@ class PokemonDataService:
         ).join(PokemonSpecies, Pokemon.species_id == PokemonSpecies.id)
 
         if generation_id:
-            # 此处原有基于 PokemonSpecies.generation_id 的筛选逻辑已被移除
-            # 因为 PokemonSpecies 模型没有直接的 generation_id 属性。
-            # 如果将来需要基于物种的世代进行筛选，需要通过其 'generations' 关系来实现，例如：
-            # from ..models import Generation
-            # query = query.join(PokemonSpecies.generations).filter(Generation.id == generation_id)
-            # 注意：上述示例可能会改变查询的结构或引入重复行，需要仔细测试。
-            # 当前根据用户需求，不实现此筛选。
-            pass # 保留 if 块用于未来可能的扩展
+            # 物种被该世代收录（尚未同步世代关系的物种视为全部世代可用），且形态在该世代或之前已登场
+            gps = generation_pokemon_species
+            query = query.filter(
+                or_(
+                    select(gps.c.pokemon_species_id).where(
+                        gps.c.pokemon_species_id == Pokemon.species_id, gps.c.generation_id == generation_id
+                    ).exists(),
+                    ~select(gps.c.pokemon_species_id).where(gps.c.pokemon_species_id == Pokemon.species_id).exists()
+                ),
+                or_(Pokemon.first_generation_id.is_(None), Pokemon.first_generation_id <= generation_id)
+            )
+
+        if ability_id:
+            query = query.filter(
+                select(PokemonFormAbilityMap.id).where(
+                    PokemonFormAbilityMap.pokemon_form_id == Pokemon.id, PokemonFormAbilityMap.ability_id == ability_id
+                ).exists()
+            )
+
+        stat_columns = PokemonDataService._pokemon_stat_columns()
+        for stat, (low, high) in stat_ranges.items():
+            if low is not None:
+                query = query.filter(stat_columns[stat] >= low)
+            if high is not None:
+                query = query.filter(stat_columns[stat] <= high)
 
         if search_query: # <--- 应用搜索过滤器
             search_term = f"%{search_query.lower()}%"
@@ -148,54 +180,126 @@ class PokemonDataService:
         # --- 结束属性过滤器 ---
         
         # 排序确保分页一致性
-        query = query.order_by(Pokemon.id) # 或者 PokemonSpecies.id, Pokemon.id
+        if sort_by:
+            column = stat_columns[sort_by]
+            query = query.order_by(column.desc() if descending else column.asc(), Pokemon.id)
+        else:
+            query = query.order_by(Pokemon.id) # 或者 PokemonSpecies.id, Pokemon.id
 
         total_count = query.count() # 获取应用筛选后的总数，用于前端分页判断
         
         pokemon_forms = query.limit(actual_limit).offset(offset).all()
         
-        results = []
-        for form in pokemon_forms:
-            # 将 form_name_zh (形态中文名) 与 species_name_zh (物种中文名) 组合，以提供更完整的显示名称
-            # 例如 "皮卡丘 (就决定是你了的样子)"
-            display_name_zh = form.species_name_zh
-            if form.form_name_zh and form.form_name_zh != form.species_name_zh : # 避免重复，如 "米立龙 (上弓姿势)" vs "米立龙"
-                 # 有些非默认形态的 name 可能直接是 "Pikachu-Original-Cap"，而 name_zh 可能是 "皮卡丘"
-                 # 后端pokeapi的pokemon-species的name是物种名 "pikachu"，pokemon-form的name是 "pikachu-alola"
-                 # 我们的Pokemon.name存储的是pokemon-form的name，PokemonSpecies.name_zh_hans是物种中文名
-                 # 我们需要确保展示的英文名是 形态的英文名，中文名是 物种中文名 + (形态中文名)
-                display_name_zh = f"{form.species_name_zh} ({form.form_name_zh})"
-
-            results.append({
-                "id": form.id, # Pokemon Form ID
-                "species_id": form.species_id,
-                "name": form.name, # 英文形态名
-                "name_zh": display_name_zh, # 组合后的中文显示名
-                # "species_name_zh": form.species_name_zh, # 单独的物种中文名，如果需要
-                # "form_name_zh": form.form_name_zh, # 单独的形态中文名，如果需要
-                "sprite": form.sprite,
-                "types": [type_zh_map.get(t, t) for t in [form.type_1, form.type_2] if t], # 将属性英文名转换为中文名
-                "base_stats": {
-                    "hp": form.base_hp,
-                    "attack": form.base_atk, # PokeAPI 用 attack, defense...
-                    "defense": form.base_def,
-                    "special-attack": form.base_spa,
-                    "special-defense": form.base_spd,
-                    "speed": form.base_spe
-                },
-                # 模拟 abilities 字段，实际应该从 PokemonFormAbilityMap 查询
-                # 注意：这个abilities字段在宝可梦列表里通常只是展示可能的特性名，不是当前选定的特性
-                "abilities": PokemonDataService.get_form_abilities_rich(form.id) # 获取包含is_hidden等详细信息的特性列表
-            })
+        # 整页形态的特性一次批量获取（一次 MGET + 至多一次 SQL），避免逐行查询
+        abilities_by_form = PokemonDataService.get_form_abilities_rich_batch([form.id for form in pokemon_forms])
+        results = [
+            PokemonDataService._format_pokemon_list_entry(
+                form, form.species_name_zh, type_zh_map, abilities_by_form.get(form.id, [])
+            )
+            for form in pokemon_forms
+        ]
         
         response_data = {
             "count": total_count, # 返回总数
             "results": results
         }
-
-        redis_service.set(cache_key, json.dumps(response_data), expire=3600) # 缓存1小时
         return response_data
 
+    @staticmethod
+    def _format_pokemon_list_entry(form, species_name_zh, type_zh_map, abilities):
+        """组装宝可梦列表中的单条记录；form 可以是数据库行或快照记录（需有 form_name_zh 等同名字段）"""
+        # 将 form_name_zh (形态中文名) 与 species_name_zh (物种中文名) 组合，以提供更完整的显示名称
+        # 例如 "皮卡丘 (就决定是你了的样子)"
+        display_name_zh = species_name_zh
+        if form.form_name_zh and form.form_name_zh != species_name_zh : # 避免重复，如 "米立龙 (上弓姿势)" vs "米立龙"
+             # 有些非默认形态的 name 可能直接是 "Pikachu-Original-Cap"，而 name_zh 可能是 "皮卡丘"
+             # 后端pokeapi的pokemon-species的name是物种名 "pikachu"，pokemon-form的name是 "pikachu-alola"
+             # 我们的Pokemon.name存储的是pokemon-form的name，PokemonSpecies.name_zh_hans是物种中文名
+             # 我们需要确保展示的英文名是 形态的英文名，中文名是 物种中文名 + (形态中文名)
+            display_name_zh = f"{species_name_zh} ({form.form_name_zh})"
+
+        return {
+            "id": form.id, # Pokemon Form ID
+            "species_id": form.species_id,
+            "name": form.name, # 英文形态名
+            "name_zh": display_name_zh, # 组合后的中文显示名
+            "sprite": form.sprite,
+            "types": [type_zh_map.get(t, t) for t in [form.type_1, form.type_2] if t], # 将属性英文名转换为中文名
+            "base_stats": {
+                "hp": form.base_hp,
+                "attack": form.base_atk, # PokeAPI 用 attack, defense...
+                "defense": form.base_def,
+                "special-attack": form.base_spa,
+                "special-defense": form.base_spd,
+                "speed": form.base_spe
+            },
+            # 注意：这个abilities字段在宝可梦列表里通常只是展示可能的特性名，不是当前选定的特性
+            "abilities": abilities # 包含is_hidden等详细信息的特性列表
+        }
+
+    @staticmethod
+    def _pokemon_stat_columns():
+        """种族值名称 -> 数据库列（与列式索引的 STAT_COLUMNS 对应）"""
+        return {
+            'hp': Pokemon.base_hp,
+            'attack': Pokemon.base_atk,
+            'defense': Pokemon.base_def,
+            'special-attack': Pokemon.base_spa,
+            'special-defense': Pokemon.base_spd,
+            'speed': Pokemon.base_spe,
+            'total': (
+                func.coalesce(Pokemon.base_hp, 0) + func.coalesce(Pokemon.base_atk, 0) + func.coalesce(Pokemon.base_def, 0)
+                + func.coalesce(Pokemon.base_spa, 0) + func.coalesce(Pokemon.base_spd, 0) + func.coalesce(Pokemon.base_spe, 0)
+            ),
+        }
+
+    @staticmethod
+    def _pokemon_list_from_index(snapshot, rows, limit, offset):
+        """按列式索引返回的行号分页并组装列表记录"""
+        index = snapshot.column_index
+        type_zh_map = PokemonDataService._type_zh_map()
+        results = [
+            PokemonDataService._format_pokemon_list_entry(
+                index.forms[row], index.species_names[row], type_zh_map,
+                PokemonDataService._form_abilities_from_snapshot(snapshot, index.forms[row].id)
+            )
+            for row in rows[offset:offset + limit].tolist()
+        ]
+        return {"count": int(len(rows)), "results": results}
+
+    @staticmethod
+    def _form_abilities_from_snapshot(snapshot, pokemon_form_id):
+        results = []
+        for entry in snapshot.form_abilities.get(pokemon_form_id, ()):
+            ability = snapshot.abilities.get(entry.ability_id)
+            if ability is None:
+                continue
+            results.append({
+                'id': ability.id,
+                'name_en': ability.name,
+                'name_zh': ability.name_zh,
+                'description_en': ability.description_en,
+                'description_zh_hans': ability.description_zh,
+                'is_hidden': entry.is_hidden
+            })
+        return results
+
+    @staticmethod
+    def _move_entry(move):
+        """招式列表条目（与学习表接口的返回格式一致）"""
+        return {
+            'id': move.id,
+            'name': move.name, # 英文名
+            'name_zh': move.name_zh,
+            'type': move.type,
+            'category': move.category,
+            'power': move.power,
+            'accuracy': move.accuracy,
+            'pp': move.pp,
+            # 清理描述字段的换行符，与前端处理一致
+            'desc': (move.description_zh or '').replace('\n', ''),
+        }
+
     @staticmethod
     def get_form_ability_names(pokemon_form_id: int) -> list[str]:
         """辅助方法：获取指定宝可梦形态的特性名称列表（中文名优先）。"""
@@ -203,11 +307,15 @@ class PokemonDataService:
         # 它需要高效查询，避免N+1问题
         # 假设 PokemonFormAbilityMap 和 Ability 表已经存在且同步了数据
         
+        snapshot = reference_snapshot.current()
+        if snapshot is not None:
+            return [ab['name_zh'] or ab['name_en'] for ab in PokemonDataService._form_abilities_from_snapshot(snapshot, pokemon_form_id)]
+
         # 尝试从缓存获取，以避免重复查询，缓存键应包含 pokemon_form_id
         cache_key = f"form_ability_names:{pokemon_form_id}"
-        cached_names = redis_service.get(cache_key)
-        if cached_names:
-            return json.loads(cached_names.decode('utf-8'))
+        cached_names = dataset_cache.get(cache_key)
+        if cached_names is not None:
+            return cached_names
 
         ability_maps = db.session.query(
             Ability.name_zh_hans,
@@ -220,18 +328,22 @@ class PokemonDataService:
         
         names = [row.name_zh_hans if row.name_zh_hans else row.name for row in ability_maps]
         
-        # 将结果缓存一小段时间，例如5分钟，因为这个列表相对稳定
-        redis_service.set(cache_key, json.dumps(names), expire=300)
+        # 缓存结果（随数据集版本失效）
+        dataset_cache.set(cache_key, names)
         return names
 
     @staticmethod
     def get_form_abilities_rich(pokemon_form_id: int) -> list[dict]:
         """辅助方法：获取指定宝可梦形态的详细特性信息列表（中文名、是否隐藏等）。"""
+        snapshot = reference_snapshot.current()
+        if snapshot is not None:
+            return PokemonDataService._form_abilities_from_snapshot(snapshot, pokemon_form_id)
+
         # 尝试从缓存获取
         cache_key = f"form_abilities_rich:{pokemon_form_id}"
-        cached_data = redis_service.get(cache_key)
-        if cached_data:
-            return json.loads(cached_data.decode('utf-8'))
+        cached_data = dataset_cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
 
         abilities_data = db.session.query(
             Ability.id,
@@ -258,171 +370,395 @@ class PokemonDataService:
             })
 
         # 将结果缓存
-        redis_service.set(cache_key, json.dumps(results), expire=300) # 缓存5分钟
+        dataset_cache.set(cache_key, results)
+        return results
+
+    @staticmethod
+    def get_form_abilities_rich_batch(pokemon_form_ids: list[int]) -> dict[int, list[dict]]:
+        """批量获取多个形态的详细特性列表：先一次 MGET 读取缓存，未命中的形态用一条 SQL 查询后回写缓存。"""
+        if not pokemon_form_ids:
+            return {}
+        snapshot = reference_snapshot.current()
+        if snapshot is not None:
+            return {form_id: PokemonDataService._form_abilities_from_snapshot(snapshot, form_id) for form_id in pokemon_form_ids}
+
+        form_ids = list(dict.fromkeys(pokemon_form_ids))
+        results = {}
+        cached_values = dataset_cache.get_many([f"form_abilities_rich:{form_id}" for form_id in form_ids])
+        missing = []
+        for form_id, cached in zip(form_ids, cached_values):
+            if cached is not None:
+                results[form_id] = cached
+            else:
+                missing.append(form_id)
+        if not missing:
+            return results
+
+        fetched = {form_id: [] for form_id in missing}
+        for i in range(0, len(missing), 500):
+            rows = db.session.query(
+                PokemonFormAbilityMap.pokemon_form_id,
+                Ability.id,
+                Ability.name,
+                Ability.name_zh_hans,
+                Ability.description_en,
+                Ability.description_zh_hans,
+                PokemonFormAbilityMap.is_hidden
+            ).join(
+                PokemonFormAbilityMap, PokemonFormAbilityMap.ability_id == Ability.id
+            ).filter(
+                PokemonFormAbilityMap.pokemon_form_id.in_(missing[i:i + 500])
+            ).order_by(PokemonFormAbilityMap.id).all()
+            for ab in rows:
+                fetched[ab.pokemon_form_id].append({
+                    'id': ab.id,
+                    'name_en': ab.name,
+                    'name_zh': ab.name_zh_hans,
+                    'description_en': ab.description_en,
+                    'description_zh_hans': ab.description_zh_hans,
+                    'is_hidden': ab.is_hidden
+                })
+        dataset_cache.set_many({f"form_abilities_rich:{form_id}": abilities for form_id, abilities in fetched.items()})
+        results.update(fetched)
         return results
 
+    _type_zh_map_cache = None
+    _type_zh_map_version = None
+
+    @staticmethod
+    def _type_zh_map() -> dict:
+        """属性英文名 -> 中文名映射；快照可用时直接读取，否则进程内缓存到数据集版本变化，避免每次列表查询都查 Type 表"""
+        snapshot = reference_snapshot.current()
+        if snapshot is not None:
+            return {t.name: t.name_zh for t in snapshot.types.values()}
+        version = dataset_cache.version()
+        if PokemonDataService._type_zh_map_cache is None or PokemonDataService._type_zh_map_version != version:
+            PokemonDataService._type_zh_map_cache = {name: name_zh for name, name_zh in db.session.query(Type.name, Type.name_zh_hans)}
+            PokemonDataService._type_zh_map_version = version
+        return PokemonDataService._type_zh_map_cache
+
+    @staticmethod
+    def search_names(query, kinds=None, limit=20):
+        """按中文名、拼音全拼、拼音首字母或英文名搜索物种、形态、招式、特性、道具，结果按匹配程度排序"""
+        index = search_index.current()
+        if index is None:
+            current_app.logger.warning("[SearchIndex] 参考数据快照未启用，名称搜索不可用")
+            return []
+        return index.search(query, kinds, limit)
+
+    @staticmethod
+    def suggest_names(prefix, kinds=None, limit=10):
+        """输入联想：跨物种、形态、招式、特性、道具返回前 limit 条匹配，支持拼音与英文拼写容错"""
+        index = search_index.current()
+        if index is not None:
+            return index.suggest(prefix, kinds, limit)
+        return PokemonDataService._suggest_names_from_db(prefix, kinds, limit)
+
+    @staticmethod
+    def _suggest_names_from_db(prefix, kinds=None, limit=10):
+        """快照未启用时的回退：在本地各表上按中文名/英文名前缀查询（不支持拼音与容错）"""
+        term = (prefix or '').strip()
+        if not term:
+            return []
+        models = {'species': PokemonSpecies, 'move': Move, 'ability': Ability, 'item': Item}
+        results = []
+        for kind, model in models.items():
+            if kinds and kind not in kinds:
+                continue
+            rows = db.session.query(model.id, model.name, model.name_zh_hans).filter(
+                or_(model.name.ilike(f"{term}%"), model.name_zh_hans.ilike(f"{term}%"))
+            ).order_by(func.length(model.name)).limit(limit).all()
+            results.extend({'kind': kind, 'id': r.id, 'name': r.name, 'name_zh': r.name_zh_hans} for r in rows)
+        return results[:limit]
+
+    @staticmethod
+    def _serve_offline():
+        """是否只从本地表解析：处于请求处理中且开启了严格离线服务模式（同步 worker/后台线程不受影响）"""
+        return has_request_context() and current_app.config.get('OFFLINE_SERVING', False)
+
+    @staticmethod
+    def _local_form_row(pokemon_id):
+        """按形态 ID 读取本地宝可梦记录（快照记录或数据库行），不存在时返回 None"""
+        snapshot = reference_snapshot.current()
+        if snapshot is not None:
+            return snapshot.pokemon.get(pokemon_id)
+        return db.session.get(Pokemon, pokemon_id)
+
+    @staticmethod
+    def _local_move_names(species_id):
+        """物种在本地学习表中的全部招式英文名（按名称排序）"""
+        rows = db.session.query(Move.name).join(
+            PokemonMoveLearnset, PokemonMoveLearnset.move_id == Move.id
+        ).filter(PokemonMoveLearnset.pokemon_species_id == species_id).distinct().order_by(Move.name).all()
+        return [name for name, in rows]
+
+    @staticmethod
+    def _local_pokemon_details(pokemon_id):
+        """由本地表组装与 PokeAPI /pokemon 接口结构相近的详情（只含本地存储的字段）"""
+        form = PokemonDataService._local_form_row(pokemon_id)
+        if form is None:
+            return None
+        abilities = PokemonDataService.get_form_abilities_rich(pokemon_id)
+        stats = [('hp', form.base_hp), ('attack', form.base_atk), ('defense', form.base_def),
+                 ('special-attack', form.base_spa), ('special-defense', form.base_spd), ('speed', form.base_spe)]
+        return {
+            'id': form.id,
+            'name': form.name,
+            'species': {'id': form.species_id},
+            'is_default': form.is_default,
+            'sprites': {'front_default': form.sprite},
+            'types': [{'slot': slot, 'type': {'name': t}} for slot, t in enumerate([form.type_1, form.type_2], 1) if t],
+            'stats': [{'base_stat': value, 'stat': {'name': name}} for name, value in stats],
+            'abilities': [
+                {'ability': {'name': ab['name_en']}, 'is_hidden': ab['is_hidden'], 'slot': slot}
+                for slot, ab in enumerate(abilities, 1)
+            ],
+            'moves': [{'move': {'name': name}} for name in PokemonDataService._local_move_names(form.species_id)],
+        }
+
     @staticmethod
     def get_pokemon_details(pokemon_id):
-        """获取宝可梦详情，先检查缓存"""
+        """获取宝可梦详情，先检查缓存；离线服务模式下只读本地表"""
+        if PokemonDataService._serve_offline():
+            return PokemonDataService._local_pokemon_details(pokemon_id)
         cache_key = f"pokemon_details:{pokemon_id}"
-        cached_data = redis_service.get(cache_key)
-        if cached_data:
-            return json.loads(cached_data.decode('utf-8'))
+        cached_data = dataset_cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
 
         url = f"{PokemonDataService.POKEAPI_BASE_URL}/pokemon/{pokemon_id}"
-        response = requests.get(url, **REQUESTS_KWARGS)
-        response.raise_for_status()
-        data = response.json()
-        redis_service.set(cache_key, json.dumps(data), expire=3600)
+        data = PokemonDataService._get_json(url)
+        dataset_cache.set(cache_key, data)
         return data
 
     @staticmethod
-    def get_pokemon_abilities(pokemon_id):
-        """获取宝可梦特性列表，先检查缓存"""
+    def get_pokemon_abilities(pokemon_id, version_group_id=None):
+        """获取宝可梦特性英文名列表，先检查缓存；离线服务模式下只读本地特性映射表。
+           version_group_id 仅为兼容调用方保留，本地特性映射不区分版本组。
+        """
+        if PokemonDataService._serve_offline():
+            return [ab['name_en'] for ab in PokemonDataService.get_form_abilities_rich(pokemon_id)]
         cache_key = f"pokemon_abilities:{pokemon_id}"
-        cached_data = redis_service.get(cache_key)
-        if cached_data:
-            return json.loads(cached_data.decode('utf-8'))
+        cached_data = dataset_cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
 
         pokemon_details = PokemonDataService.get_pokemon_details(pokemon_id)
         abilities = [ability['ability']['name'] for ability in pokemon_details['abilities']]
-        redis_service.set(cache_key, json.dumps(abilities), expire=3600)
+        dataset_cache.set(cache_key, abilities)
         return abilities
 
     @staticmethod
     def get_pokemon_moves(pokemon_id):
-        """获取宝可梦招式列表，先检查缓存"""
+        """获取宝可梦招式列表，先检查缓存；离线服务模式下只读本地学习表"""
+        if PokemonDataService._serve_offline():
+            form = PokemonDataService._local_form_row(pokemon_id)
+            return PokemonDataService._local_move_names(form.species_id) if form is not None else []
         cache_key = f"pokemon_moves:{pokemon_id}"
-        cached_data = redis_service.get(cache_key)
-        if cached_data:
-            return json.loads(cached_data.decode('utf-8'))
+        cached_data = dataset_cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
 
         pokemon_details = PokemonDataService.get_pokemon_details(pokemon_id)
         moves = [move['move']['name'] for move in pokemon_details['moves']]
-        redis_service.set(cache_key, json.dumps(moves), expire=3600)
+        dataset_cache.set(cache_key, moves)
         return moves
 
     @staticmethod
     def get_pokemon_species(pokemon_id):
-        """获取宝可梦物种信息，包括中文名称"""
+        """获取宝可梦物种信息，包括中文名称；离线服务模式下只读本地物种表（仅含本地存储的字段）"""
+        if PokemonDataService._serve_offline():
+            species = db.session.get(PokemonSpecies, pokemon_id)
+            if species is None:
+                return None
+            return {'id': species.id, 'name': species.name, 'name_zh': species.name_zh_hans or species.name, 'gender_rate': species.gender_rate}
         cache_key = f"pokemon_species:{pokemon_id}"
-        cached_data = redis_service.get(cache_key)
-        if cached_data:
-            return json.loads(cached_data.decode('utf-8'))
+        cached_data = dataset_cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
 
         url = f"{PokemonDataService.POKEAPI_BASE_URL}/pokemon-species/{pokemon_id}"
-        response = requests.get(url, **REQUESTS_KWARGS)
-        response.raise_for_status()
-        data = response.json()
+        data = PokemonDataService._get_json(url)
         # 获取中文名称
         name_zh = next((name['name'] for name in data['names'] if name['language']['name'] == 'zh-Hans'), data['name'])
         data['name_zh'] = name_zh
-        redis_service.set(cache_key, json.dumps(data), expire=3600)
+        dataset_cache.set(cache_key, data)
         return data
 
     @staticmethod
     def get_move_details(move_name):
-        """获取招式详细信息，包括中文名称"""
+        """获取招式详细信息，包括中文名称；离线服务模式下只读本地招式表（仅含本地存储的字段）"""
+        if PokemonDataService._serve_offline():
+            move = Move.query.filter_by(name=move_name).first()
+            if move is None:
+                return None
+            return {
+                'id': move.id,
+                'name': move.name,
+                'name_zh': move.name_zh_hans or move.name,
+                'type': {'name': move.type},
+                'damage_class': {'name': move.category},
+                'power': move.power,
+                'accuracy': move.accuracy,
+                'pp': move.pp,
+                'generation': {'name': move.generation},
+                'description_en': move.description_en,
+                'description_zh_hans': move.description_zh_hans,
+            }
         cache_key = f"move_details:{move_name}"
-        cached_data = redis_service.get(cache_key)
-        if cached_data:
-            return json.loads(cached_data.decode('utf-8'))
+        cached_data = dataset_cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
         url = f"{PokemonDataService.POKEAPI_BASE_URL}/move/{move_name}"
-        response = requests.get(url, **REQUESTS_KWARGS)
-        response.raise_for_status()
-        data = response.json()
+        data = PokemonDataService._get_json(url)
         name_zh = next((n['name'] for n in data['names'] if n['language']['name'] == 'zh-Hans'), data['name'])
         data['name_zh'] = name_zh
-        redis_service.set(cache_key, json.dumps(data), expire=3600)
+        dataset_cache.set(cache_key, data)
         return data
 
+    @staticmethod
+    def _generation_ids_by_name(snapshot=None):
+        """世代名称 -> 世代ID，如 "generation-iii" -> 3"""
+        if snapshot is not None:
+            return {gen.name: gen.id for gen in snapshot.generations.values()}
+        return {name: gen_id for name, gen_id in db.session.query(Generation.name, Generation.id)}
+
+    @staticmethod
+    def _available_in_generation(generation_name, generation_id, generation_ids):
+        """是否在 generation_id 世代可用：初登场世代不晚于该世代；未记录初登场世代的视为可用"""
+        if not generation_id or not generation_name:
+            return True
+        introduced = generation_ids.get(generation_name)
+        return introduced is None or introduced <= generation_id
+
+    @staticmethod
+    def _build_ability_list(generation_id=None):
+        """从本地特性表组装特性列表（按ID排序）"""
+        snapshot = reference_snapshot.current()
+        if snapshot is not None:
+            abilities = sorted(snapshot.abilities.values(), key=lambda a: a.id)
+        else:
+            abilities = db.session.query(
+                Ability.id, Ability.name, Ability.name_zh_hans.label('name_zh'), Ability.description_en,
+                Ability.description_zh_hans.label('description_zh'), Ability.generation
+            ).order_by(Ability.id).all()
+        generation_ids = PokemonDataService._generation_ids_by_name(snapshot)
+        return [{
+            'id': ab.id,
+            'name': ab.name,
+            'name_zh': ab.name_zh or ab.name,
+            'effect_zh': ab.description_zh or ab.description_en or '',
+        } for ab in abilities if PokemonDataService._available_in_generation(ab.generation, generation_id, generation_ids)]
+
+    @staticmethod
+    def _build_move_list(generation_id=None):
+        """从本地招式表组装招式列表（按ID排序）"""
+        snapshot = reference_snapshot.current()
+        if snapshot is not None:
+            moves = sorted(snapshot.moves.values(), key=lambda m: m.id)
+        else:
+            moves = db.session.query(
+                Move.id, Move.name, Move.name_zh_hans.label('name_zh'), Move.type, Move.category, Move.power, Move.accuracy,
+                Move.pp, Move.description_en, Move.description_zh_hans.label('description_zh'), Move.generation
+            ).order_by(Move.id).all()
+        generation_ids = PokemonDataService._generation_ids_by_name(snapshot)
+        return [{
+            'id': mv.id,
+            'name': mv.name,
+            'name_zh': mv.name_zh or mv.name,
+            'type': mv.type,
+            'category': mv.category,
+            'power': mv.power,
+            'accuracy': mv.accuracy,
+            'pp': mv.pp,
+            'desc': mv.description_zh or mv.description_en or '',
+        } for mv in moves if PokemonDataService._available_in_generation(mv.generation, generation_id, generation_ids)]
+
+    @staticmethod
+    def _reference_list(name, build, generation_id=None):
+        """
+        按世代预先组装并序列化整张列表，返回 (列表, JSON 字符串)。
+        快照可用时缓存在快照内；否则以 JSON 缓存在 Redis 中。两者都随数据集版本失效。
+        """
+        generation_key = generation_id or 'all'
+        snapshot = reference_snapshot.current()
+        if snapshot is not None:
+            rows = snapshot.memo((name, generation_key), lambda: build(generation_id))
+            payload = snapshot.memo((name, generation_key, 'json'), lambda: json.dumps(rows, ensure_ascii=False))
+            return rows, payload
+        rows = dataset_cache.get_or_fill(f"{name}_local:{generation_key}", lambda: build(generation_id), cache_if=bool)
+        return rows, json.dumps(rows, ensure_ascii=False)
+
+    @staticmethod
+    def _reference_list_payload(name, build, limit, offset, generation_id=None):
+        """列表接口的响应体：请求整张列表时直接返回预先序列化的 JSON，分页时再切片序列化"""
+        rows, payload = PokemonDataService._reference_list(name, build, generation_id)
+        offset = max(offset or 0, 0)
+        if offset == 0 and limit >= len(rows):
+            return payload
+        return json.dumps(rows[offset:offset + limit], ensure_ascii=False)
+
     @staticmethod
     def get_ability_list(limit=10000, offset=0, generation_id=None):
-        """批量获取特性列表，支持本地化与分代筛选，结果缓存"""
-        cache_key = f"ability_list_full:{limit}:{offset}:{generation_id}"
-        cached_data = redis_service.get(cache_key)
-        if cached_data:
-            return json.loads(cached_data.decode('utf-8'))
-
-        url = f"{PokemonDataService.POKEAPI_BASE_URL}/ability?limit={limit}&offset={offset}"
-        response = requests.get(url, **REQUESTS_KWARGS)
-        response.raise_for_status()
-        data = response.json()
-        results = []
-        for entry in data.get('results', []):
-            ab_url = entry['url']
-            ab_detail = requests.get(ab_url, **REQUESTS_KWARGS).json()
-            # 本地化名
-            name_zh = next((n['name'] for n in ab_detail.get('names', []) if n['language']['name'] == 'zh-Hans'), ab_detail['name'])
-            # 本地化描述
-            effect_zh = None
-            for eff in ab_detail.get('effect_entries', []):
-                if eff['language']['name'] == 'zh-Hans':
-                    effect_zh = eff['effect']
-                    break
-            if not effect_zh:
-                effect_zh = next((eff['effect'] for eff in ab_detail.get('effect_entries', []) if eff['language']['name'] == 'en'), '')
-            # 分代筛选（如有 generation 字段，可扩展）
-            if generation_id:
-                # PokeAPI ability 没有直接 generation 字段，通常所有特性都返回，前端可再做筛选
-                pass
-            results.append({
-                'id': ab_detail['id'],
-                'name': ab_detail['name'],
-                'name_zh': name_zh,
-                'effect_zh': effect_zh,
-            })
-        redis_service.set(cache_key, json.dumps(results), expire=3600)
-        return results
+        """特性列表，从本地特性表读取；generation_id 时只返回该世代及之前登场的特性"""
+        rows, _ = PokemonDataService._reference_list('ability_list', PokemonDataService._build_ability_list, generation_id)
+        return rows[offset:offset + limit]
+
+    @staticmethod
+    def get_ability_list_payload(limit=10000, offset=0, generation_id=None) -> str:
+        """特性列表的 JSON 响应体"""
+        return PokemonDataService._reference_list_payload(
+            'ability_list', PokemonDataService._build_ability_list, limit, offset, generation_id
+        )
 
     @staticmethod
     def get_move_list(limit=10000, offset=0, generation_id=None):
-        """批量获取招式列表，支持本地化与分代筛选，结果缓存"""
-        cache_key = f"move_list_full:{limit}:{offset}:{generation_id}"
-        cached_data = redis_service.get(cache_key)
-        if cached_data:
-            return json.loads(cached_data.decode('utf-8'))
-
-        url = f"{PokemonDataService.POKEAPI_BASE_URL}/move?limit={limit}&offset={offset}"
-        response = requests.get(url, **REQUESTS_KWARGS)
-        response.raise_for_status()
-        data = response.json()
+        """招式列表，从本地招式表读取；generation_id 时只返回该世代及之前登场的招式"""
+        rows, _ = PokemonDataService._reference_list('move_list', PokemonDataService._build_move_list, generation_id)
+        return rows[offset:offset + limit]
+
+    @staticmethod
+    def get_move_list_payload(limit=10000, offset=0, generation_id=None) -> str:
+        """招式列表的 JSON 响应体"""
+        return PokemonDataService._reference_list_payload(
+            'move_list', PokemonDataService._build_move_list, limit, offset, generation_id
+        )
+
+    DEFAULT_ITEM_CATEGORIES = ['held-items', 'bad-held-items', 'choice', 'mega-stones', 'z-crystals', 'plates', 'picky-healing', 'species-specific', 'medicine']
+
+    @staticmethod
+    def _item_list_from_snapshot(snapshot, limit, offset, generation_id=None, categories=None):
+        """在参考数据快照上筛选道具列表；generation_id 时与特性、招式列表相同，只返回该世代及之前登场的道具"""
+        if categories is not None and isinstance(categories, list) and len(categories) > 0:
+            allowed_categories = set(categories)
+        else:
+            allowed_categories = set(PokemonDataService.DEFAULT_ITEM_CATEGORIES)
+        generation_ids = PokemonDataService._generation_ids_by_name(snapshot)
+        _available = PokemonDataService._available_in_generation
         results = []
-        for entry in data.get('results', []):
-            move_url = entry['url']
-            move_detail = requests.get(move_url, **REQUESTS_KWARGS).json()
-            # 本地化名
-            name_zh = next((n['name'] for n in move_detail.get('names', []) if n['language']['name'] == 'zh-Hans'), move_detail['name'])
-            # 本地化描述
-            desc_zh = None
-            for eff in move_detail.get('flavor_text_entries', []):
-                if eff['language']['name'] == 'zh-Hans':
-                    desc_zh = eff['flavor_text']
-                    break
-            if not desc_zh:
-                desc_zh = next((eff['flavor_text'] for eff in move_detail.get('flavor_text_entries', []) if eff['language']['name'] == 'en'), '')
-            # 分代筛选
-            if generation_id:
-                gen = move_detail.get('generation', {}).get('name', None)
-                if gen and not gen.endswith(str(generation_id)):
-                    continue
-            results.append({
-                'id': move_detail['id'],
-                'name': move_detail['name'],
-                'name_zh': name_zh,
-                'type': move_detail.get('type', {}).get('name'),
-                'category': move_detail.get('damage_class', {}).get('name'),
-                'power': move_detail.get('power'),
-                'accuracy': move_detail.get('accuracy'),
-                'pp': move_detail.get('pp'),
-                'desc': desc_zh,
-            })
-        redis_service.set(cache_key, json.dumps(results), expire=3600)
-        return results
+        for item in snapshot.items.values():
+            if item.category not in allowed_categories:
+                continue
+            if not _available(item.generation, generation_id, generation_ids):
+                continue
+            results.append(item)
+        return [{
+            'id': item.id,
+            'name': item.name,
+            'name_zh': item.name_zh,
+            'category': item.category,
+            'effect': item.description_zh,
+            'effect_en': item.description_en,
+            'sprite': item.sprite,
+        } for item in results[offset:offset + limit]]
 
     @staticmethod
     def get_item_list(limit=10000, offset=0, generation_id=None, categories=None):
-        """批量获取道具列表，支持本地化、分代筛选和分类筛选，结果缓存"""
+        """批量获取道具列表，支持本地化、分代筛选（该世代及之前登场）和分类筛选，结果缓存"""
+        snapshot = reference_snapshot.current()
+        if snapshot is not None:
+            return PokemonDataService._item_list_from_snapshot(snapshot, limit, offset, generation_id, categories)
+
         cache_key_parts = ["item_list_full", str(limit), str(offset)]
         if generation_id:
             cache_key_parts.append(f"gen:{generation_id}")
@@ -430,10 +766,10 @@ class PokemonDataService:
             cache_key_parts.append(f"cats:{','.join(sorted(categories))}") # 将列表转为排序后的字符串以保证缓存键一致性
         cache_key = ":".join(cache_key_parts)
 
-        cached_data = redis_service.get(cache_key)
-        if cached_data:
+        cached_data = dataset_cache.get(cache_key)
+        if cached_data is not None:
             current_app.logger.debug(f"Cache hit for item list: {cache_key}")
-            return json.loads(cached_data.decode('utf-8'))
+            return cached_data
         current_app.logger.debug(f"Cache miss for item list: {cache_key}, querying source.")
 
         # 此处仅为示例，实际应从数据库查询并实现筛选逻辑
@@ -458,25 +794,21 @@ class PokemonDataService:
         # --- 修改为从本地数据库查询 ---
         query = Item.query
 
-        if generation_id:
-            # 假设 Item 模型有 generation 字段 (字符串，如 "generation-ix") 或 generation_id 字段 (数字)
-            # query = query.filter(Item.generation_id == generation_id) # 如果是数字ID
-            # 或者，如果 Item.generation 是 "generation-ix" 这样的名称
-            gen_obj = Generation.query.filter(Generation.name.like(f"%{generation_id}%")).first() # 模糊匹配 "generation-ix" 或 数字
-            if gen_obj:
-                query = query.filter(Item.generation_id == gen_obj.id) # 假设 Item 有 generation_id 关联 Generation 表
-            else:
-                # 如果 Item.generation 直接存的是 "generation-ix"
-                query = query.filter(Item.generation == f"generation-{generation_id}") # 需要精确匹配，或 Item 模型有相关字段
-
         if categories is not None and isinstance(categories, list) and len(categories) > 0:
             query = query.filter(Item.category.in_(categories))
         else:
             # 如果未指定分类、指定了空列表或指定了非列表类型，使用默认分类过滤
-            default_categories = ['held-items', 'bad-held-items', 'choice', 'mega-stones', 'z-crystals', 'plates', 'picky-healing', 'species-specific', 'medicine']
-            query = query.filter(Item.category.in_(default_categories))
+            query = query.filter(Item.category.in_(PokemonDataService.DEFAULT_ITEM_CATEGORIES))
 
-        db_items = query.offset(offset).limit(limit).all()
+        if generation_id:
+            # Item.generation 存的是世代名称（如 "generation-iii"），按世代ID比较初登场世代，与特性、招式列表相同
+            generation_ids = PokemonDataService._generation_ids_by_name()
+            db_items = [
+                item for item in query.order_by(Item.id)
+                if PokemonDataService._available_in_generation(item.generation, generation_id, generation_ids)
+            ][offset:offset + limit]
+        else:
+            db_items = query.order_by(Item.id).offset(offset).limit(limit).all()
         results = []
         for item in db_items:
             results.append({
@@ -493,90 +825,126 @@ class PokemonDataService:
 
 
         if results: # 只有当成功获取到数据时才设置缓存
-            redis_service.set(cache_key, json.dumps(results), expire=3600) # Cache for 1 hour
+            dataset_cache.set(cache_key, results)
         return results
 
-    @staticmethod
-    def _load_fetch_progress():
-        progress_file = PokemonDataService._get_progress_file_path()
-        if not current_app.config.get('SAVE_FETCH_PROGRESS', False):
-            return {}
-        try:
-            with open(progress_file, 'rb') as f:
-                return pickle.load(f)
-        except FileNotFoundError:
-            current_app.logger.info(f"进度文件 {progress_file} 未找到，将从头开始。")
-            return {}
-        except Exception as e:
-            current_app.logger.error(f"加载进度文件 {progress_file} 失败: {e}")
-            return {}
-
-    @staticmethod
-    def _save_fetch_progress(progress):
-        progress_file = PokemonDataService._get_progress_file_path()
-        if not current_app.config.get('SAVE_FETCH_PROGRESS', False):
-            return
-        dir_path = os.path.dirname(progress_file)
-        if not os.path.exists(dir_path):
-            try:
-                os.makedirs(dir_path, exist_ok=True)
-            except Exception as e:
-                current_app.logger.error(f"创建进度文件目录 {dir_path} 失败: {e}")
-                return
-        try:
-            with open(progress_file, 'wb') as f:
-                pickle.dump(progress, f)
-        except Exception as e:
-            current_app.logger.error(f"保存进度文件 {progress_file} 失败: {e}")
-
     @staticmethod
     def refresh_all_data():
-        """定时全量同步PokeAPI数据到本地数据库和缓存，支持进度显示与断点续拉"""
+        """定时全量同步PokeAPI数据到本地数据库和缓存，支持进度显示与断点续拉。
+
+        开启 SAVE_FETCH_PROGRESS 时，每个批次写库成功后在同步检查点表中记录已完成的资源ID，
+        中断后再次运行会从未完成的资源继续；多个进程可同时运行，通过认领租约分摊资源。
+        """
         show_progress = current_app.config.get('SHOW_FETCH_PROGRESS', False)
         save_progress = current_app.config.get('SAVE_FETCH_PROGRESS', False)
         force_fetch = current_app.config.get('FORCE_FETCH_ON_STARTUP', False)
-        progress = PokemonDataService._load_fetch_progress() if save_progress else {}
-        # 只在force_fetch或无进度时才拉取
-        if not force_fetch and progress.get('all_done'):
-            if show_progress:
-                print('[DataSync] 已完成，无需重复拉取')
-            return
+        journal = SyncJournal() if save_progress else None
+        if journal and journal.is_stage_done('refresh', 'all'):
+            # 上一轮已完整结束：非强制模式下直接返回，强制模式下清空检查点开始新一轮
+            if not force_fetch:
+                if show_progress:
+                    print('[DataSync] 已完成，无需重复拉取')
+                return
+            journal.reset()
+        # 同步中的大批量 Redis 操作不经过 Web 请求用的熔断器与短超时
+        with redis_service.bulk():
+            sync_metrics.start_run()
+            status = 'failed'
+            try:
+                PokemonDataService._run_refresh_stages(journal, show_progress)
+                status = 'ok'
+            finally:
+                summary = sync_metrics.finish_run(status)
+                if show_progress:
+                    print(f"[DataSync] 本轮同步指标: {json.dumps(summary, ensure_ascii=False)}")
+            # 本轮（含其他 worker 进程）有数据变更时才发布新版本
+            PokemonDataService.publish_reference_data()
+        if show_progress:
+            print('[DataSync] 全部拉取完成')
+
+    @staticmethod
+    def publish_reference_data():
+        """
+        同步协调者调用：有尚未发布的数据变更时发布新版本参考数据快照与搜索索引（递增数据集版本号），
+        各 worker 进程随后切换；再生成静态数据包。没有变更时不发布，缓存键、ETag 与快照都保持有效。
+        返回是否发布了新版本。
+        """
+        changes = sync_metrics.pending_changes()
+        if not changes:
+            print('[DataSync] 没有数据变更，不发布新版本')
+            return False
+        snapshot = reference_snapshot.publish()
+        search_index.publish(snapshot)
+        sync_metrics.clear_pending_changes(changes)
+        print(f'[DataSync] {changes} 行数据变更，已发布版本 {snapshot.version}')
+        from .reference_bundles import publish_reference_bundles
+        publish_reference_bundles(snapshot)
+        return True
+
+    @staticmethod
+    def _run_refresh_stages(journal, show_progress):
+        """依次执行 refresh_all_data 的各个同步阶段，每个阶段的指标单独统计"""
         # 拉取并边写入
-        def fetch_and_write(entity, fetch_func, sync_func, key):
-            if progress.get(key) == 'done':
+        def fetch_and_write(entity, fetch_func, sync_func, key, id_field='id'):
+            if journal and journal.is_stage_done(key, 'sync'):
                 if show_progress:
                     print(f'[DataSync] {key} 已完成，跳过')
                 return
-            batch = []
-            for idx, item in enumerate(fetch_func()):
-                batch.append(item)
-                if len(batch) >= 10:
-                    try:
-                        sync_func(batch)
-                    except Exception as e:
-                        print(f"[DataSync][{key}] 批量同步异常: {e}")
-                        import traceback
-                        traceback.print_exc()
-                    batch = []
-                if show_progress and idx % 10 == 0:
-                    print(f'[DataSync] {key}: {idx+1} 条...')
-                if save_progress and idx % 50 == 0:
-                    progress[key] = idx
-                    PokemonDataService._save_fetch_progress(progress)
-            if batch:
+
+            def claim(ids):
+                claimed = journal.claim(key, 'sync', ids)
+                # 已被其他进程持有租约的资源计为争用
+                sync_metrics.record_lock_contention(len(ids) - len(claimed))
+                return claimed
+
+            def flush(batch):
+                resource_ids = [item[id_field] for item in batch]
                 try:
-                    sync_func(batch)
+                    with sync_metrics.time_db_write(len(batch)):
+                        if journal:
+                            # 先在同一会话中暂存检查点，sync_func 的提交把本批数据与检查点一起写入，失败时一起回滚
+                            journal.mark_done(key, 'sync', resource_ids)
+                        sync_func(batch)
+                    sync_metrics.record_items(len(batch))
                 except Exception as e:
+                    db.session.rollback()
                     print(f"[DataSync][{key}] 批量同步异常: {e}")
                     import traceback
                     traceback.print_exc()
-            progress[key] = 'done'
-            PokemonDataService._save_fetch_progress(progress)
-        # fetch_and_write('pokemon_species', lambda: (x for x in PokemonDataService.fetch_pokemons() if 'species_id' in x), PokemonDataService.sync_pokemon_species_to_db, 'pokemon_species')
-        # fetch_and_write('pokemon', lambda: (x for x in PokemonDataService.fetch_pokemons() if 'id' in x), PokemonDataService.sync_pokemons_to_db, 'pokemon')
+                    if journal:
+                        journal.mark_failed(key, 'sync', resource_ids, error=e)
+
+            with sync_metrics.stage(key) as stage:
+                batch = []
+                for idx, item in enumerate(fetch_func(claim if journal else None)):
+                    batch.append(item)
+                    if len(batch) >= 10:
+                        flush(batch)
+                        batch = []
+                    if show_progress and idx % 10 == 0:
+                        print(f"[DataSync] {key}: {idx+1} 条... {stage.to_dict()['items_per_sec']} 条/秒")
+                if batch:
+                    flush(batch)
+            if journal and not journal.has_unfinished(key, 'sync'):
+                journal.mark_stage_done(key, 'sync')
+        # fetch_and_write('pokemon_species', lambda claim: (x for x in PokemonDataService.fetch_pokemons(claim) if 'id' not in x), PokemonDataService.sync_pokemon_species_to_db, 'pokemon_species', id_field='pokemon_id')
+        # fetch_and_write('pokemon', lambda claim: (x for x in PokemonDataService.fetch_pokemons(claim) if 'id' in x), PokemonDataService.sync_pokemons_to_db, 'pokemon')
         # fetch_and_write('ability', PokemonDataService.fetch_abilities, PokemonDataService.sync_abilities_to_db, 'ability')
         # fetch_and_write('move', PokemonDataService.fetch_moves, PokemonDataService.sync_moves_to_db, 'move')
         # fetch_and_write('item', PokemonDataService.fetch_items, PokemonDataService.sync_items_to_db, 'item')  # 已有item数据，后续不同步，防止重复爬取和报错
+        # 完整的特性同步未启用，只补全迁移新增的初登场世代列，特性列表的 generation_id 筛选依赖该列
+        if not (journal and journal.is_stage_done('ability_generation', 'sync')):
+            try:
+                with sync_metrics.stage('ability_generation'):
+                    remaining = PokemonDataService.fetch_and_sync_ability_generations()
+                # 拉取失败的特性仍为 NULL，阶段保持未完成，下次运行继续补全
+                if journal and not remaining:
+                    journal.mark_stage_done('ability_generation', 'sync')
+            except Exception as e:
+                db.session.rollback()
+                print(f"[DataSync][ability_generation] 补全异常: {e}")
+                import traceback
+                traceback.print_exc()
         # PokemonDataService.fetch_and_sync_types()
         # PokemonDataService.fetch_and_sync_generations()
         # 新增：补全 generation_pokemon_species 的 version_group_id 字段
@@ -591,18 +959,28 @@ class PokemonDataService:
         # 集成全局宝可梦招式学习表同步
         # PokemonDataService.fetch_and_sync_pokemon_move_learnsets()
         # New call to sync form abilities
-        try:
-            current_app.logger.info("[DataSync] Starting Pokemon Form Abilities sync...")
-            PokemonDataService.fetch_and_sync_pokemon_form_abilities()
-            current_app.logger.info("[DataSync] Pokemon Form Abilities sync completed.")
-        except Exception as e:
-            current_app.logger.error(f"[DataSync][PokemonFormAbilities] Sync failed: {e}")
-            import traceback
-            traceback.print_exc()
-        progress['all_done'] = True
-        PokemonDataService._save_fetch_progress(progress)
-        if show_progress:
-            print('[DataSync] 全部拉取完成')
+        if journal and journal.is_stage_done('form_ability', 'sync'):
+            if show_progress:
+                print('[DataSync] form_ability 已完成，跳过')
+        else:
+            try:
+                current_app.logger.info("[DataSync] Starting Pokemon Form Abilities sync...")
+                with sync_metrics.stage('form_ability'):
+                    if current_app.config.get('SYNC_WORK_QUEUE_ENABLED', False):
+                        # 拆分为按形态的任务入队，本进程也作为 worker 参与处理；可另启 sync_worker.py 加速
+                        PokemonDataService.enqueue_pokemon_form_ability_tasks()
+                        PokemonDataService.run_sync_worker([PokemonDataService.SYNC_QUEUE_FORM_ABILITY])
+                    else:
+                        PokemonDataService.fetch_and_sync_pokemon_form_abilities()
+                current_app.logger.info("[DataSync] Pokemon Form Abilities sync completed.")
+                if journal:
+                    journal.mark_stage_done('form_ability', 'sync')
+            except Exception as e:
+                current_app.logger.error(f"[DataSync][PokemonFormAbilities] Sync failed: {e}")
+                import traceback
+                traceback.print_exc()
+        if journal:
+            journal.mark_stage_done('refresh', 'all')
 
     @staticmethod
     def start_periodic_refresh(interval_hours=24):
@@ -620,92 +998,141 @@ class PokemonDataService:
         t = threading.Thread(target=loop, daemon=True)
         t.start()
 
+    @staticmethod
+    def _upsert_reference_rows(model, rows):
+        """写入参考数据行：开启 SYNC_FINGERPRINT_ENABLED 时先按内容指纹跳过未变化的行"""
+        if current_app.config.get('SYNC_FINGERPRINT_ENABLED', True):
+            return fingerprint_upsert(model, rows)
+        return bulk_upsert(model, rows)
+
+    @staticmethod
+    def _report_sync_changes(tag, result):
+        """输出同步统计及变更清单（新增或内容变化的行ID），并计入待发布的变更"""
+        sync_metrics.record_changes(len(result.changed_keys))
+        print(f"[{tag}] {result}")
+        if result.changed_keys:
+            preview = result.changed_keys[:50]
+            more = f" 等 {len(result.changed_keys)} 条" if len(result.changed_keys) > len(preview) else ""
+            print(f"[{tag}] 变更: {preview}{more}")
+
     @staticmethod
     def sync_abilities_to_db(abilities: list):
-        for ab in abilities:
-            obj = Ability.query.filter_by(id=ab['id']).first()
-            if not obj:
-                obj = Ability(id=ab['id'])
-            obj.name = ab['name']
-            obj.name_zh_hans = ab.get('name_zh')
-            obj.description_en = ab.get('effect_en')
-            obj.description_zh_hans = ab.get('effect_zh')
-            print(f"[AbilitySync] id={ab['id']} name={ab['name']} zh={ab['name_zh']} desc_zh={ab.get('effect_zh')}")
-            db.session.merge(obj)
+        rows = [{
+            'id': ab['id'],
+            'name': ab['name'],
+            'name_zh_hans': ab.get('name_zh'),
+            'description_en': ab.get('effect_en'),
+            'description_zh_hans': ab.get('effect_zh'),
+            'generation': ab.get('generation'),
+        } for ab in abilities]
+        result = PokemonDataService._upsert_reference_rows(Ability, rows)
         db.session.commit()
+        PokemonDataService._report_sync_changes("AbilitySync", result)
+        return result
+
+    @staticmethod
+    def _abilities_missing_generation():
+        return [row[0] for row in db.session.query(Ability.id).filter(Ability.generation.is_(None)).order_by(Ability.id)]
+
+    @staticmethod
+    def fetch_and_sync_ability_generations():
+        """
+        补全特性的初登场世代（Ability.generation）。该列由迁移新增，已有行均为 NULL，而完整的特性同步阶段未启用；
+        这里只拉取 generation 为空的特性详情，按完整特性同步的方式经 sync_abilities_to_db 写入（同时记录内容指纹，
+        之后的完整同步可直接跳过这些行），全部补全后不再发起请求。
+        返回仍未补全的特性数（拉取失败的特性留待下次重试）。
+        """
+        missing = PokemonDataService._abilities_missing_generation()
+        if not missing:
+            return 0
+        print(f'[AbilityGenerationSync] 待补全初登场世代的特性: {len(missing)} 个')
+        urls = [f"{PokemonDataService.POKEAPI_BASE_URL}/ability/{ability_id}" for ability_id in missing]
+
+        def flush(batch):
+            with sync_metrics.time_db_write(len(batch)):
+                PokemonDataService.sync_abilities_to_db(batch)
+            sync_metrics.record_items(len(batch))
+
+        with AsyncPokeAPIFetcher.from_config() as fetcher:
+            batch = []
+            for ab_detail in fetcher.iter_json(urls):
+                ability = PokemonDataService._parse_ability_detail(ab_detail)
+                if ability['generation']:
+                    batch.append(ability)
+                if len(batch) >= 100:
+                    flush(batch)
+                    batch = []
+            if batch:
+                flush(batch)
+        remaining = len(PokemonDataService._abilities_missing_generation())
+        print(f'[AbilityGenerationSync] 已补全 {len(missing) - remaining} 个特性的初登场世代，剩余 {remaining} 个')
+        return remaining
 
     @staticmethod
     def sync_moves_to_db(moves: list):
-        for mv in moves:
-            obj = Move.query.filter_by(id=mv['id']).first()
-            if not obj:
-                obj = Move(id=mv['id'])
-            obj.name = mv['name']
-            obj.name_zh_hans = mv.get('name_zh')
-            obj.type = mv.get('type')
-            obj.category = mv.get('category')
-            obj.power = mv.get('power')
-            obj.accuracy = mv.get('accuracy')
-            obj.pp = mv.get('pp')
-            obj.description_en = mv.get('desc_en')
-            obj.description_zh_hans = mv.get('desc')
-            obj.generation = mv.get('generation')
-            db.session.merge(obj)
+        rows = [{
+            'id': mv['id'],
+            'name': mv['name'],
+            'name_zh_hans': mv.get('name_zh'),
+            'type': mv.get('type'),
+            'category': mv.get('category'),
+            'power': mv.get('power'),
+            'accuracy': mv.get('accuracy'),
+            'pp': mv.get('pp'),
+            'description_en': mv.get('desc_en'),
+            'description_zh_hans': mv.get('desc'),
+            'generation': mv.get('generation'),
+        } for mv in moves]
+        result = PokemonDataService._upsert_reference_rows(Move, rows)
         db.session.commit()
+        PokemonDataService._report_sync_changes("MoveSync", result)
+        return result
 
     @staticmethod
     def sync_items_to_db(items: list):
-        from sqlalchemy.exc import IntegrityError
-        with db.session.no_autoflush:
-            for it in items:
-                if 'id' not in it:
-                    print(f"[ItemSync][Error] item数据缺少id字段: {it}")
-                    raise AssertionError(f"item数据缺少id字段: {it}")
-                obj = Item.query.filter_by(id=it['id']).first()
-                if not obj:
-                    obj = Item(id=it['id'])
-                obj.name = it['name']
-                obj.name_zh_hans = it.get('name_zh')
-                obj.category = it.get('category')
-                obj.description_en = it.get('desc_en')
-                obj.description_zh_hans = it.get('desc')
-                obj.sprite = it.get('sprite')
-                obj.generation = it.get('generation')
-                try:
-                    db.session.merge(obj)
-                except IntegrityError as e:
-                    db.session.rollback()
-                    print(f"[ItemSync] 跳过重复id={it.get('id')} name={it.get('name')}，错误：{e}")
+        rows = []
+        for it in items:
+            if 'id' not in it:
+                print(f"[ItemSync][Error] item数据缺少id字段: {it}")
+                raise AssertionError(f"item数据缺少id字段: {it}")
+            rows.append({
+                'id': it['id'],
+                'name': it['name'],
+                'name_zh_hans': it.get('name_zh'),
+                'category': it.get('category'),
+                'description_en': it.get('desc_en'),
+                'description_zh_hans': it.get('desc'),
+                'sprite': it.get('sprite'),
+                'generation': it.get('generation'),
+            })
+        result = PokemonDataService._upsert_reference_rows(Item, rows)
         db.session.commit()
+        PokemonDataService._report_sync_changes("ItemSync", result)
+        return result
 
     @staticmethod
     def sync_pokemons_to_db(pokemons: list):
-        from sqlalchemy.exc import IntegrityError
-        with db.session.no_autoflush:
-            for poke in pokemons:
-                obj = Pokemon.query.filter_by(id=poke['id']).first()
-                if not obj:
-                    obj = Pokemon(id=poke['id'])
-                obj.species_id = poke['species_id']
-                obj.name = poke['name']
-                obj.form_name = poke.get('form_name')
-                obj.form_name_zh_hans = poke.get('form_name_zh_hans')
-                obj.is_default = poke.get('is_default', True)
-                obj.sprite = poke.get('sprite')
-                obj.type_1 = poke.get('type_1')
-                obj.type_2 = poke.get('type_2')
-                obj.base_hp = poke.get('base_hp')
-                obj.base_atk = poke.get('base_atk')
-                obj.base_def = poke.get('base_def')
-                obj.base_spa = poke.get('base_spa')
-                obj.base_spd = poke.get('base_spd')
-                obj.base_spe = poke.get('base_spe')
-                try:
-                    db.session.merge(obj)
-                except IntegrityError as e:
-                    db.session.rollback()
-                    print(f"[PokemonSync] 跳过重复id={poke['id']}，错误：{e}")
+        rows = [{
+            'id': poke['id'],
+            'species_id': poke['species_id'],
+            'name': poke['name'],
+            'form_name': poke.get('form_name'),
+            'form_name_zh_hans': poke.get('form_name_zh_hans'),
+            'is_default': poke.get('is_default', True),
+            'sprite': poke.get('sprite'),
+            'type_1': poke.get('type_1'),
+            'type_2': poke.get('type_2'),
+            'base_hp': poke.get('base_hp'),
+            'base_atk': poke.get('base_atk'),
+            'base_def': poke.get('base_def'),
+            'base_spa': poke.get('base_spa'),
+            'base_spd': poke.get('base_spd'),
+            'base_spe': poke.get('base_spe'),
+        } for poke in pokemons]
+        result = PokemonDataService._upsert_reference_rows(Pokemon, rows)
         db.session.commit()
+        PokemonDataService._report_sync_changes("PokemonSync", result)
+        return result
 
     @staticmethod
     def sync_pokemon_species_to_db(species: list):
@@ -716,21 +1143,33 @@ class PokemonDataService:
                 sid = sp['species_id']
                 if sid not in species_map or (sp.get('name_zh') and not species_map[sid].get('name_zh')):
                     species_map[sid] = sp
+        rows = []
         for sp in species_map.values():
-            obj = PokemonSpecies.query.filter_by(id=sp['species_id']).first()
-            if not obj:
-                obj = PokemonSpecies(id=sp['species_id'])
-            if sp.get('name'):
-                obj.name = sp['name']
+            # 缺失的字段不覆盖库中已有值
+            row = {'id': sp['species_id'], 'name': sp.get('name')}
             if sp.get('name_zh'):
-                obj.name_zh_hans = sp['name_zh']
+                row['name_zh_hans'] = sp['name_zh']
             if sp.get('gender_rate') is not None:
-                obj.gender_rate = sp['gender_rate']
-            if hasattr(obj, 'generations') and sp.get('generations'):
-                obj.generations = [Generation.query.filter_by(name=gen).first() for gen in sp['generations'] if Generation.query.filter_by(name=gen).first()]
-            print(f"[SyncSpecies] id={sp['species_id']} name={sp.get('name','')} zh={sp.get('name_zh','')} gender_rate={sp.get('gender_rate','')}")
-            db.session.merge(obj)
+                row['gender_rate'] = sp['gender_rate']
+            rows.append(row)
+        result = PokemonDataService._upsert_reference_rows(PokemonSpecies, rows)
+
+        # 物种-世代关系：按世代下的所有版本组补齐 generation_pokemon_species 三元组
+        gen_name_to_id = {g.name: g.id for g in Generation.query.all()}
+        vg_map = {}
+        for vg in VersionGroup.query.all():
+            vg_map.setdefault(vg.generation_id, []).append(vg.id)
+        wanted = set()
+        for sp in species_map.values():
+            for gen_name in sp.get('generations') or []:
+                gen_id = gen_name_to_id.get(gen_name)
+                for vg_id in vg_map.get(gen_id, []):
+                    wanted.add((gen_id, sp['species_id'], vg_id))
+        inserted = PokemonDataService._insert_missing_generation_species(wanted)
         db.session.commit()
+        sync_metrics.record_changes(inserted)
+        PokemonDataService._report_sync_changes("SyncSpecies", result)
+        return result
 
     @staticmethod
     def sync_types_to_db(types: list):
@@ -738,13 +1177,12 @@ class PokemonDataService:
             if 'id' not in t:
                 print(f"[TypeSync][Error] type数据缺少id字段: {t}")
                 raise AssertionError(f"type数据缺少id字段: {t}")
-            obj = Type.query.filter_by(id=t['id']).first()
-            if not obj:
-                obj = Type(id=t['id'])
-            obj.name = t['name']
-            obj.name_zh_hans = t.get('name_zh')
-            db.session.add(obj)
+        rows = [{'id': t['id'], 'name': t['name'], 'name_zh_hans': t.get('name_zh')} for t in types]
+        result = bulk_upsert(Type, rows)
         db.session.commit()
+        sync_metrics.record_changes(len(result.changed_keys))
+        print(f"[TypeSync] {result}")
+        return result
 
     @staticmethod
     def sync_generations_to_db(generations: list):
@@ -752,12 +1190,12 @@ class PokemonDataService:
             if 'id' not in g:
                 print(f"[GenerationSync][Error] generation数据缺少id字段: {g}")
                 raise AssertionError(f"generation数据缺少id字段: {g}")
-            obj = Generation.query.filter_by(id=g['id']).first()
-            if not obj:
-                obj = Generation(id=g['id'])
-            obj.name = g['name']
-            db.session.add(obj)
+        rows = [{'id': g['id'], 'name': g['name']} for g in generations]
+        result = bulk_upsert(Generation, rows)
         db.session.commit()
+        sync_metrics.record_changes(len(result.changed_keys))
+        print(f"[GenerationSync] {result}")
+        return result
 
     @staticmethod
     def sync_version_groups_to_db(vgs: list):
@@ -765,30 +1203,26 @@ class PokemonDataService:
             if 'id' not in vg:
                 print(f"[VersionGroupSync][Error] version_group数据缺少id字段: {vg}")
                 raise AssertionError(f"version_group数据缺少id字段: {vg}")
-            try:
-                obj = VersionGroup.query.filter_by(id=vg['id']).first()
-                if not obj:
-                    obj = VersionGroup(id=vg['id'])
-                obj.name = vg['name']
-                obj.generation_id = vg.get('generation_id')
-                print(f"[VersionGroupSync] id={vg['id']} name={vg.get('name')} generation_id={vg.get('generation_id')}")
-                db.session.add(obj)
-            except Exception as e:
-                print(f"[VersionGroupSync][Exception] 数据: {vg}, 错误: {e}")
-                import traceback
-                traceback.print_exc()
-                raise
+        rows = [{'id': vg['id'], 'name': vg['name'], 'generation_id': vg.get('generation_id')} for vg in vgs]
+        try:
+            result = bulk_upsert(VersionGroup, rows)
+        except Exception as e:
+            print(f"[VersionGroupSync][Exception] 批量写入失败: {e}")
+            import traceback
+            traceback.print_exc()
+            raise
         db.session.commit()
+        sync_metrics.record_changes(len(result.changed_keys))
+        print(f"[VersionGroupSync] {result}")
+        return result
 
     @staticmethod
     def fetch_and_sync_types():
         url = f"{PokemonDataService.POKEAPI_BASE_URL}/type?limit=100"
-        response = requests.get(url, **REQUESTS_KWARGS)
-        response.raise_for_status()
-        data = response.json()
+        data = PokemonDataService._get_json(url)
         results = []
         for entry in data.get('results', []):
-            type_detail = requests.get(entry['url'], **REQUESTS_KWARGS).json()
+            type_detail = PokemonDataService._get_json(entry['url'])
             name_zh = next((n['name'] for n in type_detail.get('names', []) if n['language']['name'] == 'zh-Hans'), type_detail['name'])
             results.append({'id': type_detail['id'], 'name': type_detail['name'], 'name_zh': name_zh})
         PokemonDataService.sync_types_to_db(results)
@@ -796,12 +1230,10 @@ class PokemonDataService:
     @staticmethod
     def fetch_and_sync_generations():
         url = f"{PokemonDataService.POKEAPI_BASE_URL}/generation?limit=20"
-        response = requests.get(url, **REQUESTS_KWARGS)
-        response.raise_for_status()
-        data = response.json()
+        data = PokemonDataService._get_json(url)
         results = []
         for entry in data.get('results', []):
-            gen_detail = requests.get(entry['url'], **REQUESTS_KWARGS).json()
+            gen_detail = PokemonDataService._get_json(entry['url'])
             results.append({'id': gen_detail['id'], 'name': gen_detail['name']})
         PokemonDataService.sync_generations_to_db(results)
 
@@ -809,13 +1241,11 @@ class PokemonDataService:
     def fetch_and_sync_version_groups():
         import re
         url = f"{PokemonDataService.POKEAPI_BASE_URL}/version-group?limit=50"
-        response = requests.get(url, **REQUESTS_KWARGS)
-        response.raise_for_status()
-        data = response.json()
+        data = PokemonDataService._get_json(url)
         results = []
         for entry in data.get('results', []):
             try:
-                vg_detail = requests.get(entry['url'], **REQUESTS_KWARGS).json()
+                vg_detail = PokemonDataService._get_json(entry['url'])
                 print(f"[VersionGroupFetch] id={vg_detail.get('id')} name={vg_detail.get('name')} generation={vg_detail.get('generation')}")
                 gen_url = vg_detail['generation']['url']
                 match = re.search(r'/generation/(\d+)/?$', gen_url) if gen_url else None
@@ -833,634 +1263,559 @@ class PokemonDataService:
         PokemonDataService.sync_version_groups_to_db(results)
 
     @staticmethod
-    def fetch_pokemons():
-        # 生成器：只在主形态yield物种，所有形态yield形态
-        url = f"{PokemonDataService.POKEAPI_BASE_URL}/pokemon?limit=10000&offset=0"
-        response = requests.get(url, **REQUESTS_KWARGS)
-        data = response.json()
-        for entry in data.get('results', []):
-            poke_detail = requests.get(entry['url'], **REQUESTS_KWARGS).json()
-            poke_id = poke_detail['id']
-            name = poke_detail['name']
-            sprite = poke_detail['sprites']['front_default']
-            types = [t['type']['name'] for t in poke_detail['types']]
-            base_stats = {s['stat']['name']: s['base_stat'] for s in poke_detail['stats']}
-            abilities = [a['ability']['name'] for a in poke_detail['abilities']]
-            is_default = poke_detail.get('is_default', True)
-            form_name = poke_detail.get('forms', [{}])[0].get('name') if poke_detail.get('forms') else None
-            # 物种信息
-            species_url = poke_detail['species']['url']
-            species_detail = requests.get(species_url, **REQUESTS_KWARGS).json()
-            species_id = species_detail['id']
-            name_zh = next((n['name'] for n in species_detail['names'] if n['language']['name'] == 'zh-Hans'), name)
-            gender_rate = species_detail.get('gender_rate')
-            generations = []
-            if 'generation' in species_detail:
-                generations = [species_detail['generation']['name']]
-
-            # 形态中文名拼接逻辑
-            def get_form_zh(poke_name, form_name, species_name_zh):
-                n = poke_name.lower()
-                f = (form_name or '').lower() if form_name else ''
-                # Mega
-                if '-mega' in n:
-                    if n.endswith('-mega-x'):
-                        return f"{species_name_zh}-Mega-X"
-                    elif n.endswith('-mega-y'):
-                        return f"{species_name_zh}-Mega-Y"
-                    else:
-                        return f"{species_name_zh}-Mega"
-                # 超极巨化
-                if 'gmax' in n or 'gigantamax' in n:
-                    return f"{species_name_zh}-超极巨化"
-                # 阿罗拉
-                if 'alola' in n or 'alola' in f:
-                    return f"{species_name_zh}-阿罗拉"
-                # 伽勒尔
-                if 'galar' in n or 'galar' in f:
-                    return f"{species_name_zh}-伽勒尔"
-                # 洗翠
-                if 'hisui' in n or 'hisui' in f:
-                    return f"{species_name_zh}-洗翠"
-                # 帕底亚
-                if 'paldea' in n or 'paldea' in f:
-                    # 肯泰罗帕底亚三种
-                    if 'tauros' in n:
-                        if 'combat' in n:
-                            return f"{species_name_zh}-帕底亚·斗战种"
-                        elif 'blaze' in n:
-                            return f"{species_name_zh}-帕底亚·火炽种"
-                        elif 'aqua' in n:
-                            return f"{species_name_zh}-帕底亚·水澜种"
-                        else:
-                            return f"{species_name_zh}-帕底亚"
+    def _get_form_zh(poke_name, form_name, species_name_zh):
+        """形态中文名拼接逻辑"""
+        n = poke_name.lower()
+        f = (form_name or '').lower() if form_name else ''
+        # Mega
+        if '-mega' in n:
+            if n.endswith('-mega-x'):
+                return f"{species_name_zh}-Mega-X"
+            elif n.endswith('-mega-y'):
+                return f"{species_name_zh}-Mega-Y"
+            else:
+                return f"{species_name_zh}-Mega"
+        # 超极巨化
+        if 'gmax' in n or 'gigantamax' in n:
+            return f"{species_name_zh}-超极巨化"
+        # 阿罗拉
+        if 'alola' in n or 'alola' in f:
+            return f"{species_name_zh}-阿罗拉"
+        # 伽勒尔
+        if 'galar' in n or 'galar' in f:
+            return f"{species_name_zh}-伽勒尔"
+        # 洗翠
+        if 'hisui' in n or 'hisui' in f:
+            return f"{species_name_zh}-洗翠"
+        # 帕底亚
+        if 'paldea' in n or 'paldea' in f:
+            # 肯泰罗帕底亚三种
+            if 'tauros' in n:
+                if 'combat' in n:
+                    return f"{species_name_zh}-帕底亚·斗战种"
+                elif 'blaze' in n:
+                    return f"{species_name_zh}-帕底亚·火炽种"
+                elif 'aqua' in n:
+                    return f"{species_name_zh}-帕底亚·水澜种"
+                else:
                     return f"{species_name_zh}-帕底亚"
-                # 武道熊师
-                if 'urshifu' in n:
-                    if 'single-strike' in n:
-                        return f"{species_name_zh}-一击流"
-                    if 'rapid-strike' in n:
-                        return f"{species_name_zh}-连击流"
-                # 洛托姆家族
-                if 'rotom' in n:
-                    if 'heat' in n:
-                        return "加热洛托姆"
-                    if 'wash' in n:
-                        return "清洗洛托姆"
-                    if 'frost' in n:
-                        return "结冰洛托姆"
-                    if 'fan' in n:
-                        return "旋转洛托姆"
-                    if 'mow' in n:
-                        return "切割洛托姆"
-                # 月月熊赫月
-                if 'ursaluna' in n and 'bloodmoon' in n:
-                    return f"{species_name_zh}-赫月"
-                # 厄诡椪
-                if 'ogerpon' in n:
-                    if 'teal' in n:
-                        return f"{species_name_zh}-碧草面具"
-                    if 'wellspring' in n:
-                        return f"{species_name_zh}-水井面具"
-                    if 'cornerstone' in n:
-                        return f"{species_name_zh}-础石面具"
-                    if 'hearthflame' in n:
-                        return f"{species_name_zh}-火灶面具"
-                # 太乐巴戈斯
-                if 'terapagos' in n:
-                    if 'stellar' in n:
-                        return f"{species_name_zh}-星晶形态"
-                    if 'terrestrial' in n:
-                        return f"{species_name_zh}-太晶形态"
-                # 其它情况：如有后缀，拼接英文后缀（首字母大写，多个后缀用-连接）
-                if '-' in poke_name:
-                    base, *suffix = poke_name.split('-')
-                    if suffix:
-                        suffix_str = '-'.join([s.capitalize() for s in suffix])
-                        return f"{species_name_zh}-{suffix_str}"
-                return species_name_zh
-
-            # 只在主形态时yield物种
-            if is_default:
-                yield {
-                    'species_id': species_id,
-                    'name': name,
-                    'name_zh': name_zh,
-                    'gender_rate': gender_rate,
-                    'generations': generations,
-                    'is_default': True
-                }
-            # 所有形态都yield形态数据
-            yield {
-                'id': poke_id,
+            return f"{species_name_zh}-帕底亚"
+        # 武道熊师
+        if 'urshifu' in n:
+            if 'single-strike' in n:
+                return f"{species_name_zh}-一击流"
+            if 'rapid-strike' in n:
+                return f"{species_name_zh}-连击流"
+        # 洛托姆家族
+        if 'rotom' in n:
+            if 'heat' in n:
+                return "加热洛托姆"
+            if 'wash' in n:
+                return "清洗洛托姆"
+            if 'frost' in n:
+                return "结冰洛托姆"
+            if 'fan' in n:
+                return "旋转洛托姆"
+            if 'mow' in n:
+                return "切割洛托姆"
+        # 月月熊赫月
+        if 'ursaluna' in n and 'bloodmoon' in n:
+            return f"{species_name_zh}-赫月"
+        # 厄诡椪
+        if 'ogerpon' in n:
+            if 'teal' in n:
+                return f"{species_name_zh}-碧草面具"
+            if 'wellspring' in n:
+                return f"{species_name_zh}-水井面具"
+            if 'cornerstone' in n:
+                return f"{species_name_zh}-础石面具"
+            if 'hearthflame' in n:
+                return f"{species_name_zh}-火灶面具"
+        # 太乐巴戈斯
+        if 'terapagos' in n:
+            if 'stellar' in n:
+                return f"{species_name_zh}-星晶形态"
+            if 'terrestrial' in n:
+                return f"{species_name_zh}-太晶形态"
+        # 其它情况：如有后缀，拼接英文后缀（首字母大写，多个后缀用-连接）
+        if '-' in poke_name:
+            base, *suffix = poke_name.split('-')
+            if suffix:
+                suffix_str = '-'.join([s.capitalize() for s in suffix])
+                return f"{species_name_zh}-{suffix_str}"
+        return species_name_zh
+
+    @staticmethod
+    def _build_pokemon_records(poke_detail, species_detail):
+        """由宝可梦详情与物种详情生成记录：主形态额外产出物种记录，所有形态产出形态记录"""
+        poke_id = poke_detail['id']
+        name = poke_detail['name']
+        sprite = poke_detail['sprites']['front_default']
+        types = [t['type']['name'] for t in poke_detail['types']]
+        base_stats = {s['stat']['name']: s['base_stat'] for s in poke_detail['stats']}
+        is_default = poke_detail.get('is_default', True)
+        form_name = poke_detail.get('forms', [{}])[0].get('name') if poke_detail.get('forms') else None
+        # 物种信息
+        species_id = species_detail['id']
+        name_zh = next((n['name'] for n in species_detail['names'] if n['language']['name'] == 'zh-Hans'), name)
+        gender_rate = species_detail.get('gender_rate')
+        generations = []
+        if 'generation' in species_detail:
+            generations = [species_detail['generation']['name']]
+        get_form_zh = PokemonDataService._get_form_zh
+
+        records = []
+        # 只在主形态时产出物种
+        if is_default:
+            records.append({
                 'species_id': species_id,
+                'pokemon_id': poke_id,  # 来源的宝可梦资源ID，用于同步检查点
                 'name': name,
-                'name_zh': get_form_zh(name, form_name, name_zh),
-                'form_name': get_form_zh(name, form_name, form_name) if form_name else None,
-                'form_name_zh_hans': get_form_zh(name, form_name, name_zh),
-                'is_default': is_default,
-                'sprite': sprite,
-                'type_1': types[0] if types else None,
-                'type_2': types[1] if len(types) > 1 else None,
-                'base_hp': base_stats.get('hp'),
-                'base_atk': base_stats.get('attack'),
-                'base_def': base_stats.get('defense'),
-                'base_spa': base_stats.get('special-attack'),
-                'base_spd': base_stats.get('special-defense'),
-                'base_spe': base_stats.get('speed'),
-            }
+                'name_zh': name_zh,
+                'gender_rate': gender_rate,
+                'generations': generations,
+                'is_default': True
+            })
+        # 所有形态都产出形态数据
+        records.append({
+            'id': poke_id,
+            'species_id': species_id,
+            'name': name,
+            'name_zh': get_form_zh(name, form_name, name_zh),
+            'form_name': get_form_zh(name, form_name, form_name) if form_name else None,
+            'form_name_zh_hans': get_form_zh(name, form_name, name_zh),
+            'is_default': is_default,
+            'sprite': sprite,
+            'type_1': types[0] if types else None,
+            'type_2': types[1] if len(types) > 1 else None,
+            'base_hp': base_stats.get('hp'),
+            'base_atk': base_stats.get('attack'),
+            'base_def': base_stats.get('defense'),
+            'base_spa': base_stats.get('special-attack'),
+            'base_spd': base_stats.get('special-defense'),
+            'base_spe': base_stats.get('speed'),
+        })
+        return records
+
+    @staticmethod
+    def _resource_id_from_url(url):
+        """从 PokeAPI 资源 URL 中解析数字ID，如 .../ability/65/ -> 65"""
+        return int(url.rstrip('/').split('/')[-1])
+
+    @staticmethod
+    def _claimed_entries(entries, claim):
+        """按 claim 回调过滤列表条目，只保留本进程认领（未完成且未被其他进程处理）的资源"""
+        if claim is None:
+            return entries
+        resource_id = PokemonDataService._resource_id_from_url
+        claimed = claim([resource_id(entry['url']) for entry in entries])
+        return [entry for entry in entries if str(resource_id(entry['url'])) in claimed]
+
+    @staticmethod
+    async def _load_pokemon_with_species(fetcher, entry):
+        """异步拉取单个宝可梦详情及其物种详情（同一物种的多个形态共享一次物种请求）"""
+        poke_detail = await fetcher.fetch_json(entry['url'])
+        species_detail = await fetcher.fetch_json(poke_detail['species']['url'], memoize=True)
+        return poke_detail, species_detail
+
+    @staticmethod
+    def fetch_pokemons(claim=None):
+        # 生成器：只在主形态yield物种，所有形态yield形态
+        url = f"{PokemonDataService.POKEAPI_BASE_URL}/pokemon?limit=10000&offset=0"
+        with AsyncPokeAPIFetcher.from_config() as fetcher:
+            data = fetcher.get_json(url)
+            entries = PokemonDataService._claimed_entries(data.get('results', []), claim)
+            for poke_detail, species_detail in fetcher.imap(PokemonDataService._load_pokemon_with_species, entries):
+                yield from PokemonDataService._build_pokemon_records(poke_detail, species_detail)
 
     @staticmethod
-    def fetch_abilities():
+    def fetch_abilities(claim=None):
         url = f"{PokemonDataService.POKEAPI_BASE_URL}/ability?limit=10000&offset=0"
-        response = requests.get(url, **REQUESTS_KWARGS)
-        data = response.json()
-        for entry in data.get('results', []):
-            ab_detail = requests.get(entry['url'], **REQUESTS_KWARGS).json()
-            name_zh = next((n['name'] for n in ab_detail.get('names', []) if n['language']['name'] == 'zh-Hans'), ab_detail['name'])
-            # 兼容 flavor_text/text 字段
-            desc_zh = next((ft.get('flavor_text') or ft.get('text') for ft in ab_detail.get('flavor_text_entries', []) if ft['language']['name'] == 'zh-Hans'), None)
-            if not desc_zh:
-                desc_zh = next((ft.get('flavor_text') or ft.get('text') for ft in ab_detail.get('flavor_text_entries', []) if ft['language']['name'] == 'en'), '')
-            print(f"[AbilityFetch] id={ab_detail['id']} name={ab_detail['name']} name_zh={name_zh} desc_zh={desc_zh}")
-            yield {
-                'id': ab_detail['id'],
-                'name': ab_detail['name'],
-                'name_zh': name_zh,
-                'effect_en': next((eff['effect'] for eff in ab_detail.get('effect_entries', []) if eff['language']['name'] == 'en'), ''),
-                'effect_zh': desc_zh
-            }
+        with AsyncPokeAPIFetcher.from_config() as fetcher:
+            data = fetcher.get_json(url)
+            entries = PokemonDataService._claimed_entries(data.get('results', []), claim)
+            for ab_detail in fetcher.iter_json(entry['url'] for entry in entries):
+                ability = PokemonDataService._parse_ability_detail(ab_detail)
+                print(f"[AbilityFetch] id={ability['id']} name={ability['name']} name_zh={ability['name_zh']} desc_zh={ability['effect_zh']}")
+                yield ability
 
     @staticmethod
-    def fetch_moves():
+    def _parse_ability_detail(ab_detail):
+        """PokeAPI /ability/{id} 详情 -> sync_abilities_to_db 的输入"""
+        name_zh = next((n['name'] for n in ab_detail.get('names', []) if n['language']['name'] == 'zh-Hans'), ab_detail['name'])
+        # 兼容 flavor_text/text 字段
+        desc_zh = next((ft.get('flavor_text') or ft.get('text') for ft in ab_detail.get('flavor_text_entries', []) if ft['language']['name'] == 'zh-Hans'), None)
+        if not desc_zh:
+            desc_zh = next((ft.get('flavor_text') or ft.get('text') for ft in ab_detail.get('flavor_text_entries', []) if ft['language']['name'] == 'en'), '')
+        return {
+            'id': ab_detail['id'],
+            'name': ab_detail['name'],
+            'name_zh': name_zh,
+            'effect_en': next((eff['effect'] for eff in ab_detail.get('effect_entries', []) if eff['language']['name'] == 'en'), ''),
+            'effect_zh': desc_zh,
+            'generation': (ab_detail.get('generation') or {}).get('name'),
+        }
+
+    @staticmethod
+    def fetch_moves(claim=None):
         url = f"{PokemonDataService.POKEAPI_BASE_URL}/move?limit=10000&offset=0"
-        response = requests.get(url, **REQUESTS_KWARGS)
-        data = response.json()
-        for entry in data.get('results', []):
-            move_detail = requests.get(entry['url'], **REQUESTS_KWARGS).json()
-            name_zh = next((n['name'] for n in move_detail.get('names', []) if n['language']['name'] == 'zh-Hans'), move_detail['name'])
-            desc_zh = next((ft.get('flavor_text') or ft.get('text') for ft in move_detail.get('flavor_text_entries', []) if ft['language']['name'] == 'zh-Hans'), None)
-            if not desc_zh:
-                desc_zh = next((ft.get('flavor_text') or ft.get('text') for ft in move_detail.get('flavor_text_entries', []) if ft['language']['name'] == 'en'), None)
-            yield {
-                'id': move_detail['id'],
-                'name': move_detail['name'],
-                'name_zh': name_zh,
-                'type': move_detail.get('type', {}).get('name'),
-                'category': move_detail.get('damage_class', {}).get('name'),
-                'power': move_detail.get('power'),
-                'accuracy': move_detail.get('accuracy'),
-                'pp': move_detail.get('pp'),
-                'desc_en': next((eff['short_effect'] for eff in move_detail.get('effect_entries', []) if eff['language']['name'] == 'en'), None),
-                'desc': desc_zh,
-                'generation': move_detail.get('generation', {}).get('name', None),
-            }
+        with AsyncPokeAPIFetcher.from_config() as fetcher:
+            data = fetcher.get_json(url)
+            entries = PokemonDataService._claimed_entries(data.get('results', []), claim)
+            for move_detail in fetcher.iter_json(entry['url'] for entry in entries):
+                name_zh = next((n['name'] for n in move_detail.get('names', []) if n['language']['name'] == 'zh-Hans'), move_detail['name'])
+                desc_zh = next((ft.get('flavor_text') or ft.get('text') for ft in move_detail.get('flavor_text_entries', []) if ft['language']['name'] == 'zh-Hans'), None)
+                if not desc_zh:
+                    desc_zh = next((ft.get('flavor_text') or ft.get('text') for ft in move_detail.get('flavor_text_entries', []) if ft['language']['name'] == 'en'), None)
+                yield {
+                    'id': move_detail['id'],
+                    'name': move_detail['name'],
+                    'name_zh': name_zh,
+                    'type': move_detail.get('type', {}).get('name'),
+                    'category': move_detail.get('damage_class', {}).get('name'),
+                    'power': move_detail.get('power'),
+                    'accuracy': move_detail.get('accuracy'),
+                    'pp': move_detail.get('pp'),
+                    'desc_en': next((eff['short_effect'] for eff in move_detail.get('effect_entries', []) if eff['language']['name'] == 'en'), None),
+                    'desc': desc_zh,
+                    'generation': move_detail.get('generation', {}).get('name', None),
+                }
 
     @staticmethod
-    def fetch_items():
+    def fetch_items(claim=None):
         url = f"{PokemonDataService.POKEAPI_BASE_URL}/item?limit=10000&offset=0"
-        response = requests.get(url, **REQUESTS_KWARGS)
-        data = response.json()
-        for entry in data.get('results', []):
-            item_detail = requests.get(entry['url'], **REQUESTS_KWARGS).json()
-            name_zh = next((n['name'] for n in item_detail.get('names', []) if n['language']['name'] == 'zh-Hans'), item_detail['name'])
-            desc_zh = next((ft.get('flavor_text') or ft.get('text') for ft in item_detail.get('flavor_text_entries', []) if ft['language']['name'] == 'zh-Hans'), None)
-            if not desc_zh:
-                desc_zh = next((ft.get('flavor_text') or ft.get('text') for ft in item_detail.get('flavor_text_entries', []) if ft['language']['name'] == 'en'), None)
-            sprite = item_detail.get('sprites', {}).get('default')
-            yield {
-                'id': item_detail['id'],
-                'name': item_detail['name'],
-                'name_zh': name_zh,
-                'category': item_detail.get('category', {}).get('name', ''),
-                'desc_en': next((eff.get('effect') or eff.get('short_effect') for eff in item_detail.get('effect_entries', []) if eff['language']['name'] == 'en'), None),
-                'desc': desc_zh,
-                'sprite': sprite,
-                'generation': item_detail.get('generation', {}).get('name', None),
-            }
+        with AsyncPokeAPIFetcher.from_config() as fetcher:
+            data = fetcher.get_json(url)
+            entries = PokemonDataService._claimed_entries(data.get('results', []), claim)
+            for item_detail in fetcher.iter_json(entry['url'] for entry in entries):
+                name_zh = next((n['name'] for n in item_detail.get('names', []) if n['language']['name'] == 'zh-Hans'), item_detail['name'])
+                desc_zh = next((ft.get('flavor_text') or ft.get('text') for ft in item_detail.get('flavor_text_entries', []) if ft['language']['name'] == 'zh-Hans'), None)
+                if not desc_zh:
+                    desc_zh = next((ft.get('flavor_text') or ft.get('text') for ft in item_detail.get('flavor_text_entries', []) if ft['language']['name'] == 'en'), None)
+                sprite = item_detail.get('sprites', {}).get('default')
+                yield {
+                    'id': item_detail['id'],
+                    'name': item_detail['name'],
+                    'name_zh': name_zh,
+                    'category': item_detail.get('category', {}).get('name', ''),
+                    'desc_en': next((eff.get('effect') or eff.get('short_effect') for eff in item_detail.get('effect_entries', []) if eff['language']['name'] == 'en'), None),
+                    'desc': desc_zh,
+                    'sprite': sprite,
+                    'generation': item_detail.get('generation', {}).get('name', None),
+                }
 
     @staticmethod
-    def fetch_pokemon_species():
+    def fetch_pokemon_species(claim=None):
         url = f"{PokemonDataService.POKEAPI_BASE_URL}/pokemon-species?limit=10000&offset=0"
-        response = requests.get(url, **REQUESTS_KWARGS)
-        data = response.json()
-        for entry in data.get('results', []):
-            species_detail = requests.get(entry['url'], **REQUESTS_KWARGS).json()
-            name_zh = next((n['name'] for n in species_detail.get('names', []) if n['language']['name'] == 'zh-Hans'), species_detail['name'])
-            yield {
-                'id': species_detail['id'],
-                'name': species_detail['name'],
-                'name_zh': name_zh,
-                'gender_rate': species_detail.get('gender_rate'),
-                'generation': species_detail.get('generation', {}).get('name', None),
-            }
+        with AsyncPokeAPIFetcher.from_config() as fetcher:
+            data = fetcher.get_json(url)
+            entries = PokemonDataService._claimed_entries(data.get('results', []), claim)
+            for species_detail in fetcher.iter_json(entry['url'] for entry in entries):
+                name_zh = next((n['name'] for n in species_detail.get('names', []) if n['language']['name'] == 'zh-Hans'), species_detail['name'])
+                yield {
+                    'id': species_detail['id'],
+                    'name': species_detail['name'],
+                    'name_zh': name_zh,
+                    'gender_rate': species_detail.get('gender_rate'),
+                    'generation': species_detail.get('generation', {}).get('name', None),
+                }
 
     @staticmethod
-    def fetch_pokemons_v2():
-        # 分页拉取宝可梦数据，支持断点续传
+    def fetch_pokemons_v2(claim=None):
+        # 分页拉取宝可梦数据，每页内并发拉取详情
         url = f"{PokemonDataService.POKEAPI_BASE_URL}/pokemon"
         offset = 0
         limit = 100
-        while True:
-            params = {'limit': limit, 'offset': offset}
-            response = requests.get(url, params=params, **REQUESTS_KWARGS)
-            response.raise_for_status()
-            data = response.json()
-            if not data.get('results'):
-                break
-            for entry in data.get('results', []):
-                poke_detail = requests.get(entry['url'], **REQUESTS_KWARGS).json()
-                poke_id = poke_detail['id']
-                name = poke_detail['name']
-                sprite = poke_detail['sprites']['front_default']
-                types = [t['type']['name'] for t in poke_detail['types']]
-                base_stats = {s['stat']['name']: s['base_stat'] for s in poke_detail['stats']}
-                abilities = [a['ability']['name'] for a in poke_detail['abilities']]
-                is_default = poke_detail.get('is_default', True)
-                form_name = poke_detail.get('forms', [{}])[0].get('name') if poke_detail.get('forms') else None
-                # 物种信息
-                species_url = poke_detail['species']['url']
-                species_detail = requests.get(species_url, **REQUESTS_KWARGS).json()
-                species_id = species_detail['id']
-                name_zh = next((n['name'] for n in species_detail['names'] if n['language']['name'] == 'zh-Hans'), name)
-                gender_rate = species_detail.get('gender_rate')
-                generations = []
-                if 'generation' in species_detail:
-                    generations = [species_detail['generation']['name']]
-
-                # 形态中文名拼接逻辑
-                def get_form_zh(poke_name, form_name, species_name_zh):
-                    n = poke_name.lower()
-                    f = (form_name or '').lower() if form_name else ''
-                    # Mega
-                    if '-mega' in n:
-                        if n.endswith('-mega-x'):
-                            return f"{species_name_zh}-Mega-X"
-                        elif n.endswith('-mega-y'):
-                            return f"{species_name_zh}-Mega-Y"
-                        else:
-                            return f"{species_name_zh}-Mega"
-                    # 超极巨化
-                    if 'gmax' in n or 'gigantamax' in n:
-                        return f"{species_name_zh}-超极巨化"
-                    # 阿罗拉
-                    if 'alola' in n or 'alola' in f:
-                        return f"{species_name_zh}-阿罗拉"
-                    # 伽勒尔
-                    if 'galar' in n or 'galar' in f:
-                        return f"{species_name_zh}-伽勒尔"
-                    # 洗翠
-                    if 'hisui' in n or 'hisui' in f:
-                        return f"{species_name_zh}-洗翠"
-                    # 帕底亚
-                    if 'paldea' in n or 'paldea' in f:
-                        # 肯泰罗帕底亚三种
-                        if 'tauros' in n:
-                            if 'combat' in n:
-                                return f"{species_name_zh}-帕底亚·斗战种"
-                            elif 'blaze' in n:
-                                return f"{species_name_zh}-帕底亚·火炽种"
-                            elif 'aqua' in n:
-                                return f"{species_name_zh}-帕底亚·水澜种"
-                            else:
-                                return f"{species_name_zh}-帕底亚"
-                        return f"{species_name_zh}-帕底亚"
-                    # 武道熊师
-                    if 'urshifu' in n:
-                        if 'single-strike' in n:
-                            return f"{species_name_zh}-一击流"
-                        if 'rapid-strike' in n:
-                            return f"{species_name_zh}-连击流"
-                    # 洛托姆家族
-                    if 'rotom' in n:
-                        if 'heat' in n:
-                            return "加热洛托姆"
-                        if 'wash' in n:
-                            return "清洗洛托姆"
-                        if 'frost' in n:
-                            return "结冰洛托姆"
-                        if 'fan' in n:
-                            return "旋转洛托姆"
-                        if 'mow' in n:
-                            return "切割洛托姆"
-                    # 月月熊赫月
-                    if 'ursaluna' in n and 'bloodmoon' in n:
-                        return f"{species_name_zh}-赫月"
-                    # 厄诡椪
-                    if 'ogerpon' in n:
-                        if 'teal' in n:
-                            return f"{species_name_zh}-碧草面具"
-                        if 'wellspring' in n:
-                            return f"{species_name_zh}-水井面具"
-                        if 'cornerstone' in n:
-                            return f"{species_name_zh}-础石面具"
-                        if 'hearthflame' in n:
-                            return f"{species_name_zh}-火灶面具"
-                    # 太乐巴戈斯
-                    if 'terapagos' in n:
-                        if 'stellar' in n:
-                            return f"{species_name_zh}-星晶形态"
-                        if 'terrestrial' in n:
-                            return f"{species_name_zh}-太晶形态"
-                    # 其它情况：如有后缀，拼接英文后缀（首字母大写，多个后缀用-连接）
-                    if '-' in poke_name:
-                        base, *suffix = poke_name.split('-')
-                        if suffix:
-                            suffix_str = '-'.join([s.capitalize() for s in suffix])
-                            return f"{species_name_zh}-{suffix_str}"
-                    return species_name_zh
-
-                # 只在主形态时yield物种
-                if is_default:
-                    yield {
-                        'species_id': species_id,
-                        'name': name,
-                        'name_zh': name_zh,
-                        'gender_rate': gender_rate,
-                        'generations': generations,
-                        'is_default': True
-                    }
-                # 所有形态都yield形态数据
-                yield {
-                    'id': poke_id,
-                    'species_id': species_id,
-                    'name': name,
-                    'name_zh': get_form_zh(name, form_name, name_zh),
-                    'form_name': get_form_zh(name, form_name, form_name) if form_name else None,
-                    'form_name_zh_hans': get_form_zh(name, form_name, name_zh),
-                    'is_default': is_default,
-                    'sprite': sprite,
-                    'type_1': types[0] if types else None,
-                    'type_2': types[1] if len(types) > 1 else None,
-                    'base_hp': base_stats.get('hp'),
-                    'base_atk': base_stats.get('attack'),
-                    'base_def': base_stats.get('defense'),
-                    'base_spa': base_stats.get('special-attack'),
-                    'base_spd': base_stats.get('special-defense'),
-                    'base_spe': base_stats.get('speed'),
-                }
+        with AsyncPokeAPIFetcher.from_config() as fetcher:
+            while True:
+                data = fetcher.get_json(f"{url}?limit={limit}&offset={offset}")
+                if not data.get('results'):
+                    break
+                entries = PokemonDataService._claimed_entries(data.get('results', []), claim)
+                for poke_detail, species_detail in fetcher.imap(PokemonDataService._load_pokemon_with_species, entries):
+                    yield from PokemonDataService._build_pokemon_records(poke_detail, species_detail)
+                if not data.get('next'):
+                    break
+                offset += limit
+
+    @staticmethod
+    def _resolve_version_group_generations(version_groups):
+        """
+        解析版本组 -> 世代ID 映射（按版本组名称）。
+        优先使用本地 VersionGroup 表，本地缺失的版本组再并发拉取一次，整个同步过程中每个版本组最多请求一次。
+
+        :param version_groups: PokeAPI 的 {'name', 'url'} 引用列表
+        """
+        vg_gen_map = {vg.name: vg.generation_id for vg in VersionGroup.query.all() if vg.generation_id}
+        unresolved = {}
+        for vg in version_groups:
+            if vg['name'] not in vg_gen_map:
+                unresolved.setdefault(vg['name'], vg['url'])
+        if unresolved:
+            with AsyncPokeAPIFetcher.from_config() as fetcher:
+                for vg_data in fetcher.iter_json(list(unresolved.values())):
+                    gen_info = vg_data.get('generation') or {}
+                    if gen_info.get('url'):
+                        vg_gen_map[vg_data['name']] = PokemonDataService._resource_id_from_url(gen_info['url'])
+                    else:
+                        print(f"[GenSpeciesSync][Error] version_group数据异常: {vg_data.get('name')}")
+        return vg_gen_map
+
+    @staticmethod
+    def _insert_missing_generation_species(wanted):
+        """将 (generation_id, pokemon_species_id, version_group_id) 三元组集合中库里缺失的部分一次性批量插入，返回插入条数"""
+        if not wanted:
+            return 0
+        gps = generation_pokemon_species
+        species_ids = list({s for _, s, _ in wanted})
+        existing = set()
+        for i in range(0, len(species_ids), 500):
+            existing.update(db.session.execute(
+                select(gps.c.generation_id, gps.c.pokemon_species_id, gps.c.version_group_id)
+                .where(gps.c.pokemon_species_id.in_(species_ids[i:i + 500]))
+            ).all())
+        missing = [{'generation_id': g, 'pokemon_species_id': s, 'version_group_id': v} for g, s, v in wanted - existing]
+        if missing:
+            db.session.execute(gps.insert(), missing)
+        return len(missing)
 
     @staticmethod
     def fetch_and_sync_pokemon_generations():
         """
         基于pokedex+version_group统计每一世代可用宝可梦物种，并补充形态的初登场世代。
+        pokedex 与形态并发拉取；版本组 -> 世代只解析一次；三元组集合差分后一次批量写入。
         """
-        import requests
-        from ..models import Generation, PokemonSpecies, Pokemon, db
+        from sqlalchemy import func
         print('[GenSpeciesSync] 开始同步宝可梦-世代关系...')
-        # 1. 获取所有generation
-        generations = {g.id: g for g in Generation.query.all()}
-        # 2. 获取所有pokedex
-        pokedex_list = requests.get('https://pokeapi.co/api/v2/pokedex?limit=100&offset=0', **REQUESTS_KWARGS).json()['results']
+        resource_id = PokemonDataService._resource_id_from_url
+        # 1. 获取所有pokedex（并发拉取详情）
+        pokedex_list = PokemonDataService._get_json('https://pokeapi.co/api/v2/pokedex?limit=100&offset=0')['results']
+        with AsyncPokeAPIFetcher.from_config() as fetcher:
+            pokedexes = list(fetcher.iter_json([pdx['url'] for pdx in pokedex_list]))
+        # 2. 版本组 -> 世代，只解析一次
+        vg_gen_map = PokemonDataService._resolve_version_group_generations(
+            [vg for pdx_data in pokedexes for vg in pdx_data.get('version_groups', [])]
+        )
         # 3. 统计每个generation下所有species
         species_gen_map = {}  # species_id: set(generation_id)
-        for pdx in pokedex_list:
-            pdx_data = requests.get(pdx['url'], **REQUESTS_KWARGS).json()
-            # 通过pokedex的version_groups找到generation
-            version_groups = pdx_data.get('version_groups', [])
-            gen_ids = set()
-            for vg in version_groups:
-                vg_data = requests.get(vg['url'], **REQUESTS_KWARGS).json()
-                # 兼容 generation 字段为 dict 或 url
-                gen_info = vg_data.get('generation')
-                gen_id = None
-                if isinstance(gen_info, dict):
-                    gen_id = gen_info.get('id')
-                    if not gen_id and 'url' in gen_info:
-                        import re
-                        match = re.search(r'/generation/(\d+)/?$', gen_info['url'])
-                        if match:
-                            gen_id = int(match.group(1))
-                if not gen_id:
-                    print(f"[GenSpeciesSync][Error] version_group数据异常: {vg_data}")
-                    continue
-                gen_ids.add(gen_id)
+        for pdx_data in pokedexes:
+            gen_ids = {vg_gen_map[vg['name']] for vg in pdx_data.get('version_groups', []) if vg['name'] in vg_gen_map}
             for entry in pdx_data.get('pokemon_entries', []):
-                species_url = entry['pokemon_species']['url']
-                species_id = int(species_url.rstrip('/').split('/')[-1])
-                if species_id not in species_gen_map:
-                    species_gen_map[species_id] = set()
-                species_gen_map[species_id].update(gen_ids)
-        # 4. 写入generation_pokemon_species（含version_group_id）
-        from sqlalchemy import text
+                species_id = resource_id(entry['pokemon_species']['url'])
+                species_gen_map.setdefault(species_id, set()).update(gen_ids)
+        # 4. 写入generation_pokemon_species（含version_group_id）；
+        #    已有的物种-世代关系同样补齐该世代下的所有版本组
         vg_map = {}
         for vg in VersionGroup.query.all():
             vg_map.setdefault(vg.generation_id, []).append(vg.id)
-        conn = db.engine.connect()
-        inserted = 0
-        for species_id, gen_ids in species_gen_map.items():
-            for gen_id in gen_ids:
-                vgs = vg_map.get(gen_id, [])
-                for vg_id in vgs:
-                    exists = conn.execute(text('SELECT 1 FROM generation_pokemon_species WHERE generation_id=:g AND pokemon_species_id=:s AND version_group_id=:v'), {'g': gen_id, 's': species_id, 'v': vg_id}).fetchone()
-                    if not exists:
-                        conn.execute(text('INSERT INTO generation_pokemon_species (generation_id, pokemon_species_id, version_group_id) VALUES (:g, :s, :v)'), {'g': gen_id, 's': species_id, 'v': vg_id})
-                        inserted += 1
-        conn.commit()
-        conn.close()
-        print(f'[GenSpeciesSync] generation_pokemon_species 初始写入完成，插入 {inserted} 条记录')
+        gps = generation_pokemon_species
+        pairs = {(gen_id, species_id) for species_id, gen_ids in species_gen_map.items() for gen_id in gen_ids}
+        pairs.update(db.session.execute(select(gps.c.generation_id, gps.c.pokemon_species_id).distinct()).all())
+        known_species = {row[0] for row in db.session.query(PokemonSpecies.id)}
+        wanted = {
+            (gen_id, species_id, vg_id)
+            for gen_id, species_id in pairs if species_id in known_species
+            for vg_id in vg_map.get(gen_id, [])
+        }
+        inserted = PokemonDataService._insert_missing_generation_species(wanted)
+        db.session.commit()
+        sync_metrics.record_changes(inserted)
+        print(f'[GenSpeciesSync] generation_pokemon_species 写入完成，插入 {inserted} 条记录')
         print('[GenSpeciesSync] 物种-世代关系同步完成')
-        # 5. 处理形态的初登场世代
+        # 5. 处理形态的初登场世代（并发拉取 pokemon-form）
         all_pokemon = Pokemon.query.all()
-        for poke in all_pokemon:
-            if not poke.is_default:
-                # 形态，需查form
-                form_url = f'https://pokeapi.co/api/v2/pokemon-form/{poke.name}/'
-                try:
-                    form_data = requests.get(form_url, **REQUESTS_KWARGS).json()
-                    # 形态的generation通过form_data['version_group']['url']
-                    vg_info = form_data.get('version_group')
-                    vg_id = None
-                    if vg_info:
-                        if 'id' in vg_info:
-                            vg_id = vg_info['id']
-                        elif 'url' in vg_info:
-                            import re
-                            match = re.search(r'/version-group/(\d+)/?$', vg_info['url'])
-                            if match:
-                                vg_id = int(match.group(1))
-                    if vg_id:
-                        vg_data = requests.get(f'https://pokeapi.co/api/v2/version-group/{vg_id}/', **REQUESTS_KWARGS).json()
-                        gen_info = vg_data.get('generation')
-                        gen_id = None
-                        if isinstance(gen_info, dict):
-                            gen_id = gen_info.get('id')
-                            if not gen_id and 'url' in gen_info:
-                                match = re.search(r'/generation/(\d+)/?$', gen_info['url'])
-                                if match:
-                                    gen_id = int(match.group(1))
-                        if not gen_id and isinstance(gen_info, str):
-                            match = re.search(r'/generation/(\d+)/?$', gen_info)
-                            if match:
-                                gen_id = int(match.group(1))
-                        if gen_id:
-                            poke.first_generation_id = gen_id
-                            db.session.add(poke)
-                        else:
-                            print(f"[GenSpeciesSync][Warn] 拉取形态{poke.name} generation_id失败: {vg_data}")
-                    else:
-                        print(f"[GenSpeciesSync][Warn] 拉取形态{poke.name} version_group_id失败: {form_data}")
-                except Exception as e:
-                    print(f"[GenSpeciesSync][Warn] 拉取形态{poke.name}初登场世代失败: {e}")
+        alt_forms = [poke for poke in all_pokemon if not poke.is_default]
+        changed = 0
+
+        async def load_form(fetcher, poke):
+            return poke, await fetcher.fetch_json(f'https://pokeapi.co/api/v2/pokemon-form/{poke.name}/')
+
+        with AsyncPokeAPIFetcher.from_config() as fetcher:
+            for poke, form_data in fetcher.imap(load_form, alt_forms):
+                vg_info = form_data.get('version_group')
+                if not vg_info:
+                    print(f"[GenSpeciesSync][Warn] 拉取形态{poke.name} version_group_id失败: {form_data}")
+                    continue
+                gen_id = vg_gen_map.get(vg_info['name'])
+                if gen_id is None:
+                    gen_id = PokemonDataService._resolve_version_group_generations([vg_info]).get(vg_info['name'])
+                    if gen_id is not None:
+                        vg_gen_map[vg_info['name']] = gen_id
+                if gen_id:
+                    changed += poke.first_generation_id != gen_id
+                    poke.first_generation_id = gen_id
+                else:
+                    print(f"[GenSpeciesSync][Warn] 拉取形态{poke.name} generation_id失败: {vg_info}")
         db.session.commit()
-        print('[GenSpeciesSync] 形态初登场世代补全完成')
-        # 6. 主形态补全 first_generation_id
-        all_species = {s.id: s for s in PokemonSpecies.query.all()}
+        sync_metrics.record_changes(changed)
+        changed = 0
+        print(f'[GenSpeciesSync] 形态初登场世代补全完成（{len(alt_forms)} 个形态）')
+        # 6. 主形态补全 first_generation_id：一次聚合查询取每个物种的最早世代
+        min_gen_by_species = dict(db.session.execute(
+            select(gps.c.pokemon_species_id, func.min(gps.c.generation_id)).group_by(gps.c.pokemon_species_id)
+        ).all())
         for poke in all_pokemon:
-            if poke.is_default:
-                # 查找物种的所有世代
-                species = all_species.get(poke.species_id)
-                if species and species.generations:
-                    min_gen = min([g.id for g in species.generations])
-                    poke.first_generation_id = min_gen
-                    db.session.add(poke)
+            if poke.is_default and poke.species_id in min_gen_by_species:
+                changed += poke.first_generation_id != min_gen_by_species[poke.species_id]
+                poke.first_generation_id = min_gen_by_species[poke.species_id]
         db.session.commit()
+        sync_metrics.record_changes(changed)
         print('[GenSpeciesSync] 主形态 first_generation_id 补全完成')
-        # 7. generation_pokemon_species version_group_id 补全
-        from sqlalchemy import text
-        print('[GenSpeciesSync] 开始补全 generation_pokemon_species.version_group_id ...')
-        # 获取所有 generation_id -> version_group_id 列表
-        vg_map = {}
-        for vg in VersionGroup.query.all():
-            vg_map.setdefault(vg.generation_id, []).append(vg.id)
-        # 获取所有物种-世代关系
-        conn = db.engine.connect()
-        res = conn.execute(text('SELECT generation_id, pokemon_species_id FROM generation_pokemon_species')).fetchall()
-        to_insert = []
-        for row in res:
-            gen_id, species_id = row
-            vgs = vg_map.get(gen_id, [])
-            for vg_id in vgs:
-                # 检查是否已存在该三元组
-                exists = conn.execute(text('SELECT 1 FROM generation_pokemon_species WHERE generation_id=:g AND pokemon_species_id=:s AND version_group_id=:v'), {'g': gen_id, 's': species_id, 'v': vg_id}).fetchone()
-                if not exists:
-                    to_insert.append({'generation_id': gen_id, 'pokemon_species_id': species_id, 'version_group_id': vg_id})
-        # 批量插入
-        if to_insert:
-            print(f'[GenSpeciesSync] 需补全 {len(to_insert)} 条 generation_pokemon_species.version_group_id ...')
-            for rec in to_insert:
-                conn.execute(text('INSERT INTO generation_pokemon_species (generation_id, pokemon_species_id, version_group_id) VALUES (:g, :s, :v)'), {'g': rec['generation_id'], 's': rec['pokemon_species_id'], 'v': rec['version_group_id']})
-            conn.commit()
-        else:
-            print('[GenSpeciesSync] 无需补全 generation_pokemon_species.version_group_id')
-        conn.close()
-        print('[GenSpeciesSync] generation_pokemon_species.version_group_id 补全完成')
+
+    @staticmethod
+    def _collect_learnset_keys(poke_datas, move_name_to_id, version_group_name_to_id, log_missing=False):
+        """从一个物种各形态的 pokemon 详情中提取去重后的 (move_id, version_group_id, learn_method, level) 集合"""
+        keys = set()
+        for poke_data in poke_datas:
+            for move in poke_data.get('moves', []):
+                move_name = move['move']['name']
+                move_id = move_name_to_id.get(move_name)
+                if not move_id:
+                    if log_missing:
+                        print(f"[LearnsetSync][Warn] 未找到move_id: {move_name}")
+                    continue
+                for detail in move.get('version_group_details', []):
+                    vg_name = detail['version_group']['name']
+                    vg_id = version_group_name_to_id.get(vg_name)
+                    if not vg_id:
+                        if log_missing:
+                            print(f"[LearnsetSync][Warn] 未找到version_group_id: {vg_name}")
+                        continue
+                    keys.add((move_id, vg_id, detail['move_learn_method']['name'], detail.get('level_learned_at')))
+        return keys
+
+    @staticmethod
+    def _write_species_learnset(species_id, keys, prune=False, chunk_size=1000):
+        """集合差分写入单个物种的招式学习表：一次查询取出已有键，只批量插入新增行，prune=True 时删除已消失的行。
+
+        :return: (inserted, deleted)
+        """
+        existing = {
+            (row.move_id, row.version_group_id, row.learn_method, row.level): row.id
+            for row in db.session.query(
+                PokemonMoveLearnset.id,
+                PokemonMoveLearnset.move_id,
+                PokemonMoveLearnset.version_group_id,
+                PokemonMoveLearnset.learn_method,
+                PokemonMoveLearnset.level
+            ).filter(PokemonMoveLearnset.pokemon_species_id == species_id)
+        }
+        new_rows = [{
+            'pokemon_species_id': species_id,
+            'move_id': move_id,
+            'version_group_id': vg_id,
+            'learn_method': learn_method,
+            'level': level
+        } for (move_id, vg_id, learn_method, level) in keys - existing.keys()]
+        for i in range(0, len(new_rows), chunk_size):
+            db.session.execute(PokemonMoveLearnset.__table__.insert(), new_rows[i:i + chunk_size])
+        deleted = 0
+        if prune:
+            stale_ids = [row_id for key, row_id in existing.items() if key not in keys]
+            for i in range(0, len(stale_ids), chunk_size):
+                db.session.execute(PokemonMoveLearnset.__table__.delete().where(PokemonMoveLearnset.id.in_(stale_ids[i:i + chunk_size])))
+            deleted = len(stale_ids)
+        return len(new_rows), deleted
+
+    @staticmethod
+    async def _load_species_varieties(fetcher, species_id):
+        """异步拉取物种详情及其所有形态（varieties）的 pokemon 详情"""
+        species_data = await fetcher.fetch_json(f'{PokemonDataService.POKEAPI_BASE_URL}/pokemon-species/{species_id}/')
+        poke_datas = await asyncio.gather(*(
+            fetcher.fetch_json(var['pokemon']['url']) for var in species_data.get('varieties', [])
+        ))
+        return species_id, poke_datas
 
     @staticmethod
     def fetch_and_sync_pokemon_move_learnsets():
         """
         拉取所有宝可梦物种的所有可学会招式-世代-学习方式数据，写入PokemonMoveLearnset表。
-        支持断点续拉、唯一约束、详细日志和异常捕获。
+        先获取物种锁再并发预取（只拉取本进程认领的物种）；写入时每个物种只查询一次已有记录，集合差分后批量插入。
         """
-        import requests
-        import time
-        from sqlalchemy.exc import IntegrityError, OperationalError
-        from ..models import PokemonSpecies, Move, VersionGroup, PokemonMoveLearnset, db
+        from sqlalchemy.exc import OperationalError
         print('[LearnsetSync] 开始同步宝可梦招式学习表...')
-        species_list = PokemonSpecies.query.all()
+        species_ids = [row[0] for row in db.session.query(PokemonSpecies.id).order_by(PokemonSpecies.id)]
         move_name_to_id = {m.name: m.id for m in Move.query.all()}
         version_group_name_to_id = {vg.name: vg.id for vg in VersionGroup.query.all()}
-        total = len(species_list)
-        with db.session.no_autoflush:
-            for idx, species in enumerate(species_list):
-                # 物种级别redis锁
-                species_lock_key = f'sync:pokemon_move_learnset:species:lock:{species.id}'
-                species_lock_value = str(random.random())
-                got_species_lock = redis_service.redis_client.set(species_lock_key, species_lock_value, nx=True, ex=1800)
-                if not got_species_lock:
-                    print(f"[LearnsetSync] species_id={species.id} 已有其他同步进程在同步，跳过")
+        prune = current_app.config.get('LEARNSET_SYNC_PRUNE', False)
+        total = len(species_ids)
+        # 幂等标记，已同步的物种不再拉取
+        done_flags = redis_service.get_many(f'sync:pokemon_move_learnset:species:done:{sid}' for sid in species_ids)
+        pending_ids = [sid for sid, done in zip(species_ids, done_flags) if not done]
+        print(f"[LearnsetSync] 共 {total} 个物种，待同步 {len(pending_ids)} 个")
+        inserted_total = deleted_total = 0
+        lock_key = 'sync:pokemon_move_learnset:species:lock:{}'.format
+        done_key = 'sync:pokemon_move_learnset:species:done:{}'.format
+        held = {}  # 本进程持有锁的物种 -> 锁的值
+
+        def claim_species():
+            """先获取物种级 Redis 锁再交给 imap 拉取：被其他进程持有或已完成的物种不发起请求"""
+            for species_id in pending_ids:
+                lock_value = str(random.random())
+                if not PokemonDataService._acquire_lock(lock_key(species_id), lock_value, 1800):
+                    print(f"[LearnsetSync] species_id={species_id} 已有其他同步进程在同步，跳过")
                     continue
-                try:
-                    # 幂等标记，已同步则跳过
-                    species_done_key = f'sync:pokemon_move_learnset:species:done:{species.id}'
-                    if redis_service.get(species_done_key):
-                        print(f"[LearnsetSync] species_id={species.id} 已同步，跳过")
-                        continue
-                    retry = 0
-                    while retry < 3:
-                        try:
-                            url = f'https://pokeapi.co/api/v2/pokemon-species/{species.id}/'
-                            species_data = requests.get(url, **REQUESTS_KWARGS).json()
-                            varieties = species_data.get('varieties', [])
-                            for var in varieties:
-                                poke_url = var['pokemon']['url']
-                                poke_data = requests.get(poke_url, **REQUESTS_KWARGS).json()
-                                for move in poke_data.get('moves', []):
-                                    move_name = move['move']['name']
-                                    move_id = move_name_to_id.get(move_name)
-                                    if not move_id:
-                                        print(f"[LearnsetSync][Warn] 未找到move_id: {move_name}")
-                                        continue
-                                    for detail in move.get('version_group_details', []):
-                                        vg_name = detail['version_group']['name']
-                                        vg_id = version_group_name_to_id.get(vg_name)
-                                        if not vg_id:
-                                            print(f"[LearnsetSync][Warn] 未找到version_group_id: {vg_name}")
-                                            continue
-                                        learn_method = detail['move_learn_method']['name']
-                                        level = detail.get('level_learned_at')
-                                        exists = PokemonMoveLearnset.query.filter_by(
-                                            pokemon_species_id=species.id,
-                                            move_id=move_id,
-                                            version_group_id=vg_id,
-                                            learn_method=learn_method,
-                                            level=level
-                                        ).first()
-                                        if exists:
-                                            continue
-                                        obj = PokemonMoveLearnset(
-                                            pokemon_species_id=species.id,
-                                            move_id=move_id,
-                                            version_group_id=vg_id,
-                                            learn_method=learn_method,
-                                            level=level
-                                        )
-                                        try:
-                                            db.session.add(obj)
-                                            db.session.flush()
-                                        except IntegrityError as ie:
-                                            print(f"[LearnsetSync][Integrity] Duplicate entry: species_id={species.id}, move_id={move_id}, vg_id={vg_id}, method={learn_method}, level={level}")
-                                            db.session.rollback()
-                                            continue
-                            db.session.commit()
-                            # 同步成功后写入redis done标记
-                            redis_service.set(species_done_key, '1')
-                            if idx % 20 == 0:
-                                print(f"[LearnsetSync] 进度: {idx+1}/{total}")
-                            break  # 成功则跳出重试
-                        except OperationalError as oe:
-                            if 'database is locked' in str(oe):
-                                print(f"[LearnsetSync][Locked] database is locked, rollback & retry {retry+1}/3...")
+                # 读取 done 标记之后，其他进程可能已完成该物种
+                if redis_service.redis_client.exists(done_key(species_id)):
+                    PokemonDataService._release_lock(lock_key(species_id), lock_value)
+                    continue
+                held[species_id] = lock_value
+                yield species_id
+
+        try:
+            with AsyncPokeAPIFetcher.from_config() as fetcher:
+                for idx, (species_id, poke_datas) in enumerate(fetcher.imap(PokemonDataService._load_species_varieties, claim_species())):
+                    try:
+                        keys = PokemonDataService._collect_learnset_keys(poke_datas, move_name_to_id, version_group_name_to_id, log_missing=True)
+                        retry = 0
+                        while retry < 3:
+                            try:
+                                with sync_metrics.time_db_write(len(keys)):
+                                    inserted, deleted = PokemonDataService._write_species_learnset(species_id, keys, prune=prune)
+                                    db.session.commit()
+                                sync_metrics.record_items()
+                                sync_metrics.record_changes(inserted + deleted)
+                                inserted_total += inserted
+                                deleted_total += deleted
+                                # 同步成功后写入redis done标记
+                                redis_service.set(done_key(species_id), '1')
+                                if idx % 20 == 0:
+                                    print(f"[LearnsetSync] 进度: {idx+1}/{len(pending_ids)}")
+                                break  # 成功则跳出重试
+                            except OperationalError as oe:
+                                db.session.rollback()
+                                if 'database is locked' in str(oe):
+                                    print(f"[LearnsetSync][Locked] database is locked, rollback & retry {retry+1}/3...")
+                                    time.sleep(1 + retry)
+                                    retry += 1
+                                else:
+                                    print(f"[LearnsetSync][Error] species_id={species_id}: {oe}")
+                                    import traceback
+                                    traceback.print_exc()
+                                    break
+                            except Exception as e:
                                 db.session.rollback()
-                                time.sleep(1 + retry)
-                                retry += 1
-                            else:
-                                print(f"[LearnsetSync][Error] species_id={species.id} name={species.name}: {oe}")
+                                print(f"[LearnsetSync][Error] species_id={species_id}: {e}")
                                 import traceback
                                 traceback.print_exc()
                                 break
-                        except Exception as e:
-                            print(f"[LearnsetSync][Error] species_id={species.id} name={species.name}: {e}")
-                            import traceback
-                            traceback.print_exc()
-                            break
-                finally:
-                    # 只释放自己加的锁
-                    if redis_service.redis_client.get(species_lock_key) == species_lock_value.encode():
-                        redis_service.redis_client.delete(species_lock_key)
-        print('[LearnsetSync] 全部同步完成')
+                    finally:
+                        # 只释放自己加的锁
+                        PokemonDataService._release_lock(lock_key(species_id), held.pop(species_id))
+        finally:
+            # 拉取失败被 imap 跳过的物种，以及异常退出时尚未处理的物种
+            for species_id, lock_value in held.items():
+                PokemonDataService._release_lock(lock_key(species_id), lock_value)
+        print(f'[LearnsetSync] 全部同步完成，新增 {inserted_total} 条，删除 {deleted_total} 条')
 
     @staticmethod
     def patch_missing_pokemon_move_learnsets():
         """
         仅补全本地 pokemon_move_learnset 表中缺失的 species_id 的数据，不再新请求已存在的。
         """
-        import requests
-        from ..models import PokemonMoveLearnset, db
         # 1. 获取 PokeAPI 物种总数
         url = "https://pokeapi.co/api/v2/pokemon-species?limit=1"
-        resp = requests.get(url, **REQUESTS_KWARGS)
-        data = resp.json()
+        data = PokemonDataService._get_json(url)
         max_species_id = data["count"]
         print(f"[LearnsetPatch] PokeAPI 物种总数: {max_species_id}")
         # 2. 查询本地已同步的 species_id
@@ -1474,73 +1829,48 @@ class PokemonDataService:
                 # 直接调用单物种 learnset 同步逻辑
                 PokemonDataService.sync_single_pokemon_move_learnset(species_id)
             except Exception as e:
+                db.session.rollback()
                 print(f"[LearnsetPatch][Error] species_id={species_id}: {e}")
         print("[LearnsetPatch] 补全完成")
 
     @staticmethod
-    def sync_single_pokemon_move_learnset(species_id):
+    def sync_single_pokemon_move_learnset(species_id, move_name_to_id=None, version_group_name_to_id=None, prune=None):
         """
         同步单个物种的 learnset 数据，已存在则跳过。
+        批量调用时可传入 move/version_group 名称到ID的映射，避免每个物种重复加载。
         """
-        import requests
-        from sqlalchemy.exc import IntegrityError, OperationalError
-        from ..models import Move, VersionGroup, PokemonMoveLearnset, db
-        move_name_to_id = {m.name: m.id for m in Move.query.all()}
-        version_group_name_to_id = {vg.name: vg.id for vg in VersionGroup.query.all()}
+        if move_name_to_id is None:
+            move_name_to_id = {m.name: m.id for m in Move.query.all()}
+        if version_group_name_to_id is None:
+            version_group_name_to_id = {vg.name: vg.id for vg in VersionGroup.query.all()}
+        if prune is None:
+            prune = current_app.config.get('LEARNSET_SYNC_PRUNE', False)
         url = f'https://pokeapi.co/api/v2/pokemon-species/{species_id}/'
-        species_data = requests.get(url, **REQUESTS_KWARGS).json()
-        varieties = species_data.get('varieties', [])
-        with db.session.no_autoflush:
-            for var in varieties:
-                poke_url = var['pokemon']['url']
-                poke_data = requests.get(poke_url, **REQUESTS_KWARGS).json()
-                for move in poke_data.get('moves', []):
-                    move_name = move['move']['name']
-                    move_id = move_name_to_id.get(move_name)
-                    if not move_id:
-                        continue
-                    for detail in move.get('version_group_details', []):
-                        vg_name = detail['version_group']['name']
-                        vg_id = version_group_name_to_id.get(vg_name)
-                        if not vg_id:
-                            continue
-                        learn_method = detail['move_learn_method']['name']
-                        level = detail.get('level_learned_at')
-                        exists = PokemonMoveLearnset.query.filter_by(
-                            pokemon_species_id=species_id,
-                            move_id=move_id,
-                            version_group_id=vg_id,
-                            learn_method=learn_method,
-                            level=level
-                        ).first()
-                        if exists:
-                            continue
-                        obj = PokemonMoveLearnset(
-                            pokemon_species_id=species_id,
-                            move_id=move_id,
-                            version_group_id=vg_id,
-                            learn_method=learn_method,
-                            level=level
-                        )
-                        try:
-                            db.session.add(obj)
-                            db.session.flush()
-                        except IntegrityError:
-                            db.session.rollback()
-                            continue
-            db.session.commit()
-        print(f"[LearnsetPatch] species_id={species_id} 补全完成")
+        species_data = PokemonDataService._get_json(url)
+        poke_datas = [PokemonDataService._get_json(var['pokemon']['url']) for var in species_data.get('varieties', [])]
+        keys = PokemonDataService._collect_learnset_keys(poke_datas, move_name_to_id, version_group_name_to_id)
+        inserted, deleted = PokemonDataService._write_species_learnset(species_id, keys, prune=prune)
+        db.session.commit()
+        sync_metrics.record_changes(inserted + deleted)
+        print(f"[LearnsetPatch] species_id={species_id} 补全完成，新增 {inserted} 条，删除 {deleted} 条")
 
     @staticmethod
     def get_generations_with_version_groups():
         """
         获取所有世代及其关联的版本组信息。
         """
-        cache_key = "generations_with_version_groups"
-        cached_data = redis_service.get(cache_key)
-        if cached_data:
-            return json.loads(cached_data.decode('utf-8'))
+        snapshot = reference_snapshot.current()
+        if snapshot is not None:
+            return [{
+                'id': gen.id,
+                'name': gen.name,
+                'version_groups': [{'id': vg.id, 'name': vg.name} for vg in snapshot.version_groups_by_generation.get(gen.id, ())]
+            } for gen in snapshot.generations.values()]
 
+        return dataset_cache.get_or_fill("generations_with_version_groups", PokemonDataService._load_generations_with_version_groups)
+
+    @staticmethod
+    def _load_generations_with_version_groups():
         generations = Generation.query.order_by(Generation.id).all()
         results = []
         for gen in generations:
@@ -1553,14 +1883,15 @@ class PokemonDataService:
                     'name': vg.name # e.g., scarlet-violet
                 } for vg in vgs]
             })
-        
-        redis_service.set(cache_key, json.dumps(results), expire=3600 * 24) # Cache for a day
         return results
 
     @staticmethod
     def _acquire_lock(lock_key: str, lock_value: str, expire_seconds: int) -> bool:
         """尝试获取 Redis 锁。"""
-        return redis_service.redis_client.set(lock_key, lock_value, nx=True, ex=expire_seconds)
+        acquired = redis_service.redis_client.set(lock_key, lock_value, nx=True, ex=expire_seconds)
+        if not acquired:
+            sync_metrics.record_lock_contention()
+        return acquired
 
     @staticmethod
     def _release_lock(lock_key: str, lock_value: str):
@@ -1568,12 +1899,73 @@ class PokemonDataService:
         if redis_service.redis_client.get(lock_key) == lock_value.encode(): # Redis stores bytes
             redis_service.redis_client.delete(lock_key)
 
+    @staticmethod
+    def sync_single_pokemon_form_abilities(pokemon_form_id: int, ability_cache: dict | None = None) -> int:
+        """
+        同步单个宝可梦形态的特性映射，已有映射且未开启强制刷新时跳过。
+        失败时回滚并抛出异常，由调用方决定跳过或重试。
+
+        :return: 写入的映射条数
+        """
+        from sqlalchemy.exc import IntegrityError
+        if ability_cache is None:
+            ability_cache = {ab.name: ab.id for ab in Ability.query.all()}
+        # 这是一个幂等性检查，可以防止不必要的 API 请求
+        existing_map_count = PokemonFormAbilityMap.query.filter_by(pokemon_form_id=pokemon_form_id).count()
+        if existing_map_count > 0 and not current_app.config.get('FORCE_REFRESH_FORM_ABILITIES_EVEN_IF_EXISTS', False):
+            current_app.logger.debug(f"[FormAbilitySync] Skipping form ID {pokemon_form_id}, found {existing_map_count} existing entries.")
+            return 0
+
+        pokemon_api_details = PokemonDataService.get_pokemon_details(pokemon_form_id)
+        raw_abilities_from_api = pokemon_api_details.get('abilities', [])
+        if not raw_abilities_from_api:
+            current_app.logger.debug(f"[FormAbilitySync] No abilities found in API for form ID {pokemon_form_id}")
+            return 0
+
+        new_mappings = []
+        for api_ab_info in raw_abilities_from_api:
+            ability_name_en = api_ab_info.get('ability', {}).get('name')
+            is_hidden = api_ab_info.get('is_hidden', False)
+
+            if not ability_name_en:
+                current_app.logger.warning(f"[FormAbilitySync] Missing ability name in API data for form ID {pokemon_form_id}, data: {api_ab_info}")
+                continue
+
+            ability_id = ability_cache.get(ability_name_en)
+            if not ability_id:
+                current_app.logger.error(f"[FormAbilitySync] Ability '{ability_name_en}' not found in local DB cache for form ID {pokemon_form_id}. Ensure abilities table is fully synced.")
+                continue
+
+            new_mappings.append(PokemonFormAbilityMap(
+                pokemon_form_id=pokemon_form_id,
+                ability_id=ability_id,
+                is_hidden=is_hidden
+            ))
+
+        if not new_mappings:
+            return 0
+        try:
+            with sync_metrics.time_db_write(len(new_mappings)):
+                db.session.bulk_save_objects(new_mappings) # 更高效的批量插入
+                db.session.commit()
+        except IntegrityError as ie:
+            db.session.rollback()
+            current_app.logger.error(f"[FormAbilitySync] IntegrityError for form ID {pokemon_form_id}: {ie}. Likely duplicate entry if not clearing old ones.")
+            raise
+        except Exception:
+            db.session.rollback()
+            raise
+        sync_metrics.record_changes(len(new_mappings))
+        current_app.logger.debug(f"[FormAbilitySync] Added/Updated {len(new_mappings)} ability mappings for form ID {pokemon_form_id}")
+        return len(new_mappings)
+
     @staticmethod
     def fetch_and_sync_pokemon_form_abilities():
         """
         Fetches ability information for each Pokemon form from PokeAPI 
         and syncs it to the PokemonFormAbilityMap table.
         Uses Redis lock per pokemon_form_id to prevent concurrent processing.
+        For multi-process sync, use enqueue_pokemon_form_ability_tasks() + run_sync_worker() instead.
         """
         current_app.logger.info("[FormAbilitySync] Starting sync for Pokemon form abilities...")
         
@@ -1590,93 +1982,22 @@ class PokemonDataService:
             # 使用唯一的 lock_value，以便安全地释放锁
             current_lock_value = f"{lock_value_prefix}{poke_form.id}"
 
-            # 检查是否已完成（幂等性标记）
-            # 你可以考虑使用一个更持久的标记，例如在成功处理后写入数据库或一个专门的 Redis set
-            # 这里的 existing_map_count 只是一个简单的本地检查，不是一个完整的"已完成"标记
-            # 我们可以在成功获取锁之后，再检查一个更可靠的"已完成"标记 (例如 Redis set)
-            # done_marker_key = f"done:sync_form_abilities:{poke_form.id}"
-            # if redis_service.redis_client.exists(done_marker_key):
-            #    current_app.logger.debug(f"[FormAbilitySync] Skipping {poke_form.name} (ID: {poke_form.id}), marked as done.")
-            #    continue
-
             if not PokemonDataService._acquire_lock(form_lock_key, current_lock_value, default_lock_expiry):
                 current_app.logger.info(f"[FormAbilitySync] Skipping {poke_form.name} (ID: {poke_form.id}), another process may be handling it or lock timed out.")
                 continue
             
             try:
-                # 在获得锁之后，再次检查是否真的需要处理（例如，如果之前的进程在释放锁前已完成）
-                # 这是一个更强的幂等性检查，可以防止不必要的 API 请求
-                # 此处我们仍然使用 existing_map_count 作为示例，但理想情况下应结合更持久的完成标记
-                existing_map_count = PokemonFormAbilityMap.query.filter_by(pokemon_form_id=poke_form.id).count()
-                if existing_map_count > 0 and not current_app.config.get('FORCE_REFRESH_FORM_ABILITIES_EVEN_IF_EXISTS', False):
-                    current_app.logger.debug(f"[FormAbilitySync] Skipping {poke_form.name} (ID: {poke_form.id}) after acquiring lock, found {existing_map_count} existing entries.")
-                    # redis_service.redis_client.set(done_marker_key, "1", ex=3600*24*7) # Mark as done for 7 days
-                    continue # 跳过，但确保释放锁
-                
-                # 实际处理逻辑
-                pokemon_api_details = PokemonDataService.get_pokemon_details(poke_form.id) 
-                raw_abilities_from_api = pokemon_api_details.get('abilities', [])
-
-                if not raw_abilities_from_api:
-                    current_app.logger.debug(f"[FormAbilitySync] No abilities found in API for {poke_form.name} (ID: {poke_form.id})")
-                    # 即使没有特性，也应该标记为"已处理"以避免重复检查
-                    # redis_service.redis_client.set(done_marker_key, "1", ex=3600*24*7)
-                    continue # 跳过，但确保释放锁
-
-                new_mappings = []
-                # 如果需要，在写入前清除旧的 mappings for this poke_form.id
-                # if current_app.config.get('FORCE_REFRESH_FORM_ABILITIES_EVEN_IF_EXISTS', False):
-                #     PokemonFormAbilityMap.query.filter_by(pokemon_form_id=poke_form.id).delete()
-                #     db.session.commit() # 提交删除操作
-                    
-                for api_ab_info in raw_abilities_from_api:
-                    ability_name_en = api_ab_info.get('ability', {}).get('name')
-                    is_hidden = api_ab_info.get('is_hidden', False)
-
-                    if not ability_name_en:
-                        current_app.logger.warn(f"[FormAbilitySync] Missing ability name in API data for {poke_form.name}, data: {api_ab_info}")
-                        continue
-
-                    ability_id = ability_cache.get(ability_name_en)
-                    if not ability_id:
-                        current_app.logger.error(f"[FormAbilitySync] Ability '{ability_name_en}' not found in local DB cache for Pokemon {poke_form.name}. Ensure abilities table is fully synced.")
-                        continue
-                    
-                    # 避免重复添加（如果上面没有清除旧条目）
-                    # 在事务中，可以不预先检查，依靠数据库的唯一约束，但捕获 IntegrityError
-                    new_map_entry = PokemonFormAbilityMap(
-                        pokemon_form_id=poke_form.id,
-                        ability_id=ability_id,
-                        is_hidden=is_hidden
-                    )
-                    new_mappings.append(new_map_entry)
-                
-                if new_mappings:
-                    try:
-                        db.session.bulk_save_objects(new_mappings) # 更高效的批量插入
-                        db.session.commit()
-                        current_app.logger.debug(f"[FormAbilitySync] Added/Updated {len(new_mappings)} ability mappings for {poke_form.name} (ID: {poke_form.id})")
-                        # redis_service.redis_client.set(done_marker_key, "1", ex=3600*24*7) # 标记为完成
-                    except IntegrityError as ie:
-                        db.session.rollback()
-                        current_app.logger.error(f"[FormAbilitySync] IntegrityError for {poke_form.name}: {ie}. Likely duplicate entry if not clearing old ones.")
-                    except Exception as commit_e:
-                        db.session.rollback()
-                        current_app.logger.error(f"[FormAbilitySync] Error committing mappings for {poke_form.name}: {commit_e}")
-                # else:
-                    # redis_service.redis_client.set(done_marker_key, "1", ex=3600*24*7) # 如果没有新特性，也标记为完成
-
+                PokemonDataService.sync_single_pokemon_form_abilities(poke_form.id, ability_cache)
+                sync_metrics.record_items()
             except requests.exceptions.RequestException as e:
                 current_app.logger.error(f"[FormAbilitySync] Request failed for Pokemon ID {poke_form.id} ({poke_form.name}): {e}")
                 db.session.rollback() 
-                # 不释放锁，让它超时，以便下次重试时知道可能有问题
                 continue # 继续下一个宝可梦，而不是终止整个同步
             except Exception as e:
                 current_app.logger.error(f"[FormAbilitySync] General error processing Pokemon {poke_form.name} (ID: {poke_form.id}): {e}")
                 import traceback
                 traceback.print_exc()
                 db.session.rollback()
-                # 不释放锁，让它超时
                 continue
             finally:
                 # 确保锁被释放
@@ -1684,59 +2005,231 @@ class PokemonDataService:
         
         current_app.logger.info("[FormAbilitySync] Finished sync for Pokemon form abilities.")
 
+    # 分布式同步队列：学习表按物种、形态特性按形态拆分为任务
+    SYNC_QUEUE_LEARNSET = 'sync:learnset'
+    SYNC_QUEUE_FORM_ABILITY = 'sync:form_ability'
+
+    @staticmethod
+    def _sync_queue(name):
+        return RedisWorkQueue(
+            name,
+            visibility_timeout=current_app.config.get('SYNC_QUEUE_VISIBILITY_TIMEOUT', 600),
+            max_attempts=current_app.config.get('SYNC_QUEUE_MAX_ATTEMPTS', 3),
+            retry_backoff=current_app.config.get('SYNC_QUEUE_RETRY_BACKOFF', 5.0),
+        )
+
+    @staticmethod
+    def enqueue_pokemon_move_learnset_tasks():
+        """将尚未同步的物种按物种拆分为学习表同步任务入队，返回新入队的任务数"""
+        species_ids = [row[0] for row in db.session.query(PokemonSpecies.id).order_by(PokemonSpecies.id)]
+        done_flags = redis_service.get_many(f'sync:pokemon_move_learnset:species:done:{sid}' for sid in species_ids)
+        pending_ids = [sid for sid, done in zip(species_ids, done_flags) if not done]
+        added = PokemonDataService._sync_queue(PokemonDataService.SYNC_QUEUE_LEARNSET).enqueue(
+            (sid, {'species_id': sid}) for sid in pending_ids
+        )
+        print(f"[SyncQueue] 学习表任务入队 {added} 个（待同步物种 {len(pending_ids)} 个）")
+        return added
+
+    @staticmethod
+    def enqueue_pokemon_form_ability_tasks():
+        """将所有宝可梦形态按形态拆分为特性同步任务入队，返回新入队的任务数"""
+        form_ids = [row[0] for row in db.session.query(Pokemon.id).order_by(Pokemon.id)]
+        added = PokemonDataService._sync_queue(PokemonDataService.SYNC_QUEUE_FORM_ABILITY).enqueue(
+            (form_id, {'pokemon_form_id': form_id}) for form_id in form_ids
+        )
+        print(f"[SyncQueue] 形态特性任务入队 {added} 个（形态 {len(form_ids)} 个）")
+        return added
+
+    @staticmethod
+    def get_sync_queue_progress():
+        """各同步队列的进度汇总"""
+        return [
+            PokemonDataService._sync_queue(name).progress()
+            for name in (PokemonDataService.SYNC_QUEUE_LEARNSET, PokemonDataService.SYNC_QUEUE_FORM_ABILITY)
+        ]
+
+    @staticmethod
+    def wait_for_sync_queues(queue_names=None):
+        """阻塞等待指定队列（默认全部）的任务都被 worker 处理完毕（确认或移入死信队列）"""
+        queue_names = queue_names or [PokemonDataService.SYNC_QUEUE_LEARNSET, PokemonDataService.SYNC_QUEUE_FORM_ABILITY]
+        queues = [PokemonDataService._sync_queue(name) for name in queue_names]
+        poll_interval = current_app.config.get('SYNC_QUEUE_POLL_INTERVAL', 1.0)
+        last_report = time.monotonic()
+        while not all(queue.is_drained() for queue in queues):
+            if time.monotonic() - last_report >= 30:
+                print(f"[SyncQueue] 等待 worker 处理，进度: {[queue.progress() for queue in queues]}")
+                last_report = time.monotonic()
+            time.sleep(poll_interval)
+
+    @staticmethod
+    def run_sync_worker(queue_names=None, exit_when_idle=True):
+        """
+        同步 worker：循环从队列认领任务并处理，成功确认、失败重试。
+        可在同一台机器上启动任意多个 worker 进程，吞吐随进程数线性增长。
+
+        :param queue_names: 要处理的队列，默认学习表与形态特性两个队列
+        :param exit_when_idle: 所有队列都没有待处理和处理中的任务时退出
+        :return: 本 worker 处理成功的任务数
+        """
+        queue_names = queue_names or [PokemonDataService.SYNC_QUEUE_LEARNSET, PokemonDataService.SYNC_QUEUE_FORM_ABILITY]
+        queues = [PokemonDataService._sync_queue(name) for name in queue_names]
+        poll_interval = current_app.config.get('SYNC_QUEUE_POLL_INTERVAL', 1.0)
+        prune = current_app.config.get('LEARNSET_SYNC_PRUNE', False)
+        # 查找表在 worker 生命周期内只加载一次
+        lookups = {}
+
+        def handle(queue, payload):
+            if queue.name == PokemonDataService.SYNC_QUEUE_LEARNSET:
+                if 'move' not in lookups:
+                    lookups['move'] = {m.name: m.id for m in Move.query.all()}
+                    lookups['version_group'] = {vg.name: vg.id for vg in VersionGroup.query.all()}
+                species_id = payload['species_id']
+                PokemonDataService.sync_single_pokemon_move_learnset(species_id, lookups['move'], lookups['version_group'], prune=prune)
+                redis_service.set(f'sync:pokemon_move_learnset:species:done:{species_id}', '1')
+            elif queue.name == PokemonDataService.SYNC_QUEUE_FORM_ABILITY:
+                if 'ability' not in lookups:
+                    lookups['ability'] = {ab.name: ab.id for ab in Ability.query.all()}
+                PokemonDataService.sync_single_pokemon_form_abilities(payload['pokemon_form_id'], lookups['ability'])
+            else:
+                raise ValueError(f"未知的同步队列: {queue.name}")
+
+        processed = 0
+        while True:
+            claimed_any = False
+            for queue in queues:
+                queue.requeue_expired()
+                task = queue.claim()
+                if task is None:
+                    continue
+                claimed_any = True
+                if task.payload is None:
+                    # 任务数据已被删除（已由其他 worker 确认），按已完成处理
+                    queue.ack(task)
+                    continue
+                try:
+                    # 处理期间持续延长可见性超时，长任务不会被其他 worker 重复认领
+                    with queue.heartbeat(task):
+                        handle(queue, task.payload)
+                except Exception as e:
+                    db.session.rollback()
+                    retried = queue.nack(task, error=e)
+                    print(f"[SyncWorker][{queue.name}] 任务 {task.task_id} 第 {task.attempts} 次失败{'，退避后重试' if retried else '，已移入死信队列'}: {e}")
+                    continue
+                queue.ack(task)
+                processed += 1
+                sync_metrics.record_items()
+                if processed % 50 == 0:
+                    progress = [q.progress() for q in queues]
+                    for item in progress:
+                        sync_metrics.set_queue_depth(item['queue'], item['pending'])
+                    print(f"[SyncWorker] 已处理 {processed} 个任务，进度: {progress}")
+            if claimed_any:
+                continue
+            for queue in queues:
+                sync_metrics.set_queue_depth(queue.name, 0)
+            # 待处理为空：其他 worker 手中仍有任务时继续等待（超时的任务会被重新入队）
+            if exit_when_idle and all(queue.is_drained() for queue in queues):
+                break
+            time.sleep(poll_interval)
+        print(f"[SyncWorker] worker 退出，本进程共处理 {processed} 个任务")
+        return processed
+
     @staticmethod
     def get_pokemon_learnable_moves(species_id: int, version_group_id: int):
         """
         根据宝可梦物种ID和版本组ID获取可学习的招式列表。
         """
         cache_key = f"learnable_moves:species:{species_id}:vg:{version_group_id}"
-        cached_data = redis_service.get(cache_key)
-        if cached_data:
-            current_app.logger.debug(f"Cache hit for learnable moves: {cache_key}")
-            return json.loads(cached_data.decode('utf-8'))
-        current_app.logger.debug(f"Cache miss for learnable moves: {cache_key}, querying DB.")
-
-        # 查询 PokemonMoveLearnset 表，并联接 Move 表
-        learnset_entries = db.session.query(
-            Move.id,
-            Move.name,
-            Move.name_zh_hans,
-            Move.type,
-            Move.category,
-            Move.power,
-            Move.accuracy,
-            Move.pp,
-            Move.description_zh_hans, # 使用中文描述
-            PokemonMoveLearnset.learn_method,
-            PokemonMoveLearnset.level
-        ).join(Move, PokemonMoveLearnset.move_id == Move.id).filter(
-            PokemonMoveLearnset.pokemon_species_id == species_id,
-            PokemonMoveLearnset.version_group_id == version_group_id
-        ).distinct(Move.id) # 避免同一个招式通过不同方式学习导致重复
-        # 可以根据学习方式、等级等进一步排序，例如：
-        # .order_by(PokemonMoveLearnset.learn_method, PokemonMoveLearnset.level, Move.name_zh_hans)
+        return dataset_cache.get_or_fill(
+            cache_key, lambda: PokemonDataService._load_learnable_moves(species_id, version_group_id)
+        )
 
-        results = []
-        for entry in learnset_entries:
-             # 清理描述字段的换行符，与前端处理一致
-             desc = (entry.description_zh_hans or '').replace('\n', '')
-             results.append({
-                'id': entry.id,
-                'name': entry.name, # 英文名，虽然前端不展示，但可能数据结构需要
-                'name_zh': entry.name_zh_hans,
-                'type': entry.type,
-                'category': entry.category,
-                'power': entry.power,
-                'accuracy': entry.accuracy,
-                'pp': entry.pp,
-                'desc': desc,
-                # 如果需要展示学习方式和等级，可以在这里添加
-                # 'learn_method': entry.learn_method,
-                # 'level': entry.level
-             })
+    @staticmethod
+    def get_pokemon_learnable_moves_batch(species_ids, version_group_id: int) -> dict:
+        """
+        批量获取多个物种在同一版本组的可学习招式：一次 MGET 读取全部缓存，未命中的物种用一条 SQL 查询后一次性回写。
+        返回 {species_id: 招式列表}。
+        """
+        species_ids = list(dict.fromkeys(species_ids))
+        names = {species_id: f"learnable_moves:species:{species_id}:vg:{version_group_id}" for species_id in species_ids}
+        results = {}
+        missing = []
+        for species_id, cached in zip(species_ids, dataset_cache.get_many(list(names.values()))):
+            if cached is not None:
+                results[species_id] = cached
+            else:
+                missing.append(species_id)
+        if not missing:
+            return results
+        fetched = PokemonDataService._load_learnable_moves_many(missing, version_group_id)
+        dataset_cache.set_many({names[species_id]: moves for species_id, moves in fetched.items()})
+        results.update(fetched)
+        return results
+
+    @staticmethod
+    def _load_learnable_moves(species_id: int, version_group_id: int):
+        """查询物种在某版本组可学习的招式（缓存未命中时由 get_or_fill 调用）"""
+        current_app.logger.debug(f"Cache miss for learnable moves: species={species_id} vg={version_group_id}, querying DB.")
+        return PokemonDataService._load_learnable_moves_many([species_id], version_group_id)[species_id]
+
+    @staticmethod
+    def _load_learnable_moves_many(species_ids, version_group_id: int) -> dict:
+        """
+        查询多个物种在某版本组可学习的招式，每 500 个物种一条 SQL，在内存中按物种分组；
+        同一招式通过不同方式学习时只保留一条。返回 {species_id: 招式列表}。
+        """
+        results = {species_id: [] for species_id in species_ids}
+        seen = {species_id: set() for species_id in species_ids}
+        snapshot = reference_snapshot.current()
+        for i in range(0, len(species_ids), 500):
+            chunk = species_ids[i:i + 500]
+            if snapshot is not None:
+                # 只查询学习表中的招式ID，招式详情从快照读取
+                rows = db.session.query(
+                    PokemonMoveLearnset.pokemon_species_id,
+                    PokemonMoveLearnset.move_id
+                ).filter(
+                    PokemonMoveLearnset.pokemon_species_id.in_(chunk),
+                    PokemonMoveLearnset.version_group_id == version_group_id
+                ).order_by(PokemonMoveLearnset.id)
+                for species_id, move_id in rows:
+                    if move_id in snapshot.moves and move_id not in seen[species_id]:
+                        seen[species_id].add(move_id)
+                        results[species_id].append(PokemonDataService._move_entry(snapshot.moves[move_id]))
+                continue
 
-        # 缓存结果
-        redis_service.set(cache_key, json.dumps(results), expire=3600) # 缓存1小时
+            # 查询 PokemonMoveLearnset 表，并联接 Move 表
+            rows = db.session.query(
+                PokemonMoveLearnset.pokemon_species_id,
+                Move.id,
+                Move.name,
+                Move.name_zh_hans,
+                Move.type,
+                Move.category,
+                Move.power,
+                Move.accuracy,
+                Move.pp,
+                Move.description_zh_hans, # 使用中文描述
+            ).join(Move, PokemonMoveLearnset.move_id == Move.id).filter(
+                PokemonMoveLearnset.pokemon_species_id.in_(chunk),
+                PokemonMoveLearnset.version_group_id == version_group_id
+            ).order_by(PokemonMoveLearnset.id)
+            for entry in rows:
+                if entry.id in seen[entry.pokemon_species_id]:
+                    continue
+                seen[entry.pokemon_species_id].add(entry.id)
+                results[entry.pokemon_species_id].append({
+                    'id': entry.id,
+                    'name': entry.name, # 英文名，虽然前端不展示，但可能数据结构需要
+                    'name_zh': entry.name_zh_hans,
+                    'type': entry.type,
+                    'category': entry.category,
+                    'power': entry.power,
+                    'accuracy': entry.accuracy,
+                    'pp': entry.pp,
+                    # 清理描述字段的换行符，与前端处理一致
+                    'desc': (entry.description_zh_hans or '').replace('\n', ''),
+                })
         return results
 
     @staticmethod
@@ -1746,11 +2239,23 @@ class PokemonDataService:
         聚合该世代下所有版本组的可学习技能，并去除重复。
         """
         cache_key = f"learnable_moves:species:{species_id}:gen:{generation_id}"
-        cached_data = redis_service.get(cache_key)
-        if cached_data:
-            current_app.logger.debug(f"Cache hit for learnable moves by generation: {cache_key}")
-            return json.loads(cached_data.decode('utf-8'))
-        current_app.logger.debug(f"Cache miss for learnable moves by generation: {cache_key}, querying DB.")
+        return dataset_cache.get_or_fill(
+            cache_key, lambda: PokemonDataService._load_learnable_moves_by_generation(species_id, generation_id)
+        )
+
+    @staticmethod
+    def _load_learnable_moves_by_generation(species_id: int, generation_id: int):
+        """查询物种在某世代（所有版本组并集）可学习的去重招式（缓存未命中时由 get_or_fill 调用）"""
+        current_app.logger.debug(f"Cache miss for learnable moves: species={species_id} gen={generation_id}, querying DB.")
+
+        snapshot = reference_snapshot.current()
+        if snapshot is not None:
+            vg_ids = [vg.id for vg in snapshot.version_groups_by_generation.get(generation_id, ())]
+            move_ids = db.session.query(PokemonMoveLearnset.move_id).filter(
+                PokemonMoveLearnset.pokemon_species_id == species_id,
+                PokemonMoveLearnset.version_group_id.in_(vg_ids)
+            ).distinct() if vg_ids else []
+            return [PokemonDataService._move_entry(snapshot.moves[move_id]) for (move_id,) in move_ids if move_id in snapshot.moves]
 
         # 查询 PokemonMoveLearnset 表，联接 Move 表和 VersionGroup 表
         # 筛选 species_id 和 generation_id
@@ -1777,9 +2282,6 @@ class PokemonDataService:
                 'desc': desc,
                 # 这里不包含 learn_method 和 level，因为我们取的是并集，不关心具体学习方式
              })
-
-        # 缓存结果
-        redis_service.set(cache_key, json.dumps(results), expire=3600) # 缓存1小时
         return results
 
     # --- 新增方法：根据 Species ID 获取特性列表 ---
@@ -1804,6 +2306,19 @@ class PokemonDataService:
         # 似乎最可靠的方式是通过 species_id 找到该物种的所有默认形态 (is_default=True)，
         # 然后通过这些默认形态关联的 PokemonFormAbilityMap 来获取特性。
         # 假设一个物种的默认形态包含了该物种的所有特性信息。
+        snapshot = reference_snapshot.current()
+        if snapshot is not None:
+            seen_ability_ids = set()
+            abilities_list = []
+            for form in snapshot.forms_by_species.get(species_id, ()):
+                if not form.is_default:
+                    continue
+                for ability in PokemonDataService._form_abilities_from_snapshot(snapshot, form.id):
+                    if ability['id'] not in seen_ability_ids:
+                        seen_ability_ids.add(ability['id'])
+                        abilities_list.append(ability)
+            return abilities_list
+
         try:
             # 获取该物种的所有默认形态
             default_forms = Pokemon.query.filter_by(species_id=species_id, is_default=True).all()
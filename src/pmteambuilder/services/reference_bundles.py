@@ -0,0 +1,235 @@
+"""
+静态参考数据包
+
+物种、形态、属性、招式、道具、特性、版本组这些静态数据原先在每个请求里组装并 jsonify。同步完成后由本模块
+一次性生成静态文件，客户端直接下载不可变文件，任何静态服务器或 CDN 都可以承担这部分流量：
+
+    <root>/<世代>-<语言>.<内容哈希>.json       世代为 all 或 gen<N>，语言为 zh / en
+    <root>/<世代>-<语言>.<内容哈希>.json.gz    预压缩 gzip
+    <root>/<世代>-<语言>.<内容哈希>.json.br    预压缩 brotli（安装 brotli 时生成）
+    <root>/manifest.json                      数据集版本与各数据包的文件名、大小、哈希
+
+文件名包含内容哈希，内容不变时文件名不变、不会重复写入；manifest 最后写入（临时文件 + 替换），
+读取方要么看到旧 manifest，要么看到引用的文件都已就绪的新 manifest。不再被引用的旧文件保留一段时间后清理，
+保证持有旧 manifest 的客户端还能下载。
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+
+from flask import current_app, has_app_context
+
+from .pokemon_service import PokemonDataService
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 未安装 brotli 时只生成 gzip
+    brotli = None
+
+MANIFEST_NAME = 'manifest.json'
+BUNDLE_LOCALES = ('zh', 'en')
+# 数据包文件名：<世代>-<语言>.<16 位内容哈希>.json[.gz|.br]
+BUNDLE_FILE_PATTERN = re.compile(r'^(all|gen\d+)-(zh|en)\.[0-9a-f]{16}\.json(\.gz|\.br)?$')
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def bundle_root():
+    """数据包目录；未配置时与 PokeAPI 响应缓存一样放在 src/instance/ 下"""
+    root = current_app.config.get('REFERENCE_BUNDLE_DIR') if has_app_context() else None
+    return root or os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "instance", "reference_bundles"))
+
+
+def _localized(locale, name_en, name_zh):
+    if locale == 'zh':
+        return name_zh or name_en
+    return name_en
+
+
+def build_bundle(snapshot, generation_id, locale, item_categories):
+    """
+    组装一个数据包。名称按 locale 取中文或英文（中文缺失时退回英文），key 为英文标识；
+    形态的特性以 [特性ID, 是否隐藏] 引用 abilities，避免重复特性描述。
+    """
+    generation_ids = PokemonDataService._generation_ids_by_name(snapshot)
+    # 与特性、招式列表接口相同的世代规则
+    _available = PokemonDataService._available_in_generation
+    index = snapshot.column_index
+    rows = index.query(generation_id=generation_id).tolist()
+
+    forms = []
+    species_ids = set()
+    for row in rows:
+        form = index.forms[row]
+        species_ids.add(form.species_id)
+        forms.append({
+            'id': form.id,
+            'species_id': form.species_id,
+            'key': form.name,
+            'form_name': _localized(locale, form.form_name, form.form_name_zh),
+            'is_default': form.is_default,
+            'sprite': form.sprite,
+            'types': [t for t in (form.type_1, form.type_2) if t],
+            'base_stats': index.stats[row, :6].tolist(),
+            'abilities': [[entry.ability_id, entry.is_hidden] for entry in snapshot.form_abilities.get(form.id, ())],
+        })
+
+    species = [{
+        'id': sp.id,
+        'key': sp.name,
+        'name': _localized(locale, sp.name, sp.name_zh),
+        'gender_rate': sp.gender_rate,
+    } for sp in sorted(snapshot.species.values(), key=lambda s: s.id) if sp.id in species_ids]
+
+    moves = [{
+        'id': mv.id,
+        'key': mv.name,
+        'name': _localized(locale, mv.name, mv.name_zh),
+        'type': mv.type,
+        'category': mv.category,
+        'power': mv.power,
+        'accuracy': mv.accuracy,
+        'pp': mv.pp,
+        'desc': (_localized(locale, mv.description_en, mv.description_zh) or '').replace('\n', ''),
+    } for mv in sorted(snapshot.moves.values(), key=lambda m: m.id) if _available(mv.generation, generation_id, generation_ids)]
+
+    abilities = [{
+        'id': ab.id,
+        'key': ab.name,
+        'name': _localized(locale, ab.name, ab.name_zh),
+        'desc': _localized(locale, ab.description_en, ab.description_zh) or '',
+    } for ab in sorted(snapshot.abilities.values(), key=lambda a: a.id) if _available(ab.generation, generation_id, generation_ids)]
+
+    items = [{
+        'id': item.id,
+        'key': item.name,
+        'name': _localized(locale, item.name, item.name_zh),
+        'category': item.category,
+        'desc': _localized(locale, item.description_en, item.description_zh) or '',
+        'sprite': item.sprite,
+    } for item in snapshot.items.values()
+        if item.category in item_categories and _available(item.generation, generation_id, generation_ids)]
+
+    # 不包含数据集版本号：数据没有变化的同步不会产生新文件名，CDN 与浏览器缓存继续有效
+    return {
+        'generation_id': generation_id,
+        'locale': locale,
+        'types': [{
+            'id': t.id, 'key': t.name, 'name': _localized(locale, t.name, t.name_zh),
+        } for t in sorted(snapshot.types.values(), key=lambda t: t.id)],
+        'version_groups': [{
+            'id': vg.id, 'key': vg.name, 'generation_id': vg.generation_id,
+        } for vg in sorted(snapshot.version_groups.values(), key=lambda v: v.id)
+            if not generation_id or (vg.generation_id or 0) <= generation_id],
+        'species': species,
+        'forms': forms,
+        'moves': moves,
+        'abilities': abilities,
+        'items': items,
+    }
+
+
+def _write_atomic(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_bundle(root, label, data):
+    """写入数据包及其预压缩版本，返回 manifest 条目；同名文件已存在（内容相同）时跳过"""
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.sha256(body).hexdigest()
+    filename = f"{label}.{digest[:16]}.json"
+    variants = [(None, filename, lambda: body), ('gzip', filename + ENCODING_SUFFIXES['gzip'], lambda: gzip.compress(body, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('br', filename + ENCODING_SUFFIXES['br'], lambda: brotli.compress(body, quality=11)))
+    encodings = {}
+    for encoding, name, compress in variants:
+        path = os.path.join(root, name)
+        if not os.path.exists(path):
+            _write_atomic(path, compress())
+        if encoding:
+            encodings[encoding] = os.path.getsize(path)
+    return {'file': filename, 'bytes': len(body), 'sha256': digest, 'encodings': encodings}
+
+
+def build_reference_bundles(snapshot, root=None):
+    """为全部世代及每个世代、每种语言生成数据包并写入 manifest，返回 manifest"""
+    root = root or bundle_root()
+    os.makedirs(root, exist_ok=True)
+    started = time.perf_counter()
+    item_categories = set(current_app.config.get('REFERENCE_BUNDLE_ITEM_CATEGORIES') or ()) if has_app_context() else set()
+    if not item_categories:
+        item_categories = set(PokemonDataService.DEFAULT_ITEM_CATEGORIES)
+
+    bundles = {}
+    for generation_id in [None, *sorted(snapshot.generations)]:
+        generation_label = f"gen{generation_id}" if generation_id else 'all'
+        for locale in BUNDLE_LOCALES:
+            data = build_bundle(snapshot, generation_id, locale, item_categories)
+            bundles[f"{generation_label}/{locale}"] = _write_bundle(root, f"{generation_label}-{locale}", data)
+
+    manifest = {'version': snapshot.version, 'built_at': int(time.time()), 'bundles': bundles}
+    _write_atomic(os.path.join(root, MANIFEST_NAME), json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8'))
+    removed = _remove_stale_files(root, manifest)
+    if has_app_context():
+        current_app.logger.info(
+            f"[ReferenceBundles] 已生成版本 {snapshot.version} 的 {len(bundles)} 个数据包，清理旧文件 {removed} 个，"
+            f"耗时 {time.perf_counter() - started:.2f}s"
+        )
+    return manifest
+
+
+def _remove_stale_files(root, manifest):
+    """删除不再被 manifest 引用且超过保留时长的数据包文件"""
+    retention = current_app.config.get('REFERENCE_BUNDLE_RETENTION', 86400) if has_app_context() else 86400
+    referenced = set()
+    for entry in manifest['bundles'].values():
+        referenced.add(entry['file'])
+        referenced.update(entry['file'] + ENCODING_SUFFIXES[encoding] for encoding in entry['encodings'])
+    cutoff = time.time() - retention
+    removed = 0
+    for name in os.listdir(root):
+        if not BUNDLE_FILE_PATTERN.match(name) or name in referenced:
+            continue
+        path = os.path.join(root, name)
+        if os.path.getmtime(path) < cutoff:
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def read_manifest_bytes(root=None):
+    """读取 manifest 文件的原始内容，尚未生成时返回 None"""
+    path = os.path.join(root or bundle_root(), MANIFEST_NAME)
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def read_manifest(root=None):
+    """读取 manifest，尚未生成时返回 None"""
+    raw = read_manifest_bytes(root)
+    return json.loads(raw) if raw is not None else None
+
+
+def publish_reference_bundles(snapshot):
+    """同步结束后调用：生成数据包；失败只记录日志，不影响同步结果"""
+    if not current_app.config.get('REFERENCE_BUNDLES_ENABLED', True):
+        return None
+    try:
+        return build_reference_bundles(snapshot)
+    except Exception as e:
+        current_app.logger.error(f"[ReferenceBundles] 生成静态数据包失败: {e}", exc_info=True)
+        return None
@@ -0,0 +1,251 @@
+"""
+参考数据快照服务
+
+Type、Move、Ability、Item、Pokemon、PokemonSpecies、VersionGroup、Generation 以及形态特性映射、物种世代关系
+只会在数据同步时变化。每个 worker 进程把这些表加载为一份只读快照（namedtuple 记录 + ID/名称索引），
+请求时直接读字典，不再访问 Redis 或数据库。
+
+同步结束后调用 publish() 递增 Redis 中的数据集版本号（与带版本缓存共用）；各进程收到版本广播后、或定期比对版本号发现更新时，由一个线程构建新快照，
+构建完成后整体替换引用（原子操作），正在处理的请求继续使用旧快照。
+"""
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from flask import current_app, g, has_app_context
+from redis.exceptions import RedisError
+from sqlalchemy import select
+
+from ..models import db, Ability, Move, Item, PokemonSpecies, Type, Generation, VersionGroup, Pokemon, PokemonFormAbilityMap
+from ..models.pokemon_species import generation_pokemon_species
+from ..utils.dataset_cache import DATASET_VERSION_KEY, dataset_cache
+from ..utils.near_cache import near_cache
+from ..utils.redis_service import redis_service
+
+# 快照版本即数据集版本：同步完成后递增一次，快照与带版本的缓存键同时失效
+SNAPSHOT_VERSION_KEY = DATASET_VERSION_KEY
+
+TypeRecord = namedtuple('TypeRecord', 'id name name_zh')
+GenerationRecord = namedtuple('GenerationRecord', 'id name')
+VersionGroupRecord = namedtuple('VersionGroupRecord', 'id name generation_id')
+AbilityRecord = namedtuple('AbilityRecord', 'id name name_zh description_en description_zh generation')
+MoveRecord = namedtuple('MoveRecord', 'id name name_zh type category power accuracy pp description_en description_zh generation')
+ItemRecord = namedtuple('ItemRecord', 'id name name_zh category description_en description_zh sprite generation')
+SpeciesRecord = namedtuple('SpeciesRecord', 'id name name_zh gender_rate')
+PokemonRecord = namedtuple(
+    'PokemonRecord',
+    'id species_id name form_name form_name_zh is_default sprite type_1 type_2 '
+    'base_hp base_atk base_def base_spa base_spd base_spe first_generation_id'
+)
+FormAbilityRecord = namedtuple('FormAbilityRecord', 'ability_id is_hidden')
+
+
+def _index(records, field='id'):
+    return MappingProxyType({getattr(r, field): r for r in records})
+
+
+class ReferenceSnapshot:
+    """某一版本的参考数据只读快照"""
+    __slots__ = (
+        'version', 'built_at',
+        'types', 'types_by_name', 'generations', 'version_groups', 'version_groups_by_name',
+        'version_groups_by_generation', 'abilities', 'abilities_by_name', 'moves', 'moves_by_name',
+        'items', 'items_by_name', 'species', 'pokemon', 'pokemon_by_name', 'forms_by_species',
+        'form_abilities', 'species_generations', '_column_index', '_memo',
+    )
+
+    def __init__(self, version, types, generations, version_groups, abilities, moves, items, species, pokemon, form_abilities,
+                 species_generations=None):
+        self.version = version
+        self.built_at = time.time()
+        self.types = _index(types)
+        self.types_by_name = _index(types, 'name')
+        self.generations = _index(sorted(generations, key=lambda r: r.id))
+        self.version_groups = _index(version_groups)
+        self.version_groups_by_name = _index(version_groups, 'name')
+        by_generation = {}
+        for vg in sorted(version_groups, key=lambda r: r.id):
+            by_generation.setdefault(vg.generation_id, []).append(vg)
+        self.version_groups_by_generation = MappingProxyType({k: tuple(v) for k, v in by_generation.items()})
+        self.abilities = _index(abilities)
+        self.abilities_by_name = _index(abilities, 'name')
+        self.moves = _index(moves)
+        self.moves_by_name = _index(moves, 'name')
+        self.items = _index(sorted(items, key=lambda r: r.id))
+        self.items_by_name = _index(items, 'name')
+        self.species = _index(species)
+        # 形态按ID排序，列表查询直接按此顺序分页
+        self.pokemon = _index(sorted(pokemon, key=lambda r: r.id))
+        self.pokemon_by_name = _index(pokemon, 'name')
+        forms_by_species = {}
+        for poke in self.pokemon.values():
+            forms_by_species.setdefault(poke.species_id, []).append(poke)
+        self.forms_by_species = MappingProxyType({k: tuple(v) for k, v in forms_by_species.items()})
+        self.form_abilities = MappingProxyType({k: tuple(v) for k, v in form_abilities.items()})
+        # 物种 ID -> 收录世代位掩码（第 n 世代对应第 n 位）
+        self.species_generations = MappingProxyType(dict(species_generations or {}))
+        self._column_index = None
+        self._memo = {}
+
+    def memo(self, key, build):
+        """按 key 缓存由快照派生的只读结果（如按世代筛选后的列表及其序列化 JSON），同一版本内不会变化"""
+        value = self._memo.get(key)
+        if value is None:
+            value = self._memo[key] = build()
+        return value
+
+    @property
+    def column_index(self):
+        """宝可梦列式筛选索引，首次访问时构建；并发首次访问最多重复构建一次，结果相同"""
+        index = self._column_index
+        if index is None:
+            from .pokemon_index import PokemonColumnIndex
+            index = self._column_index = PokemonColumnIndex.from_snapshot(self)
+        return index
+
+    @classmethod
+    def build(cls, version, session=None):
+        """从数据库加载各参考表（只取列，不构造 ORM 对象）"""
+        session = session or db.session
+
+        def rows(*columns):
+            return session.query(*columns).all()
+
+        form_abilities = {}
+        for form_id, ability_id, is_hidden in session.query(
+            PokemonFormAbilityMap.pokemon_form_id, PokemonFormAbilityMap.ability_id, PokemonFormAbilityMap.is_hidden
+        ).order_by(PokemonFormAbilityMap.id):
+            form_abilities.setdefault(form_id, []).append(FormAbilityRecord(ability_id, is_hidden))
+        species_generations = {}
+        for generation_id, species_id in session.execute(
+            select(generation_pokemon_species.c.generation_id, generation_pokemon_species.c.pokemon_species_id).distinct()
+        ):
+            species_generations[species_id] = species_generations.get(species_id, 0) | (1 << generation_id)
+        return cls(
+            version,
+            types=[TypeRecord(*r) for r in rows(Type.id, Type.name, Type.name_zh_hans)],
+            generations=[GenerationRecord(*r) for r in rows(Generation.id, Generation.name)],
+            version_groups=[VersionGroupRecord(*r) for r in rows(VersionGroup.id, VersionGroup.name, VersionGroup.generation_id)],
+            abilities=[AbilityRecord(*r) for r in rows(
+                Ability.id, Ability.name, Ability.name_zh_hans, Ability.description_en, Ability.description_zh_hans, Ability.generation
+            )],
+            moves=[MoveRecord(*r) for r in rows(
+                Move.id, Move.name, Move.name_zh_hans, Move.type, Move.category, Move.power, Move.accuracy, Move.pp,
+                Move.description_en, Move.description_zh_hans, Move.generation
+            )],
+            items=[ItemRecord(*r) for r in rows(
+                Item.id, Item.name, Item.name_zh_hans, Item.category, Item.description_en, Item.description_zh_hans, Item.sprite, Item.generation
+            )],
+            species=[SpeciesRecord(*r) for r in rows(PokemonSpecies.id, PokemonSpecies.name, PokemonSpecies.name_zh_hans, PokemonSpecies.gender_rate)],
+            pokemon=[PokemonRecord(*r) for r in rows(
+                Pokemon.id, Pokemon.species_id, Pokemon.name, Pokemon.form_name, Pokemon.form_name_zh_hans, Pokemon.is_default,
+                Pokemon.sprite, Pokemon.type_1, Pokemon.type_2, Pokemon.base_hp, Pokemon.base_atk, Pokemon.base_def,
+                Pokemon.base_spa, Pokemon.base_spd, Pokemon.base_spe, Pokemon.first_generation_id
+            )],
+            form_abilities=form_abilities,
+            species_generations=species_generations,
+        )
+
+    def __repr__(self):
+        return f"<ReferenceSnapshot v{self.version} pokemon={len(self.pokemon)} moves={len(self.moves)}>"
+
+
+class ReferenceSnapshotStore:
+    """进程内的快照持有者：按需加载，发现新版本时整体替换"""
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+
+    @staticmethod
+    def _enabled():
+        return has_app_context() and current_app.config.get('REFERENCE_SNAPSHOT_ENABLED', True)
+
+    @staticmethod
+    def published_version():
+        """Redis 中已发布的版本号，Redis 不可用时返回 None"""
+        try:
+            value = redis_service.redis_client.get(SNAPSHOT_VERSION_KEY)
+        except (RedisError, AttributeError) as e:
+            current_app.logger.warning(f"[ReferenceSnapshot] 读取快照版本失败: {e}")
+            return None
+        return int(value) if value else 0
+
+    def current(self):
+        """返回当前快照；未启用时返回 None，调用方回退为查询数据库"""
+        if not self._enabled():
+            return None
+        if 'reference_snapshot' in g:
+            return g.reference_snapshot
+        snapshot = self._snapshot
+        now = time.time()
+        interval = current_app.config.get('REFERENCE_SNAPSHOT_CHECK_INTERVAL', 5)
+        if snapshot is not None and now - self._checked_at < interval:
+            return snapshot
+        # 同一时刻只有一个线程检查/构建，其他线程继续使用旧快照
+        if not self._lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            snapshot = self._snapshot
+            if snapshot is not None and time.time() - self._checked_at < interval:
+                return snapshot
+            version = self.published_version()
+            self._checked_at = time.time()
+            if snapshot is None or (version is not None and version != snapshot.version):
+                snapshot = self._swap(version or 0)
+            return snapshot
+        finally:
+            self._lock.release()
+
+    def pin(self):
+        """
+        固定当前快照与数据集版本并返回该版本号，直到 unpin()：检查新版本或后台重建期间，同一请求的快照、
+        带版本缓存键与 ETag 都使用同一个版本，不会出现新 ETag 配旧数据。快照未启用时固定 Redis 中的数据集版本。
+        """
+        snapshot = self.current()
+        version = snapshot.version if snapshot is not None else dataset_cache.version()
+        if snapshot is not None:
+            g.reference_snapshot = snapshot
+        dataset_cache.pin(version)
+        return version
+
+    @staticmethod
+    def unpin():
+        g.pop('reference_snapshot', None)
+        dataset_cache.unpin()
+
+    def _swap(self, version):
+        started = time.perf_counter()
+        snapshot = ReferenceSnapshot.build(version)
+        # 构建好之后一次性替换引用，读取方要么看到旧快照，要么看到完整的新快照
+        self._snapshot = snapshot
+        current_app.logger.info(f"[ReferenceSnapshot] 已加载 {snapshot}，耗时 {time.perf_counter() - started:.2f}s")
+        return snapshot
+
+    def publish(self):
+        """同步完成后发布新版本：递增数据集版本号（同时使旧缓存键失效并在后台清理）并立即重建本进程快照，其他进程在下次检查时切换"""
+        try:
+            version = dataset_cache.bump()
+        except (RedisError, AttributeError) as e:
+            current_app.logger.warning(f"[ReferenceSnapshot] 发布快照版本失败，仅刷新本进程: {e}")
+            version = (self._snapshot.version + 1) if self._snapshot is not None else 0
+        with self._lock:
+            self._checked_at = time.time()
+            return self._swap(version)
+
+    def on_remote_version(self, version):
+        """其他进程发布新版本后的通知（在近端缓存的监听线程中调用）：下次 current() 立即检查并切换快照"""
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        """丢弃本进程快照，下次访问时重新加载"""
+        with self._lock:
+            self._snapshot = None
+            self._checked_at = 0.0
+
+
+# 创建全局快照实例
+reference_snapshot = ReferenceSnapshotStore()
+near_cache.add_version_listener(reference_snapshot.on_remote_version)
@@ -0,0 +1,321 @@
+"""
+名称搜索索引
+
+覆盖宝可梦物种、形态、招式、道具、特性的名称，支持：
+    - 中文名（前缀与子串）
+    - 拼音全拼（pikaqiu）与拼音首字母（pkq）前缀
+    - 英文名前缀与子串，以及基于对称删除索引的英文拼写容错（输入联想时前缀结果不足才启用）
+拼音在数据同步结束时随参考数据快照一同生成并写入 Redis（按快照版本号标记），
+各进程加载到内存，查询时在有序键上二分查找前缀，不访问数据库。
+"""
+import bisect
+import json
+import re
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app
+from pypinyin import Style, lazy_pinyin
+from redis.exceptions import RedisError
+
+from ..utils.redis_service import redis_service
+from .reference_snapshot import reference_snapshot
+
+SEARCH_INDEX_KEY = 'search_index:documents'
+
+SEARCH_KINDS = ('species', 'pokemon', 'move', 'ability', 'item')
+
+SearchDocument = namedtuple('SearchDocument', 'kind id name name_zh pinyin initials')
+
+# 匹配方式得分：完全匹配 > 前缀 > 子串；同一匹配方式下中文名 > 英文名 > 全拼 > 首字母
+_MATCH_SCORES = {'exact': 300, 'prefix': 200, 'substring': 100, 'fuzzy': 0}
+_FIELD_SCORES = {'name_zh': 30, 'name': 20, 'pinyin': 10, 'initials': 5}
+_KIND_SCORES = {'species': 4, 'pokemon': 3, 'move': 2, 'ability': 1, 'item': 0}
+_SUBSTRING_FIELDS = ('name_zh', 'name')
+
+_NON_HANZI_WORD = re.compile(r'[a-z0-9]+')
+
+
+def _normalize(text):
+    """查询词与英文名统一转小写并去掉空白、连字符"""
+    return re.sub(r'[\s\-_]+', '', (text or '').lower())
+
+
+def pinyin_tokens(text):
+    """中文名 -> 拼音音节列表；非汉字部分保留其中的字母数字"""
+    if not text:
+        return []
+    tokens = []
+    for chunk in lazy_pinyin(text, style=Style.NORMAL, errors=lambda s: _NON_HANZI_WORD.findall(s.lower())):
+        tokens.extend(_NON_HANZI_WORD.findall(chunk.lower()))
+    return tokens
+
+
+def edit_distance(a, b):
+    """Levenshtein 编辑距离"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def _deletions(word, max_distance):
+    """word 删除至多 max_distance 个字符后得到的全部变体（含自身）"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))} - variants
+        variants |= frontier
+    return variants
+
+
+class DeletionIndex:
+    """
+    对称删除（symmetric delete）拼写容错索引：预先为每个词生成删除至多 k 个字符的变体，
+    查询时只需生成查询词的删除变体查表，再用编辑距离校验候选，避免逐词计算编辑距离。
+    """
+    __slots__ = ('max_distance', '_variants')
+
+    def __init__(self, words=(), max_distance=2):
+        self.max_distance = max_distance
+        self._variants = {}
+        for word, value in words:
+            for variant in _deletions(word, max_distance):
+                self._variants.setdefault(variant, []).append((word, value))
+
+    def search(self, word, max_distance=None):
+        """返回 [(距离, 值)]，距离不超过 max_distance"""
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        found = {}
+        for variant in _deletions(word, max_distance):
+            for candidate, value in self._variants.get(variant, ()):
+                if value in found or abs(len(candidate) - len(word)) > max_distance:
+                    continue
+                distance = edit_distance(word, candidate)
+                if distance <= max_distance:
+                    found[value] = distance
+        return [(distance, value) for value, distance in found.items()]
+
+
+def build_documents(snapshot):
+    """由参考数据快照生成全部搜索文档（耗时操作，在同步结束时执行）"""
+    documents = []
+
+    def add(kind, record_id, name, name_zh):
+        tokens = pinyin_tokens(name_zh)
+        documents.append(SearchDocument(
+            kind, record_id, name or '', name_zh or '', ''.join(tokens), ''.join(t[0] for t in tokens)
+        ))
+
+    for species in snapshot.species.values():
+        add('species', species.id, species.name, species.name_zh)
+    for form in snapshot.pokemon.values():
+        species = snapshot.species.get(form.species_id)
+        # 默认形态已由物种条目覆盖，只为其他形态单独建条目
+        if species is None or form.is_default:
+            continue
+        name_zh = species.name_zh
+        if form.form_name_zh and form.form_name_zh != species.name_zh:
+            name_zh = f"{species.name_zh}{form.form_name_zh}"
+        add('pokemon', form.id, form.name, name_zh)
+    for move in snapshot.moves.values():
+        add('move', move.id, move.name, move.name_zh)
+    for ability in snapshot.abilities.values():
+        add('ability', ability.id, ability.name, ability.name_zh)
+    for item in snapshot.items.values():
+        add('item', item.id, item.name, item.name_zh)
+    return documents
+
+
+class SearchIndex:
+    """内存中的只读搜索索引"""
+
+    def __init__(self, version, documents):
+        self.version = version
+        self.documents = tuple(documents)
+        # 每个字段一组有序 (键, 文档下标)，前缀查询用二分查找
+        self._keys = {}
+        for field in _FIELD_SCORES:
+            pairs = sorted(
+                (_normalize(getattr(doc, field)), i) for i, doc in enumerate(self.documents) if getattr(doc, field)
+            )
+            self._keys[field] = ([k for k, _ in pairs], [i for _, i in pairs])
+        # 子串匹配：把同一字段的所有键用换行拼成一个大字符串，用 str.find 扫描后二分定位所属文档
+        self._fuzzy = None
+        self._fuzzy_lock = threading.Lock()
+        self._haystacks = {}
+        for field in _SUBSTRING_FIELDS:
+            keys, positions = self._keys[field]
+            starts, offset = [], 0
+            for key in keys:
+                starts.append(offset)
+                offset += len(key) + 1
+            self._haystacks[field] = ('\n'.join(keys), starts, positions)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def _prefix(self, field, term):
+        keys, positions = self._keys[field]
+        start = bisect.bisect_left(keys, term)
+        end = bisect.bisect_left(keys, term + '\uffff', start)
+        for i in range(start, end):
+            yield positions[i], 'exact' if keys[i] == term else 'prefix'
+
+    def match(self, query, kinds=None):
+        """返回 {文档下标: 得分}；中文名与英文名额外支持子串匹配"""
+        term = _normalize(query)
+        if not term:
+            return {}
+        kinds = set(kinds) if kinds else None
+        scores = {}
+
+        def hit(position, match_type, field):
+            doc = self.documents[position]
+            if kinds is not None and doc.kind not in kinds:
+                return
+            score = _MATCH_SCORES[match_type] + _FIELD_SCORES[field] + _KIND_SCORES[doc.kind]
+            if score > scores.get(position, -1):
+                scores[position] = score
+
+        for field in _FIELD_SCORES:
+            for position, match_type in self._prefix(field, term):
+                hit(position, match_type, field)
+        for field in _SUBSTRING_FIELDS:
+            haystack, starts, positions = self._haystacks[field]
+            found = haystack.find(term)
+            while found != -1:
+                row = bisect.bisect_right(starts, found) - 1
+                if positions[row] not in scores:
+                    hit(positions[row], 'substring', field)
+                # 跳到下一个键，同一个键只计一次
+                next_start = starts[row + 1] if row + 1 < len(starts) else len(haystack)
+                found = haystack.find(term, next_start)
+        return scores
+
+    def search(self, query, kinds=None, limit=20):
+        """按得分排序返回搜索结果；同分时名称短者优先"""
+        return self._ranked(self.match(query, kinds), limit)
+
+    def _fuzzy_index(self):
+        """英文名拼写容错索引，首次联想查询需要容错时构建"""
+        if self._fuzzy is None:
+            with self._fuzzy_lock:
+                if self._fuzzy is None:
+                    keys, positions = self._keys['name']
+                    self._fuzzy = DeletionIndex(zip(keys, positions))
+        return self._fuzzy
+
+    def suggest(self, prefix, kinds=None, limit=10):
+        """
+        输入联想：返回前 limit 条匹配。
+        先按前缀/子串匹配排序；结果不足且输入为英文时，按编辑距离补充（长度 ≤ 4 容错 1，否则容错 2）。
+        """
+        term = _normalize(prefix)
+        scores = self.match(term, kinds)
+        if len(scores) < limit and len(term) >= 3 and term.isascii():
+            max_distance = 1 if len(term) <= 4 else 2
+            allowed = set(kinds) if kinds else None
+            # 按完整英文名比较，适用于整词拼错（如 "pikchu"、"thunderblot"）
+            for distance, position in self._fuzzy_index().search(term, max_distance):
+                doc = self.documents[position]
+                if position in scores or (allowed is not None and doc.kind not in allowed):
+                    continue
+                scores[position] = _MATCH_SCORES['fuzzy'] + _FIELD_SCORES['name'] + _KIND_SCORES[doc.kind] - 5 * distance
+        return self._ranked(scores, limit)
+
+    def _ranked(self, scores, limit):
+        ranked = sorted(scores, key=lambda p: (-scores[p], len(self.documents[p].name_zh or self.documents[p].name), p))
+        return [
+            {
+                'kind': self.documents[p].kind,
+                'id': self.documents[p].id,
+                'name': self.documents[p].name,
+                'name_zh': self.documents[p].name_zh,
+                'score': scores[p],
+            }
+            for p in ranked[:limit]
+        ]
+
+    def match_pokemon_forms(self, query, snapshot):
+        """宝可梦列表用：返回名称匹配的形态 ID 集合（物种匹配时包含其全部形态）"""
+        form_ids = set()
+        for position in self.match(query, ('species', 'pokemon')):
+            doc = self.documents[position]
+            if doc.kind == 'pokemon':
+                form_ids.add(doc.id)
+            else:
+                form_ids.update(form.id for form in snapshot.forms_by_species.get(doc.id, ()))
+        return form_ids
+
+    def to_json(self):
+        return json.dumps({'version': self.version, 'documents': self.documents}, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, data):
+        payload = json.loads(data)
+        return cls(payload['version'], [SearchDocument(*doc) for doc in payload['documents']])
+
+
+class SearchIndexStore:
+    """进程内的搜索索引持有者，跟随参考数据快照的版本切换"""
+
+    def __init__(self):
+        self._index = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        """返回与当前快照版本一致的索引；快照未启用时返回 None，调用方回退为数据库查询"""
+        snapshot = reference_snapshot.current()
+        if snapshot is None:
+            return None
+        index = self._index
+        if index is not None and index.version == snapshot.version:
+            return index
+        if not self._lock.acquire(blocking=index is None):
+            return index
+        try:
+            index = self._index
+            if index is None or index.version != snapshot.version:
+                index = self._index = self._load(snapshot)
+            return index
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _load(snapshot):
+        """优先读取同步时发布到 Redis 的索引，版本不一致或不可用时在本进程生成"""
+        try:
+            data = redis_service.redis_client.get(SEARCH_INDEX_KEY)
+        except (RedisError, AttributeError) as e:
+            current_app.logger.warning(f"[SearchIndex] 读取搜索索引失败: {e}")
+            data = None
+        if data:
+            index = SearchIndex.from_json(data)
+            if index.version == snapshot.version:
+                return index
+        started = time.perf_counter()
+        index = SearchIndex(snapshot.version, build_documents(snapshot))
+        current_app.logger.info(f"[SearchIndex] 本地生成搜索索引 {len(index)} 条，耗时 {time.perf_counter() - started:.2f}s")
+        return index
+
+    def publish(self, snapshot):
+        """同步结束时生成新版本索引并写入 Redis，其他进程切换快照后直接加载"""
+        index = SearchIndex(snapshot.version, build_documents(snapshot))
+        try:
+            redis_service.redis_client.set(SEARCH_INDEX_KEY, index.to_json())
+        except (RedisError, AttributeError) as e:
+            current_app.logger.warning(f"[SearchIndex] 发布搜索索引失败，仅更新本进程: {e}")
+        with self._lock:
+            self._index = index
+        return index
+
+
+# 创建全局搜索索引实例
+search_index = SearchIndexStore()
@@ -3,6 +3,7 @@
 """
 from flask import current_app
 import re
+from redis.exceptions import RedisError
 from ..models import db, SensitiveWord
 from ..utils.redis_service import redis_service
 import time
@@ -10,22 +11,29 @@ import time
 
 class SensitiveWordFilter:
     """敏感词过滤服务类"""
+
+    # Redis 不可用时使用的进程内副本：(加载时间, 敏感词列表)
+    _local_words = None
     
     @staticmethod
     def load_sensitive_words_to_cache():
         """从数据库加载敏感词到Redis缓存"""
         sensitive_words = SensitiveWord.query.all()
         words = [word.content for word in sensitive_words]
+        SensitiveWordFilter._local_words = (time.time(), words)
         
         # 使用Redis集合存储敏感词
         cache_key = current_app.config['SENSITIVE_WORDS_CACHE_KEY']
         cache_timeout = current_app.config['SENSITIVE_WORDS_CACHE_TIMEOUT']
         
         # 清空现有缓存并添加新词
-        redis_service.delete(cache_key)
-        if words:
-            redis_service.set_add(cache_key, *words)
-            redis_service.set(f"{cache_key}_timestamp", str(int(time.time())), cache_timeout)
+        try:
+            redis_service.delete(cache_key)
+            if words:
+                redis_service.set_add(cache_key, *words)
+                redis_service.set(f"{cache_key}_timestamp", str(int(time.time())), cache_timeout)
+        except RedisError as e:
+            current_app.logger.warning(f"[SensitiveWord] 写入敏感词缓存失败，仅使用进程内副本: {e}")
         
         return words
     
@@ -34,10 +42,19 @@ class SensitiveWordFilter:
         """获取所有敏感词"""
         cache_key = current_app.config['SENSITIVE_WORDS_CACHE_KEY']
         # 尝试从缓存获取
-        cached_words = redis_service.set_members(cache_key)
+        try:
+            cached_words = redis_service.set_members(cache_key)
+        except RedisError:
+            # Redis 不可用：使用未过期的进程内副本，否则直接查数据库
+            local = SensitiveWordFilter._local_words
+            if local is not None and time.time() - local[0] < current_app.config['SENSITIVE_WORDS_CACHE_TIMEOUT']:
+                return local[1]
+            return SensitiveWordFilter.load_sensitive_words_to_cache()
         if cached_words:
             # 解码bytes为str
-            return [w.decode('utf-8') if isinstance(w, bytes) else w for w in cached_words]
+            words = [w.decode('utf-8') if isinstance(w, bytes) else w for w in cached_words]
+            SensitiveWordFilter._local_words = (time.time(), words)
+            return words
         
         # 缓存未命中，从数据库加载并更新缓存
         return SensitiveWordFilter.load_sensitive_words_to_cache()
@@ -96,8 +113,12 @@ class SensitiveWordFilter:
         db.session.commit()
         
         # 更新缓存
+        SensitiveWordFilter._local_words = None
         cache_key = current_app.config['SENSITIVE_WORDS_CACHE_KEY']
-        redis_service.set_add(cache_key, word)
+        try:
+            redis_service.set_add(cache_key, word)
+        except RedisError as e:
+            current_app.logger.warning(f"[SensitiveWord] 更新敏感词缓存失败: {e}")
         
         return new_word
     
@@ -113,8 +134,12 @@ class SensitiveWordFilter:
         db.session.commit()
         
         # 更新缓存
+        SensitiveWordFilter._local_words = None
         cache_key = current_app.config['SENSITIVE_WORDS_CACHE_KEY']
-        redis_service.redis_client.srem(cache_key, content)
+        try:
+            redis_service.redis_client.srem(cache_key, content)
+        except RedisError as e:
+            current_app.logger.warning(f"[SensitiveWord] 更新敏感词缓存失败: {e}")
         
         return content
     
@@ -0,0 +1,168 @@
+"""
+数据同步检查点日志服务，记录每个实体/阶段中已完成的资源，支持断点续拉与多进程共享
+"""
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import and_, or_, select
+
+from ..models import db, SyncCheckpoint
+from ..utils.bulk_upsert import bulk_upsert, dialect_insert
+
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+# resource_id 为该值的行表示整个阶段的完成标记
+STAGE_MARKER = '*'
+
+
+class SyncJournal:
+    """同步检查点日志。
+
+    每个进程以 worker 标识认领（claim）资源，认领带有租约；进程中断后租约过期，
+    其他进程可重新认领。完成或失败的状态随所在批次的写库结果一起提交。
+    """
+
+    def __init__(self, worker=None, lease_seconds=None):
+        self.worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds or current_app.config.get('SYNC_JOURNAL_LEASE_SECONDS', 1800)
+
+    @staticmethod
+    def _now():
+        return datetime.now(timezone.utc)
+
+    @staticmethod
+    def _filter(entity, stage):
+        return and_(SyncCheckpoint.entity == entity, SyncCheckpoint.stage == stage)
+
+    def done_ids(self, entity, stage):
+        """返回该阶段已完成的资源ID集合（字符串）"""
+        rows = db.session.execute(
+            select(SyncCheckpoint.resource_id).where(
+                self._filter(entity, stage),
+                SyncCheckpoint.status == STATUS_DONE,
+                SyncCheckpoint.resource_id != STAGE_MARKER,
+            )
+        )
+        return {row[0] for row in rows}
+
+    def claim(self, entity, stage, resource_ids):
+        """认领一组资源，返回本进程成功认领的资源ID集合（字符串）。
+
+        新资源、失败的资源以及租约已过期的资源可被认领；已完成或正被其他进程处理的资源会被跳过。
+        """
+        resource_ids = [str(r) for r in resource_ids]
+        if not resource_ids:
+            return set()
+        now = self._now()
+        token = uuid.uuid4().hex
+        lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+        table = SyncCheckpoint.__table__
+        claimed_values = {
+            'status': STATUS_RUNNING,
+            'worker': self.worker,
+            'claim_token': token,
+            'lease_expires_at': lease_expires_at,
+            'updated_at': now,
+        }
+        for i in range(0, len(resource_ids), 500):
+            chunk = resource_ids[i:i + 500]
+            # 1. 尚无记录的资源直接插入为本进程认领
+            rows = [dict(claimed_values, entity=entity, stage=stage, resource_id=r, attempts=1) for r in chunk]
+            stmt = dialect_insert(table)
+            if stmt is not None:
+                db.session.execute(stmt.values(rows).on_conflict_do_nothing(index_elements=['entity', 'stage', 'resource_id']))
+            else:
+                existing = {row[0] for row in db.session.execute(
+                    select(table.c.resource_id).where(self._filter(entity, stage), table.c.resource_id.in_(chunk)))}
+                new_rows = [row for row in rows if row['resource_id'] not in existing]
+                if new_rows:
+                    db.session.execute(table.insert(), new_rows)
+            # 2. 失败或租约过期的资源重新认领；条件更新保证同一资源只会被一个进程认领
+            db.session.execute(
+                table.update()
+                .where(
+                    self._filter(entity, stage),
+                    table.c.resource_id.in_(chunk),
+                    or_(
+                        table.c.status == STATUS_FAILED,
+                        and_(table.c.status == STATUS_RUNNING, table.c.lease_expires_at < now),
+                    ),
+                )
+                .values(attempts=table.c.attempts + 1, **claimed_values)
+            )
+        db.session.commit()
+        rows = db.session.execute(select(table.c.resource_id).where(table.c.claim_token == token))
+        return {row[0] for row in rows}
+
+    def _set_status(self, entity, stage, resource_ids, status, error=None):
+        now = self._now()
+        rows = [{
+            'entity': entity,
+            'stage': stage,
+            'resource_id': str(r),
+            'status': status,
+            'worker': self.worker,
+            'claim_token': None,
+            'lease_expires_at': None,
+            'error': error,
+            'updated_at': now,
+        } for r in resource_ids]
+        bulk_upsert(SyncCheckpoint, rows, key=('entity', 'stage', 'resource_id'))
+
+    def mark_done(self, entity, stage, resource_ids):
+        """标记资源已完成（不提交事务）；须在调用方的写库批次提交之前调用，与该批次在同一事务中提交"""
+        self._set_status(entity, stage, resource_ids, STATUS_DONE)
+
+    def mark_failed(self, entity, stage, resource_ids, error=None):
+        """标记资源失败并立即提交，失败的资源可被重新认领"""
+        self._set_status(entity, stage, resource_ids, STATUS_FAILED, error=str(error)[:2000] if error else None)
+        db.session.commit()
+
+    def is_stage_done(self, entity, stage):
+        return db.session.execute(
+            select(SyncCheckpoint.id).where(
+                self._filter(entity, stage),
+                SyncCheckpoint.resource_id == STAGE_MARKER,
+                SyncCheckpoint.status == STATUS_DONE,
+            )
+        ).first() is not None
+
+    def has_unfinished(self, entity, stage):
+        """该阶段是否仍有未完成（处理中或失败）的资源"""
+        return db.session.execute(
+            select(SyncCheckpoint.id).where(
+                self._filter(entity, stage),
+                SyncCheckpoint.resource_id != STAGE_MARKER,
+                SyncCheckpoint.status != STATUS_DONE,
+            ).limit(1)
+        ).first() is not None
+
+    def mark_stage_done(self, entity, stage):
+        self.mark_done(entity, stage, [STAGE_MARKER])
+        db.session.commit()
+
+    def reset(self, entity=None, stage=None):
+        """清除检查点，开始新一轮同步"""
+        query = SyncCheckpoint.query
+        if entity:
+            query = query.filter_by(entity=entity)
+        if stage:
+            query = query.filter_by(stage=stage)
+        query.delete(synchronize_session=False)
+        db.session.commit()
+
+    def summary(self):
+        """按实体/阶段/状态统计资源数量"""
+        rows = db.session.query(
+            SyncCheckpoint.entity, SyncCheckpoint.stage, SyncCheckpoint.status, db.func.count(SyncCheckpoint.id)
+        ).filter(SyncCheckpoint.resource_id != STAGE_MARKER).group_by(
+            SyncCheckpoint.entity, SyncCheckpoint.stage, SyncCheckpoint.status
+        ).all()
+        result = {}
+        for entity, stage, status, count in rows:
+            result.setdefault(f"{entity}:{stage}", {})[status] = count
+        return result
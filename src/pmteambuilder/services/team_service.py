@@ -385,14 +385,14 @@ class TeamService:
             # For the favorites list, we might want more detail than the public list, maybe include pokemons=True
             # But for consistency with user's own teams list, let's use include_pokemons=True here too
             items_data = []
+            liked_ids, _ = TeamService.get_interaction_flags(user_id_int, [team.id for team in pagination.items])
             for team in pagination.items:
                  # Check if the user is the owner for include_token=True
                  include_token = (team.user_id == user_id_int)
                  item_data = team.to_dict(include_pokemons=True, include_token=include_token) # Include pokemon details for favorites list
                  # Also add is_favorited flag (always true for this list) and is_liked
                  item_data['is_favorited'] = True
-                 is_liked = TeamLike.query.filter_by(user_id=user_id_int, team_id=team.id).first() is not None
-                 item_data['is_liked'] = is_liked
+                 item_data['is_liked'] = team.id in liked_ids
                  items_data.append(item_data)
 
 
@@ -731,30 +731,15 @@ class TeamService:
         # 分页
         pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
-        # 格式化返回数据，包含点赞/收藏状态
+        # 格式化返回数据，包含点赞/收藏状态（整页一次批量查询）
         items_data = []
+        liked_ids, favorited_ids = TeamService.get_interaction_flags(current_user_id, [team.id for team in pagination.items])
         for team in pagination.items:
             # 在列表页通常只需要部分信息，不包含宝可梦详情
             # Add include_sprites_only=True to get basic pokemon sprites
             item_data = team.to_dict(include_pokemons=False, include_tags=True, include_sprite_urls_only=True, include_token=True) # Include token for public teams
-            # 判断当前用户是否已点赞和收藏
-            is_liked = False
-            is_favorited = False
-            if current_user_id is not None:
-                 try:
-                     user_id_int = int(current_user_id) # Ensure user_id is int
-                     is_liked = TeamLike.query.filter_by(user_id=user_id_int, team_id=team.id).first() is not None
-                     # 判断是否已收藏，查询 user_favorites 关联表
-                     is_favorited = db.session.query(user_favorites).filter(
-                         user_favorites.c.user_id == user_id_int,
-                         user_favorites.c.team_id == team.id
-                     ).first() is not None
-                 except ValueError:
-                     # current_user_id 不是有效的整数，忽略判断
-                     pass
-
-            item_data['is_liked'] = is_liked
-            item_data['is_favorited'] = is_favorited
+            item_data['is_liked'] = team.id in liked_ids
+            item_data['is_favorited'] = team.id in favorited_ids
             items_data.append(item_data)
 
 
@@ -768,6 +753,27 @@ class TeamService:
         }
     # --- End: New method to get public approved teams --- # 新增注释行
 
+    @staticmethod
+    def get_interaction_flags(user_id, team_ids):
+        """
+        批量查询用户对一组团队的点赞/收藏状态，每种状态一条 IN 查询，避免列表页逐个团队查询。
+        返回 (已点赞的团队ID集合, 已收藏的团队ID集合)；user_id 无效时返回两个空集合。
+        """
+        team_ids = list(team_ids)
+        if user_id is None or not team_ids:
+            return set(), set()
+        try:
+            user_id_int = int(user_id)
+        except (TypeError, ValueError):
+            return set(), set()
+        liked = {row[0] for row in db.session.query(TeamLike.team_id).filter(
+            TeamLike.user_id == user_id_int, TeamLike.team_id.in_(team_ids)
+        )}
+        favorited = {row[0] for row in db.session.query(user_favorites.c.team_id).filter(
+            user_favorites.c.user_id == user_id_int, user_favorites.c.team_id.in_(team_ids)
+        )}
+        return liked, favorited
+
     # --- Start: New methods for likes --- # 新增注释行
     @staticmethod
     def add_like(user_id, team_id):
@@ -0,0 +1,77 @@
+"""
+同步 worker 入口，从 Redis 队列认领学习表/形态特性同步任务并处理
+
+用法：
+    python src/pmteambuilder/sync_worker.py --enqueue learnset form_ability   # 拆分任务入队，等待处理完毕后发布新版本
+    python src/pmteambuilder/sync_worker.py                                   # 启动一个 worker（可同时启动多个）
+
+worker 只负责写库并累计变更行数；由 --enqueue 的协调进程在队列处理完毕、确有变更时发布新的数据集版本。
+    python src/pmteambuilder/sync_worker.py --progress                        # 查看队列进度
+    python src/pmteambuilder/sync_worker.py --build-bundles                   # 只重新生成静态数据包
+"""
+import argparse
+import json
+import os
+import sys
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_SRC_DIR = os.path.dirname(_APP_DIR)
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from pmteambuilder import create_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PokeAPI 分布式同步 worker')
+    parser.add_argument('--enqueue', nargs='*', choices=['learnset', 'form_ability'], help='将同步任务拆分入队，等待处理完毕后有变更时发布新版本')
+    parser.add_argument('--no-wait', action='store_true', help='与 --enqueue 一起使用：入队后立即退出，不等待也不发布')
+    parser.add_argument('--queues', nargs='*', choices=['learnset', 'form_ability'], help='只处理指定队列，默认全部')
+    parser.add_argument('--progress', action='store_true', help='输出队列进度后退出')
+    parser.add_argument('--forever', action='store_true', help='队列为空时不退出，持续等待新任务')
+    parser.add_argument('--build-bundles', action='store_true', help='按当前快照生成静态数据包后退出')
+    args = parser.parse_args()
+
+    app = create_app(os.environ.get('FLASK_ENV', 'development'))
+    from pmteambuilder.utils.redis_service import redis_service
+    # 同步进程的 Redis 操作使用较长的 socket 超时且不经过熔断器（熔断阈值按 Web 请求设定）
+    with app.app_context(), redis_service.bulk():
+        from pmteambuilder.services.pokemon_service import PokemonDataService
+        queue_names = {
+            'learnset': PokemonDataService.SYNC_QUEUE_LEARNSET,
+            'form_ability': PokemonDataService.SYNC_QUEUE_FORM_ABILITY,
+        }
+        if args.progress:
+            print(json.dumps(PokemonDataService.get_sync_queue_progress(), ensure_ascii=False, indent=2))
+            return
+        if args.build_bundles:
+            from pmteambuilder.services.reference_bundles import build_reference_bundles
+            from pmteambuilder.services.reference_snapshot import ReferenceSnapshot, reference_snapshot
+            snapshot = reference_snapshot.current() or ReferenceSnapshot.build(reference_snapshot.published_version() or 0)
+            manifest = build_reference_bundles(snapshot)
+            print(json.dumps({key: entry['file'] for key, entry in manifest['bundles'].items()}, ensure_ascii=False, indent=2))
+            return
+        if args.enqueue is not None:
+            targets = args.enqueue or list(queue_names)
+            if 'learnset' in targets:
+                PokemonDataService.enqueue_pokemon_move_learnset_tasks()
+            if 'form_ability' in targets:
+                PokemonDataService.enqueue_pokemon_form_ability_tasks()
+            if not args.no_wait:
+                PokemonDataService.wait_for_sync_queues([queue_names[name] for name in targets])
+                PokemonDataService.publish_reference_data()
+            return
+        from pmteambuilder.utils.sync_metrics import sync_metrics
+        selected = [queue_names[name] for name in args.queues] if args.queues else None
+        sync_metrics.start_run()
+        status = 'failed'
+        try:
+            with sync_metrics.stage('sync_worker'):
+                PokemonDataService.run_sync_worker(selected, exit_when_idle=not args.forever)
+            status = 'ok'
+        finally:
+            sync_metrics.finish_run(status)
+
+
+if __name__ == '__main__':
+    main()
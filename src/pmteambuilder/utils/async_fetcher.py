@@ -0,0 +1,213 @@
+"""
+PokeAPI 异步拉取模块，基于 aiohttp 并发请求，并以同步生成器的形式按输入顺序产出结果
+"""
+import asyncio
+import time
+from collections import OrderedDict, deque
+
+import aiohttp
+from flask import current_app, has_app_context
+
+from .http_client import RETRY_STATUSES, backoff_delay, ensure_outbound_allowed, rate_limiter_from_config
+from .response_cache import ResponseCache
+from .sync_metrics import sync_metrics
+
+
+class AsyncPokeAPIFetcher:
+    """并发拉取器：固定大小的连接池 + 并发上限 + 有序滑动窗口。
+
+    用法::
+
+        with AsyncPokeAPIFetcher.from_config() as fetcher:
+            for data in fetcher.iter_json(urls):
+                ...
+
+    ``imap`` 接收一个 ``async def handler(fetcher, item)``，handler 内部可多次
+    ``await fetcher.fetch_json(url)``（例如先拉详情再拉物种），结果按 items 顺序产出。
+    """
+
+    DEFAULT_CONCURRENCY = 32
+    DEFAULT_LIMIT_PER_HOST = 32
+    DEFAULT_TIMEOUT = 30
+    DEFAULT_CONNECT_TIMEOUT = 5
+    DEFAULT_MEMO_SIZE = 2048
+    DEFAULT_MAX_RETRIES = 4
+
+    def __init__(self, concurrency=None, limit_per_host=None, timeout=None, proxy=None, verify_ssl=False, memo_size=None, cache=None, logger=None,
+                 connect_timeout=None, max_retries=None, backoff_factor=0.5, backoff_max=30, rate_limiter=None):
+        self.concurrency = concurrency or self.DEFAULT_CONCURRENCY
+        self.limit_per_host = limit_per_host or self.DEFAULT_LIMIT_PER_HOST
+        self.timeout = timeout or self.DEFAULT_TIMEOUT
+        self.connect_timeout = connect_timeout or self.DEFAULT_CONNECT_TIMEOUT
+        self.max_retries = self.DEFAULT_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        # 与同步客户端共享的 Redis 令牌桶，多进程合计不超过配置的速率
+        self.rate_limiter = rate_limiter
+        self.proxy = proxy or None
+        self.verify_ssl = verify_ssl
+        self.memo_size = memo_size or self.DEFAULT_MEMO_SIZE
+        # 未传入缓存时使用关闭状态的缓存，始终走同一条 cached_fetch_async 路径
+        self.cache = cache or ResponseCache(ResponseCache.default_root(), mode=ResponseCache.MODE_OFF)
+        # 窗口比并发稍大，保证请求槽位始终被占满，不会因为等待队首结果而空转
+        self.window = self.concurrency * 2
+        self.logger = logger
+        self._loop = None
+        self._session = None
+        self._semaphore = None
+        self._memo = OrderedDict()
+
+    @classmethod
+    def from_config(cls, **overrides):
+        """根据 Flask 配置创建拉取器，overrides 可覆盖单项配置"""
+        options = {}
+        logger = None
+        if has_app_context():
+            config = current_app.config
+            options = {
+                'concurrency': config.get('POKEAPI_FETCH_CONCURRENCY'),
+                'limit_per_host': config.get('POKEAPI_FETCH_LIMIT_PER_HOST'),
+                'timeout': config.get('POKEAPI_FETCH_TIMEOUT'),
+                'proxy': config.get('POKEAPI_PROXY'),
+                'verify_ssl': config.get('POKEAPI_VERIFY_SSL', False),
+                'cache': ResponseCache.from_config(),
+                'connect_timeout': config.get('POKEAPI_CONNECT_TIMEOUT'),
+                'max_retries': config.get('POKEAPI_MAX_RETRIES'),
+                'backoff_factor': config.get('POKEAPI_BACKOFF_FACTOR', 0.5),
+                'backoff_max': config.get('POKEAPI_BACKOFF_MAX', 30),
+                'rate_limiter': rate_limiter_from_config(),
+            }
+            logger = current_app.logger
+        options.update(overrides)
+        return cls(logger=logger, **options)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _ensure_loop(self):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._open())
+        return self._loop
+
+    async def _open(self):
+        # aiohttp 要求在运行中的事件循环里创建 session
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=self.limit_per_host,
+            ssl=None if self.verify_ssl else False,
+            ttl_dns_cache=300,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout, sock_connect=self.connect_timeout, sock_read=self.timeout),
+            raise_for_status=True,
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    def close(self):
+        """关闭 session 与事件循环"""
+        if self._loop is None:
+            return
+        if self._session is not None:
+            self._loop.run_until_complete(self._session.close())
+            self._session = None
+        self._loop.close()
+        self._loop = None
+        self._memo.clear()
+
+    async def _request_json(self, url):
+        return await self.cache.cached_fetch_async(url, lambda headers: self._get(url, headers))
+
+    async def _get(self, url, headers):
+        """发出 GET 请求（限流、并发上限、429/5xx/连接错误退避重试），返回 (status, body, response_headers)"""
+        ensure_outbound_allowed(url)
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                sync_metrics.record_rate_limit_wait(await self.rate_limiter.acquire_async())
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    started = time.perf_counter()
+                    async with self._session.get(url, proxy=self.proxy, headers=headers) as resp:
+                        # 304 无响应体，由响应缓存读盘
+                        body = None if resp.status == 304 else await resp.read()
+                    sync_metrics.record_http(time.perf_counter() - started, resp.status)
+                return resp.status, body, resp.headers
+            except aiohttp.ClientResponseError as e:
+                sync_metrics.record_http(time.perf_counter() - started, e.status)
+                if e.status not in RETRY_STATUSES or attempt >= self.max_retries:
+                    raise
+                retry_after = e.headers.get('Retry-After') if e.headers else None
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                sync_metrics.record_http(time.perf_counter() - started)
+                if attempt >= self.max_retries:
+                    raise
+            sync_metrics.record_retry()
+            await asyncio.sleep(backoff_delay(attempt, self.backoff_factor, self.backoff_max, retry_after))
+
+    async def fetch_json(self, url, memoize=False):
+        """拉取单个 URL 的 JSON；memoize=True 时相同 URL 只请求一次（如多个形态共享的物种）"""
+        if not memoize:
+            return await self._request_json(url)
+        task = self._memo.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._request_json(url))
+            self._memo[url] = task
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        else:
+            self._memo.move_to_end(url)
+        # shield: 某个调用方被取消时，不影响其他共享同一结果的调用方
+        return await asyncio.shield(task)
+
+    def get_json(self, url):
+        """同步拉取单个 URL（用于列表页等入口请求）"""
+        loop = self._ensure_loop()
+        return loop.run_until_complete(self._request_json(url))
+
+    def imap(self, handler, items):
+        """并发执行 handler(fetcher, item)，按 items 的顺序产出结果。
+
+        单个条目失败（含 replay 模式下的缓存未命中）时记录日志并跳过，不中断整个拉取。
+        """
+        loop = self._ensure_loop()
+        pending = deque()
+        iterator = iter(items)
+
+        def refill():
+            while len(pending) < self.window:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                pending.append((item, loop.create_task(handler(self, item))))
+
+        refill()
+        try:
+            while pending:
+                item, task = pending.popleft()
+                try:
+                    # 等待队首任务时，窗口内其余任务同样在事件循环中推进
+                    result = loop.run_until_complete(task)
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, LookupError) as e:
+                    if self.logger:
+                        self.logger.error(f"[AsyncFetch] 拉取失败 item={item}: {e!r}")
+                    refill()
+                    continue
+                refill()
+                yield result
+        finally:
+            for _, task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*(t for _, t in pending), return_exceptions=True))
+
+    def iter_json(self, urls):
+        """并发拉取一组 URL，按顺序产出 JSON"""
+        async def load(fetcher, url):
+            return await fetcher.fetch_json(url)
+        return self.imap(load, urls)
@@ -0,0 +1,135 @@
+"""
+批量 upsert 模块
+
+按块（chunk）处理：每块先用一条 SELECT 取出已存在的行做比对，再用一条多行
+INSERT ... ON CONFLICT DO UPDATE 写入新增和变更的行，未变化的行不写入。
+PostgreSQL 与 SQLite 使用各自方言的 insert，其它方言回退为逐行 merge。
+"""
+import sqlite3
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..models import db
+
+# SQLite 3.32 之前单条语句最多 999 个绑定参数
+SQLITE_MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+POSTGRESQL_MAX_VARIABLES = 32767
+
+_DIALECT_INSERTS = {
+    'postgresql': (postgresql.insert, POSTGRESQL_MAX_VARIABLES),
+    'sqlite': (sqlite.insert, SQLITE_MAX_VARIABLES),
+}
+
+
+class UpsertResult:
+    """批量 upsert 的统计结果"""
+    __slots__ = ('inserted', 'updated', 'unchanged', 'changed_keys')
+
+    def __init__(self, inserted=0, updated=0, unchanged=0, changed_keys=None):
+        self.inserted = inserted
+        self.updated = updated
+        self.unchanged = unchanged
+        # 新增或变更行的主键，便于调用方做缓存失效等后续处理
+        self.changed_keys = changed_keys if changed_keys is not None else []
+
+    @property
+    def total(self):
+        return self.inserted + self.updated + self.unchanged
+
+    def __iadd__(self, other):
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.changed_keys.extend(other.changed_keys)
+        return self
+
+    def to_dict(self):
+        return {'inserted': self.inserted, 'updated': self.updated, 'unchanged': self.unchanged}
+
+    def __repr__(self):
+        return f"<UpsertResult inserted={self.inserted} updated={self.updated} unchanged={self.unchanged}>"
+
+
+def dialect_insert(table, session=None):
+    """返回当前数据库方言支持 ON CONFLICT 的 insert 语句，不支持时返回 None"""
+    session = session or db.session
+    insert_factory, _ = _DIALECT_INSERTS.get(session.get_bind().dialect.name, (None, None))
+    return insert_factory(table) if insert_factory is not None else None
+
+
+def _chunks(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def bulk_upsert(model, rows, key=('id',), chunk_size=500, session=None):
+    """将 rows（字典列表，键为列名）批量写入 model 对应的表。
+
+    :param key: 冲突判断所用的唯一键列
+    :param chunk_size: 每条多行语句最多包含的行数（还会受数据库绑定参数上限约束）
+    :return: UpsertResult
+    """
+    session = session or db.session
+    key = tuple(key)
+    table = model.__table__
+    result = UpsertResult()
+    if not rows:
+        return result
+
+    # 同一批次内相同主键只保留最后一条
+    deduped = {}
+    for row in rows:
+        deduped[tuple(row[k] for k in key)] = row
+
+    # 列集合不同的行（如只更新部分字段）分组处理，保证每条语句的列一致
+    groups = {}
+    for row in deduped.values():
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+
+    dialect = session.get_bind().dialect.name
+    insert_factory, max_variables = _DIALECT_INSERTS.get(dialect, (None, None))
+    key_columns = [table.c[k] for k in key]
+    key_expr = key_columns[0] if len(key) == 1 else tuple_(*key_columns)
+
+    for columns, group_rows in groups.items():
+        size = chunk_size
+        if max_variables:
+            size = max(1, min(chunk_size, max_variables // len(columns)))
+        for chunk in _chunks(group_rows, size):
+            chunk_keys = [tuple(r[k] for k in key) for r in chunk]
+            lookup_keys = [k[0] for k in chunk_keys] if len(key) == 1 else chunk_keys
+            existing = {
+                tuple(row[k] for k in key): row
+                for row in session.execute(
+                    select(*[table.c[c] for c in columns]).where(key_expr.in_(lookup_keys))
+                ).mappings()
+            }
+
+            to_write = []
+            for row_key, row in zip(chunk_keys, chunk):
+                current = existing.get(row_key)
+                if current is None:
+                    result.inserted += 1
+                elif any(current[c] != row[c] for c in columns):
+                    result.updated += 1
+                else:
+                    result.unchanged += 1
+                    continue
+                to_write.append(row)
+                result.changed_keys.append(row_key[0] if len(key) == 1 else row_key)
+
+            if not to_write:
+                continue
+            if insert_factory is None:
+                for row in to_write:
+                    session.merge(model(**row))
+                continue
+            stmt = insert_factory(table).values(to_write)
+            update_columns = {c: stmt.excluded[c] for c in columns if c not in key}
+            if update_columns:
+                stmt = stmt.on_conflict_do_update(index_elements=list(key), set_=update_columns)
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=list(key))
+            session.execute(stmt)
+    return result
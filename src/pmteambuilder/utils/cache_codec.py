@@ -0,0 +1,129 @@
+"""
+缓存值编解码
+
+招式列表、道具列表、1000 行的宝可梦分页等大列表原先以未压缩的 JSON 存入 Redis，每次命中都要传输完整文本再 json.loads。
+编码后的值格式：
+
+    0xC1 <格式字节> <数据>
+
+    - 0xC1 在 msgpack 中保留不用，也不可能是 JSON 文本的首字节，据此区分新旧格式；没有该前缀的旧值按 JSON 解码
+    - 格式字节高 4 位为序列化方式（1 = JSON，2 = msgpack），低 4 位为压缩方式（0 = 不压缩，1 = zlib）
+    - 序列化后超过 CACHE_COMPRESS_THRESHOLD 字节时才压缩，小值压缩收益不抵 CPU 开销
+
+默认使用 msgpack（未安装时退回 JSON），编码器可通过 CACHE_CODEC 配置切换，新旧格式可同时存在于 Redis 中。
+"""
+import json
+import zlib
+
+from flask import current_app, has_app_context
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - 未安装 msgpack 时退回 JSON
+    msgpack = None
+
+MAGIC = 0xC1
+
+SERIALIZER_JSON = 1
+SERIALIZER_MSGPACK = 2
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+
+
+class CacheCodecError(ValueError):
+    """缓存值格式无法识别（未知的序列化或压缩方式）"""
+
+
+def _json_dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _json_loads(data):
+    return json.loads(data)
+
+
+def _msgpack_dumps(value):
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def _msgpack_loads(data):
+    # 与 JSON 不同，整数键的 dict 会原样还原为整数键；缓存的结构都使用字符串键
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+_SERIALIZERS = {
+    SERIALIZER_JSON: (_json_dumps, _json_loads),
+}
+if msgpack is not None:
+    _SERIALIZERS[SERIALIZER_MSGPACK] = (_msgpack_dumps, _msgpack_loads)
+
+_SERIALIZER_NAMES = {'json': SERIALIZER_JSON, 'msgpack': SERIALIZER_MSGPACK}
+
+
+class CacheCodec:
+    """Python 值 <-> Redis 字节串"""
+
+    DEFAULT_COMPRESS_THRESHOLD = 1024
+    DEFAULT_COMPRESS_LEVEL = 1
+
+    def __init__(self, serializer=None, compress_threshold=None, compress_level=None):
+        self._serializer = serializer
+        self._compress_threshold = compress_threshold
+        self._compress_level = compress_level
+
+    @staticmethod
+    def _config(name, default):
+        if has_app_context():
+            return current_app.config.get(name, default)
+        return default
+
+    def _serializer_id(self):
+        name = self._serializer or self._config('CACHE_CODEC', 'msgpack')
+        serializer = _SERIALIZER_NAMES.get(name)
+        if serializer is None:
+            raise CacheCodecError(f"未知的缓存编码: {name}")
+        # 未安装 msgpack 时退回 JSON，已写入的 msgpack 值在这类进程中无法读取，按未命中处理
+        return serializer if serializer in _SERIALIZERS else SERIALIZER_JSON
+
+    def encode(self, value):
+        serializer = self._serializer_id()
+        data = _SERIALIZERS[serializer][0](value)
+        compression = COMPRESSION_NONE
+        threshold = self._compress_threshold
+        if threshold is None:
+            threshold = self._config('CACHE_COMPRESS_THRESHOLD', self.DEFAULT_COMPRESS_THRESHOLD)
+        if threshold is not None and threshold >= 0 and len(data) > threshold:
+            level = self._compress_level
+            if level is None:
+                level = self._config('CACHE_COMPRESS_LEVEL', self.DEFAULT_COMPRESS_LEVEL)
+            compressed = zlib.compress(data, level)
+            if len(compressed) < len(data):
+                data, compression = compressed, COMPRESSION_ZLIB
+        return bytes((MAGIC, serializer << 4 | compression)) + data
+
+    @staticmethod
+    def decode(raw):
+        """解码 Redis 中的值；None 原样返回，没有格式头的旧值按 JSON 解码"""
+        if raw is None:
+            return None
+        if isinstance(raw, str):
+            raw = raw.encode('utf-8')
+        if len(raw) < 2 or raw[0] != MAGIC:
+            return json.loads(raw)
+        serializer, compression = raw[1] >> 4, raw[1] & 0x0F
+        data = raw[2:]
+        if compression == COMPRESSION_ZLIB:
+            try:
+                data = zlib.decompress(data)
+            except zlib.error as e:
+                raise CacheCodecError(f"解压缓存值失败: {e}") from e
+        elif compression != COMPRESSION_NONE:
+            raise CacheCodecError(f"未知的压缩方式: {compression}")
+        if serializer not in _SERIALIZERS:
+            raise CacheCodecError(f"未知的序列化方式: {serializer}")
+        return _SERIALIZERS[serializer][1](data)
+
+
+# 默认编解码器（按 Flask 配置选择序列化方式与压缩阈值）
+cache_codec = CacheCodec()
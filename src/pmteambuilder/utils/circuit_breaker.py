@@ -0,0 +1,136 @@
+"""
+Redis 熔断器
+
+Redis 卡顿或重启时，每个请求都要等到 socket 超时才失败。熔断器统计最近若干次调用的失败率（连接错误、超时，
+以及耗时超过 slow_call_seconds 的慢调用）：
+    - closed     正常放行；窗口内失败率达到阈值时打开
+    - open       直接抛出 CircuitOpenError（RedisError 的子类，调用方已有的 except RedisError 照常生效），
+                 调用方改用进程内缓存或数据库；open_seconds 之后进入 half_open
+    - half_open  只放行一个探测调用，成功则关闭并清空统计，失败则重新打开
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+from redis.exceptions import ConnectionError as RedisConnectionError, RedisError, TimeoutError as RedisTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# 计为失败的异常：连接断开、超时；命令本身的错误（如 WRONGTYPE）不代表 Redis 不可用
+FAILURE_EXCEPTIONS = (RedisConnectionError, RedisTimeoutError, OSError)
+
+
+class CircuitOpenError(RedisError):
+    """熔断器打开时拒绝调用"""
+
+
+class CircuitBreaker:
+    """按滑动窗口失败率熔断，线程安全"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name='redis', window=20, min_calls=5, failure_rate=0.5, slow_call_seconds=0.25, open_seconds=5.0):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self._outcomes = deque(maxlen=window)  # True 表示失败
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.trips = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """是否放行本次调用；open 到期后转为 half_open 并只放行一个探测调用"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self.rejected += 1
+                    return False
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._probing:
+                self.rejected += 1
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self, elapsed):
+        if elapsed > self.slow_call_seconds:
+            self.record_failure(f"慢调用 {elapsed * 1000:.0f}ms")
+            return
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._probing = False
+                self._outcomes.clear()
+                logger.warning(f"[CircuitBreaker:{self.name}] 探测成功，恢复正常")
+                return
+            self._outcomes.append(False)
+
+    def record_failure(self, reason=None):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trip(f"探测失败: {reason}")
+                return
+            if self._state == self.OPEN:
+                return
+            self._outcomes.append(True)
+            failures = sum(self._outcomes)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._trip(f"最近 {len(self._outcomes)} 次调用失败 {failures} 次，最后一次: {reason}")
+
+    def _trip(self, reason):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+        self.trips += 1
+        logger.warning(f"[CircuitBreaker:{self.name}] 熔断 {self.open_seconds}s（{reason}）")
+
+    def call(self, func, *args, **kwargs):
+        """经过熔断器调用 func；打开时抛出 CircuitOpenError"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} 熔断中，暂停访问")
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except FAILURE_EXCEPTIONS as e:
+            self.record_failure(e)
+            raise
+        except RedisError:
+            # 命令本身出错说明 Redis 有响应，按成功统计
+            self.record_success(time.perf_counter() - started)
+            raise
+        except BaseException:
+            # 调用方自身的异常（参数错误、中断等）不计入统计，但要归还 half_open 的探测名额
+            with self._lock:
+                self._probing = False
+            raise
+        self.record_success(time.perf_counter() - started)
+        return result
+
+    def stats(self):
+        state = self.state
+        with self._lock:
+            return {
+                'state': state,
+                'recent_calls': len(self._outcomes),
+                'recent_failures': sum(self._outcomes),
+                'trips': self.trips,
+                'rejected': self.rejected,
+            }
@@ -0,0 +1,373 @@
+"""
+按数据集版本号隔离的缓存
+
+宝可梦参考数据只在同步时变化，因此缓存不再依赖固定 TTL 过期：
+    - Redis 中维护一个数据集版本号，同步完成后递增
+    - 所有缓存键都带上当前版本号（ds:<版本号>:<名称>），版本号变化后旧键立即不可达
+    - 缓存项不随时间批量过期；只设置较长且带随机抖动的兜底 TTL，防止查询组合类的键无限增长
+    - 版本号递增时在后台线程中清理更早版本的键（保留上一个版本，供尚未切换的进程读取）
+    - 值经 RedisService 的编解码器（默认 msgpack，较大时 zlib 压缩）存取，get/set 直接收发 Python 值
+    - 读取先经过进程内近端缓存（near_cache）；同一版本内键的值不会变化，填充时只放入本进程，不广播失效；
+      bump() 通过 near_cache 的 pub/sub 频道广播新版本号，其他进程收到后立即重新读取版本号并删除本进程中旧版本的条目，
+      消息丢失时按 DATASET_VERSION_CHECK_INTERVAL 轮询兜底
+    - Redis 不可用（含熔断打开）时读按未命中处理、写只进入近端缓存，调用方照常回退到快照或数据库
+    - get_or_fill 提供 single-flight 填充：进程内同一键只有一个线程计算，跨进程用短租约选出唯一计算者，
+      其他请求短暂等待结果或直接使用上一版本的旧值；可选按 XFetch 概率在兜底 TTL 到期前提前刷新
+"""
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from flask import current_app, g, has_app_context
+from redis.exceptions import RedisError
+
+from .near_cache import near_cache
+from .redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+DATASET_VERSION_KEY = 'dataset:version'
+KEY_PREFIX = 'ds'
+LEASE_PREFIX = 'ds-lease'
+
+# 只有持有者才能释放租约
+_RELEASE_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class DatasetCache:
+    """带数据集版本号的缓存（进程内缓存版本号，按间隔重新读取）"""
+
+    DEFAULT_CHECK_INTERVAL = 1.0
+    DEFAULT_MAX_TTL = 7 * 24 * 3600
+    DEFAULT_LEASE_SECONDS = 10
+    DEFAULT_FILL_WAIT = 2.0
+    POLL_INTERVAL = 0.05
+
+    def __init__(self):
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._release_script = None
+
+    @staticmethod
+    def _config(name, default):
+        if has_app_context():
+            return current_app.config.get(name, default)
+        return default
+
+    # ---- 版本号 ----
+
+    def version(self):
+        """当前数据集版本号；Redis 不可用时沿用上次读到的值；已用 pin() 固定版本时返回固定的版本"""
+        if self._pinned():
+            return g.dataset_version
+        interval = self._config('DATASET_VERSION_CHECK_INTERVAL', self.DEFAULT_CHECK_INTERVAL)
+        if self._version is not None and time.time() - self._checked_at < interval:
+            return self._version
+        try:
+            value = redis_service.redis_client.get(DATASET_VERSION_KEY)
+        except (RedisError, AttributeError) as e:
+            logger.warning(f"[DatasetCache] 读取数据集版本失败: {e}")
+            return self._version or 0
+        version = int(value) if value else 0
+        if version != self._version:
+            self._drop_stale_near_entries(version)
+        self._version = version
+        self._checked_at = time.time()
+        return self._version
+
+    @staticmethod
+    def _drop_stale_near_entries(version):
+        """版本号变化后旧版本的键不会再被读取，删除本进程近端缓存中不属于 version 的条目（只影响本进程）"""
+        current_prefix = f"{KEY_PREFIX}:{version}:"
+        near_cache.discard_matching(lambda key: key.startswith(f"{KEY_PREFIX}:") and not key.startswith(current_prefix))
+
+    def on_remote_version(self, version):
+        """其他进程 bump() 后的通知（在近端缓存的监听线程中调用）：下次 version() 立即读取 Redis，并删除旧版本条目"""
+        with self._lock:
+            self._checked_at = 0.0
+        self._drop_stale_near_entries(version)
+
+    @staticmethod
+    def _pinned():
+        return has_app_context() and 'dataset_version' in g
+
+    @staticmethod
+    def pin(version):
+        """
+        在当前应用上下文内固定版本号，unpin() 之前 version() 与缓存键都使用该版本；
+        固定期间 get_or_fill 不返回上一版本的旧值，保证响应与按该版本生成的 ETag 一致
+        """
+        g.dataset_version = version
+
+    @staticmethod
+    def unpin():
+        g.pop('dataset_version', None)
+
+    def bump(self):
+        """数据同步完成后递增版本号，并在后台清理旧版本的缓存键，返回新版本号"""
+        version = int(redis_service.redis_client.incr(DATASET_VERSION_KEY))
+        with self._lock:
+            self._version = version
+            self._checked_at = time.time()
+        # 只广播新版本号，各进程删除自己的旧版本条目；不广播清空，当前版本的条目保留
+        self._drop_stale_near_entries(version)
+        near_cache.publish_version(version)
+        threading.Thread(target=self.collect_garbage, args=(version,), name='dataset-cache-gc', daemon=True).start()
+        return version
+
+    # ---- 读写 ----
+
+    def key(self, name, version=None):
+        return f"{KEY_PREFIX}:{self.version() if version is None else version}:{name}"
+
+    def _ttl(self):
+        """兜底 TTL 加 ±10% 抖动，避免同一时刻写入的键同时过期；配置为 0/None 时不设 TTL"""
+        max_ttl = self._config('DATASET_CACHE_MAX_TTL', self.DEFAULT_MAX_TTL)
+        if not max_ttl:
+            return None
+        return int(max_ttl * random.uniform(0.9, 1.1))
+
+    @staticmethod
+    def _near_get(key):
+        return near_cache.get(key) if near_cache.enabled else None
+
+    @staticmethod
+    def _near_put(key, raw):
+        if near_cache.enabled:
+            near_cache.put(key, raw)
+
+    def _fetch(self, key):
+        """先查近端缓存，未命中时读 Redis 并放入近端缓存，返回编码后的字节串"""
+        raw = self._near_get(key)
+        if raw is None:
+            try:
+                raw = redis_service.get(key)
+            except RedisError as e:
+                logger.debug(f"[DatasetCache] 读取 {key} 失败，按未命中处理: {e}")
+                return None
+            self._near_put(key, raw)
+        return raw
+
+    def _publish(self, stored, extra=None):
+        """
+        把 {键: 编码值} 写入 Redis（extra 为同一 pipeline 中附带执行的命令），再放入本进程的近端缓存。
+        键带版本号，同一键的值在版本内不变，其他进程近端缓存中的同名条目不会过时，因此不广播失效。
+        Redis 写入失败时只保留在本进程的近端缓存中。
+        """
+        try:
+            with redis_service.pipeline() as pipe:
+                for key, raw in stored.items():
+                    pipe.set(key, raw, ex=self._ttl())
+                if extra:
+                    extra(pipe)
+        except RedisError as e:
+            logger.debug(f"[DatasetCache] 写入 {len(stored)} 个键失败，仅保留在进程内: {e}")
+        for key, raw in stored.items():
+            self._near_put(key, raw)
+
+    def get(self, name):
+        """读取 Python 值，未命中返回 None"""
+        return redis_service.decode(self._fetch(self.key(name)))
+
+    def set(self, name, value):
+        """写入 Python 值"""
+        key = self.key(name)
+        self._publish({key: redis_service.encode(value)})
+
+    def get_many(self, names):
+        """批量读取，返回与 names 顺序一致的值列表（未命中为 None）；近端缓存未命中的键合并为一次 MGET"""
+        if not names:
+            return []
+        version = self.version()
+        keys = [self.key(name, version) for name in names]
+        values = [self._near_get(key) for key in keys]
+        missing = [i for i, raw in enumerate(values) if raw is None]
+        if missing:
+            try:
+                fetched = redis_service.get_many([keys[i] for i in missing])
+            except RedisError as e:
+                logger.debug(f"[DatasetCache] 批量读取失败，按未命中处理: {e}")
+                fetched = [None] * len(missing)
+            for i, raw in zip(missing, fetched):
+                values[i] = raw
+                self._near_put(keys[i], raw)
+        return [redis_service.decode(raw) for raw in values]
+
+    def set_many(self, mapping):
+        """批量写入 {名称: Python 值}"""
+        if not mapping:
+            return
+        version = self.version()
+        self._publish({self.key(name, version): redis_service.encode(value) for name, value in mapping.items()})
+
+    # ---- single-flight 填充 ----
+
+    def get_or_fill(self, name, compute, cache_if=None, wait_seconds=None, early_refresh_beta=None):
+        """
+        读取缓存，未命中时调用 compute() 计算并写入，返回 Python 值。
+        cache_if: 判断结果是否写入缓存（如空结果不缓存），默认总是写入。
+        wait_seconds: 非计算者等待结果的最长时间，超时后自行计算。
+        early_refresh_beta: >0 时启用 XFetch 提前刷新，越大越早刷新。
+        已用 pin() 固定版本时只返回该版本的值：等待其他计算者的结果或自行计算，不使用上一版本的旧值。
+        """
+        wait_seconds = self._config('DATASET_CACHE_FILL_WAIT', self.DEFAULT_FILL_WAIT) if wait_seconds is None else wait_seconds
+        if early_refresh_beta is None:
+            early_refresh_beta = self._config('DATASET_CACHE_EARLY_REFRESH_BETA', 0)
+        version = self.version()
+        key = self.key(name, version)
+
+        cached, refresh_early = self._read(key, early_refresh_beta)
+        # 不存在或无法解码的值都按未命中处理
+        current = redis_service.decode(cached)
+        if current is not None and not refresh_early:
+            return current
+
+        # 进程内：同一键只有一个线程进入计算，其余线程等待同一个 Future
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            if current is not None:
+                return current
+            try:
+                value, stale = future.result(timeout=wait_seconds)
+            except FutureTimeoutError:
+                logger.warning(f"[DatasetCache] 等待 {name} 填充超时，自行计算")
+                return self._compute_and_store(key, compute, cache_if, early_refresh_beta)
+            if stale and self._pinned():
+                # 计算者拿到的是上一版本的旧值，固定版本的请求不能使用
+                return self._compute_and_store(key, compute, cache_if, early_refresh_beta)
+            return value
+
+        try:
+            value, stale = self._fill(key, name, version, compute, cache_if, current, wait_seconds, early_refresh_beta)
+            future.set_result((value, stale))
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _read(self, key, beta):
+        """读取缓存值；开启提前刷新时一并读取剩余 TTL 与上次计算耗时，按 XFetch 判断是否提前重算"""
+        if not beta:
+            return self._fetch(key), False
+        try:
+            with redis_service.pipeline() as pipe:
+                pipe.get(key)
+                pipe.pttl(key)
+                pipe.get(f"{key}:delta")
+        except RedisError as e:
+            logger.debug(f"[DatasetCache] 读取 {key} 失败，按未命中处理: {e}")
+            return self._near_get(key), False
+        cached, ttl_ms, delta = pipe.results
+        if cached is None or ttl_ms is None or ttl_ms < 0 or not delta:
+            return cached, False
+        # XFetch：剩余时间小于 计算耗时 * beta * -ln(rand) 时提前刷新，计算越慢、越接近过期越容易触发
+        return cached, float(delta) * beta * -math.log(1.0 - random.random()) >= ttl_ms / 1000.0
+
+    def _fill(self, key, name, version, compute, cache_if, current, wait_seconds, beta):
+        """
+        跨进程：拿到租约的进程计算；其他进程优先使用现有值或上一版本的旧值（固定版本时不使用旧值），否则短暂轮询新值。
+        返回 (值, 是否为上一版本的旧值)。
+        """
+        lease_key = f"{LEASE_PREFIX}:{key}"
+        token = uuid.uuid4().hex
+        lease_seconds = self._config('DATASET_CACHE_LEASE_SECONDS', self.DEFAULT_LEASE_SECONDS)
+        try:
+            acquired = redis_service.redis_client.set(lease_key, token, nx=True, px=int(lease_seconds * 1000))
+        except RedisError as e:
+            logger.debug(f"[DatasetCache] 获取填充租约失败，直接计算: {e}")
+            return self._compute_and_store(key, compute, cache_if, beta), False
+
+        if not acquired:
+            if current is not None:
+                # 其他进程正在提前刷新，继续使用当前值
+                return current, False
+            try:
+                # 固定版本的请求（如带 ETag 的参考数据接口）不能用旧值，否则旧数据会以新版本的 ETag 被客户端长期缓存
+                if version > 0 and not self._pinned():
+                    stale = redis_service.get_value(self.key(name, version - 1))
+                    if stale is not None:
+                        return stale, True
+                deadline = time.monotonic() + wait_seconds
+                while time.monotonic() < deadline:
+                    time.sleep(self.POLL_INTERVAL)
+                    filled = redis_service.get_value(key)
+                    if filled is not None:
+                        return filled, False
+            except RedisError as e:
+                logger.debug(f"[DatasetCache] 等待 {name} 填充时 Redis 不可用，自行计算: {e}")
+                return self._compute_and_store(key, compute, cache_if, beta), False
+            logger.warning(f"[DatasetCache] 等待其他进程填充 {name} 超时，自行计算")
+            return self._compute_and_store(key, compute, cache_if, beta), False
+
+        try:
+            return self._compute_and_store(key, compute, cache_if, beta), False
+        finally:
+            try:
+                if self._release_script is None:
+                    self._release_script = redis_service.redis_client.register_script(_RELEASE_LEASE_SCRIPT)
+                self._release_script(keys=[lease_key], args=[token])
+            except RedisError as e:
+                logger.warning(f"[DatasetCache] 释放填充租约失败（将自动过期）: {e}")
+
+    def _compute_and_store(self, key, compute, cache_if, beta):
+        started = time.perf_counter()
+        value = compute()
+        elapsed = time.perf_counter() - started
+        if cache_if is None or cache_if(value):
+            extra = (lambda pipe: pipe.set(f"{key}:delta", f"{elapsed:.4f}", ex=self._ttl())) if beta else None
+            self._publish({key: redis_service.encode(value)}, extra=extra)
+        return value
+
+    # ---- 清理 ----
+
+    @staticmethod
+    def collect_garbage(current_version, keep=1, batch_size=500):
+        """删除早于 current_version - keep 的版本的缓存键，返回删除的键数"""
+        oldest_kept = current_version - keep
+        deleted = 0
+        batch = []
+        try:
+            # 批量删除不经过熔断器，避免后台清理的慢调用影响请求
+            with redis_service.bulk():
+                client = redis_service.redis_client
+                for key in client.scan_iter(match=f"{KEY_PREFIX}:*", count=batch_size):
+                    raw = key.decode('utf-8') if isinstance(key, bytes) else key
+                    try:
+                        version = int(raw.split(':', 2)[1])
+                    except (IndexError, ValueError):
+                        continue
+                    if version < oldest_kept:
+                        batch.append(key)
+                    if len(batch) >= batch_size:
+                        deleted += client.unlink(*batch)
+                        batch = []
+                if batch:
+                    deleted += client.unlink(*batch)
+        except RedisError as e:
+            logger.warning(f"[DatasetCache] 清理旧版本缓存失败: {e}")
+        if deleted:
+            logger.info(f"[DatasetCache] 已清理 {deleted} 个早于版本 {oldest_kept} 的缓存键")
+        return deleted
+
+
+# 创建全局数据集缓存实例
+dataset_cache = DatasetCache()
+near_cache.add_version_listener(dataset_cache.on_remote_version)
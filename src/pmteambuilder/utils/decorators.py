@@ -1,7 +1,10 @@
+import hashlib
 from functools import wraps
-from flask import jsonify
+from flask import current_app, jsonify, request
 from flask_jwt_extended import verify_jwt_in_request, get_jwt
 
+from ..services.reference_snapshot import reference_snapshot
+
 def admin_required(fn):
     """
     JWT decorator that verifies a JWT is present and the user is an admin.
@@ -17,4 +20,48 @@ def admin_required(fn):
             return jsonify({"msg": "Admins only!"}), 403
     return wrapper
 
+def reference_data_etag(version):
+    """
+    Strong ETag for a reference-data GET: dataset version + path + sorted query string.
+    `version` must be the version the view reads from (see reference_snapshot.pin()),
+    so a new ETag never goes out with old data.
+    REFERENCE_CACHE_ETAG_SALT can be changed on deploy when the response format changes.
+    """
+    query = '&'.join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+    salt = current_app.config.get('REFERENCE_CACHE_ETAG_SALT', '')
+    digest = hashlib.sha1(f"{salt}|{request.path}?{query}".encode('utf-8')).hexdigest()[:20]
+    return f"v{version}-{digest}"
+
+
+def reference_cache(fn):
+    """
+    Conditional GET for endpoints serving rarely changing reference data.
+    The snapshot and dataset version are pinned for the duration of the view, and the ETag is built
+    from that same version. A matching If-None-Match is answered with 304 before the view runs
+    (no query or serialization); otherwise the view's 200 response gets the ETag and a public
+    Cache-Control with REFERENCE_CACHE_MAX_AGE / REFERENCE_CACHE_STALE_WHILE_REVALIDATE.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        version = reference_snapshot.pin()
+        try:
+            etag = reference_data_etag(version)
+            config = current_app.config
+            cache_control = (
+                f"public, max-age={config.get('REFERENCE_CACHE_MAX_AGE', 300)}, "
+                f"stale-while-revalidate={config.get('REFERENCE_CACHE_STALE_WHILE_REVALIDATE', 86400)}"
+            )
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = cache_control
+            return response
+        finally:
+            reference_snapshot.unpin()
+    return wrapper
+
 # Add other decorators here if needed 
\ No newline at end of file
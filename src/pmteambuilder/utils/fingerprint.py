@@ -0,0 +1,76 @@
+"""
+内容指纹同步模块
+
+对每一行规范化后的数据计算 sha256 指纹，与 sync_fingerprints 表中上次写入时的指纹比对：
+指纹相同的行完全跳过（不查询、不写入目标表），只有新增或变化的行才交给 bulk_upsert 写入。
+数据稳定时，一次全量刷新在数据库侧只有每块一条针对指纹表的主键查询。
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+
+from ..models import db
+from ..models.sync_fingerprint import SyncFingerprint
+from .bulk_upsert import UpsertResult, bulk_upsert
+
+
+def content_fingerprint(row):
+    """规范化（键排序、紧凑分隔符）后计算行内容的 sha256"""
+    payload = json.dumps(row, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def fingerprint_upsert(model, rows, key='id', entity=None, chunk_size=500, session=None):
+    """按内容指纹过滤后批量 upsert。
+
+    :param key: 单列主键名，作为指纹表的 resource_id
+    :param entity: 指纹表中的实体名，默认使用表名
+    :return: UpsertResult，unchanged 包含按指纹跳过的行数，changed_keys 即本次变更清单
+    """
+    session = session or db.session
+    entity = entity or model.__tablename__
+    result = UpsertResult()
+    if not rows:
+        return result
+
+    hashed = {}
+    for row in rows:
+        hashed[str(row[key])] = (row, content_fingerprint(row))
+
+    changed_rows = []
+    changed_hashes = []
+    resource_ids = list(hashed)
+    for i in range(0, len(resource_ids), chunk_size):
+        chunk = resource_ids[i:i + chunk_size]
+        known = dict(session.query(SyncFingerprint.resource_id, SyncFingerprint.content_hash).filter(
+            SyncFingerprint.entity == entity,
+            SyncFingerprint.resource_id.in_(chunk)
+        ).all())
+        for resource_id in chunk:
+            row, digest = hashed[resource_id]
+            if known.get(resource_id) == digest:
+                result.unchanged += 1
+                continue
+            changed_rows.append(row)
+            changed_hashes.append({
+                'entity': entity,
+                'resource_id': resource_id,
+                'content_hash': digest,
+                'updated_at': datetime.now(timezone.utc),
+            })
+
+    if changed_rows:
+        result += bulk_upsert(model, changed_rows, key=(key,), chunk_size=chunk_size, session=session)
+        bulk_upsert(SyncFingerprint, changed_hashes, key=('entity', 'resource_id'), chunk_size=chunk_size, session=session)
+    return result
+
+
+def reset_fingerprints(entity=None, session=None):
+    """清除指纹（下次同步时全部行重新比对写入），entity 为空时清除全部"""
+    session = session or db.session
+    query = session.query(SyncFingerprint)
+    if entity:
+        query = query.filter(SyncFingerprint.entity == entity)
+    deleted = query.delete(synchronize_session=False)
+    session.commit()
+    return deleted
@@ -0,0 +1,174 @@
+"""
+PokeAPI 出站 HTTP 客户端
+
+所有访问 PokeAPI 的请求共用同一套策略：
+    - 长连接池（requests.Session + HTTPAdapter）
+    - 有界超时（连接超时 + 读取超时），不会卡死在失效的连接上
+    - 429 / 5xx / 连接错误时指数退避重试，优先遵循 Retry-After
+    - 通过 Redis 令牌桶在所有线程、进程间共享请求速率
+    - 严格离线服务模式（OFFLINE_SERVING）下，请求处理过程中的出站访问立即失败并计数
+异步拉取器（AsyncPokeAPIFetcher）复用这里的重试判定、退避计算与限流器。
+"""
+import random
+import threading
+import time
+
+import logging
+
+import requests
+from flask import current_app, has_app_context, has_request_context
+from redis.exceptions import RedisError
+from requests.adapters import HTTPAdapter
+
+from .rate_limiter import RedisTokenBucket
+from .redis_service import redis_service
+from .sync_metrics import sync_metrics
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RATE_LIMIT_KEY = 'ratelimit:pokeapi'
+OUTBOUND_BLOCKED_KEY = 'http:outbound_blocked'
+
+
+class OutboundHTTPBlocked(requests.RequestException):
+    """严格离线服务模式下，请求处理过程中尝试访问外部接口"""
+
+
+def ensure_outbound_allowed(url):
+    """请求上下文中且开启 OFFLINE_SERVING 时拒绝出站访问：记录次数（Redis 计数器，各进程合计）后抛出 OutboundHTTPBlocked"""
+    if not has_request_context() or not current_app.config.get('OFFLINE_SERVING', False):
+        return
+    try:
+        redis_service.redis_client.incr(OUTBOUND_BLOCKED_KEY)
+    except (RedisError, AttributeError):
+        pass
+    logger.warning(f"[HttpClient] 离线服务模式下拒绝请求路径中的出站访问: {url}")
+    raise OutboundHTTPBlocked(f"离线服务模式下禁止在请求处理中访问 {url}")
+
+
+def outbound_blocked_count():
+    """被拒绝的出站访问累计次数"""
+    try:
+        return int(redis_service.redis_client.get(OUTBOUND_BLOCKED_KEY) or 0)
+    except (RedisError, AttributeError):
+        return None
+
+
+def backoff_delay(attempt, backoff_factor=0.5, backoff_max=30, retry_after=None):
+    """第 attempt 次（从 0 开始）重试前的等待秒数：有 Retry-After 时遵循之，否则指数退避并加抖动"""
+    if retry_after:
+        try:
+            return min(backoff_max, max(0.0, float(retry_after)))
+        except (TypeError, ValueError):
+            pass  # HTTP 日期格式的 Retry-After 按指数退避处理
+    delay = min(backoff_max, backoff_factor * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def rate_limiter_from_config():
+    """根据配置创建共享令牌桶，POKEAPI_RATE_LIMIT 为 0 时不限流"""
+    if not has_app_context():
+        return None
+    rate = current_app.config.get('POKEAPI_RATE_LIMIT')
+    if not rate:
+        return None
+    return RedisTokenBucket(RATE_LIMIT_KEY, rate, current_app.config.get('POKEAPI_RATE_BURST'))
+
+
+class PokeAPIHttpClient:
+    """带连接池、超时、重试和共享限流的同步 HTTP 客户端"""
+
+    DEFAULT_CONNECT_TIMEOUT = 5
+    DEFAULT_READ_TIMEOUT = 30
+    DEFAULT_POOL_SIZE = 32
+    DEFAULT_MAX_RETRIES = 4
+
+    def __init__(self, proxy=None, verify_ssl=False, connect_timeout=None, read_timeout=None, pool_size=None,
+                 max_retries=None, backoff_factor=0.5, backoff_max=30, rate_limiter=None):
+        self.proxies = {'http': proxy, 'https': proxy} if proxy else None
+        self.verify_ssl = verify_ssl
+        self.timeout = (connect_timeout or self.DEFAULT_CONNECT_TIMEOUT, read_timeout or self.DEFAULT_READ_TIMEOUT)
+        self.pool_size = pool_size or self.DEFAULT_POOL_SIZE
+        self.max_retries = self.DEFAULT_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.rate_limiter = rate_limiter
+        self._session = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls):
+        """根据 Flask 配置创建客户端"""
+        if not has_app_context():
+            return cls()
+        config = current_app.config
+        return cls(
+            proxy=config.get('POKEAPI_PROXY'),
+            verify_ssl=config.get('POKEAPI_VERIFY_SSL', False),
+            connect_timeout=config.get('POKEAPI_CONNECT_TIMEOUT'),
+            read_timeout=config.get('POKEAPI_FETCH_TIMEOUT'),
+            pool_size=config.get('POKEAPI_FETCH_LIMIT_PER_HOST'),
+            max_retries=config.get('POKEAPI_MAX_RETRIES'),
+            backoff_factor=config.get('POKEAPI_BACKOFF_FACTOR', 0.5),
+            backoff_max=config.get('POKEAPI_BACKOFF_MAX', 30),
+            rate_limiter=rate_limiter_from_config(),
+        )
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    # 重试由 get() 自行处理，以便每次重试都经过限流器
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.verify = self.verify_ssl
+                    if self.proxies:
+                        session.proxies.update(self.proxies)
+                    self._session = session
+        return self._session
+
+    def get(self, url, headers=None):
+        """GET 请求，429/5xx/连接错误时退避重试；最终失败时抛出 requests 异常"""
+        ensure_outbound_allowed(url)
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                sync_metrics.record_rate_limit_wait(self.rate_limiter.acquire())
+            retry_after = None
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                sync_metrics.record_http(time.perf_counter() - started)
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                sync_metrics.record_http(time.perf_counter() - started, response.status_code)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                retry_after = response.headers.get('Retry-After')
+                response.close()
+            sync_metrics.record_retry()
+            time.sleep(backoff_delay(attempt, self.backoff_factor, self.backoff_max, retry_after))
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """进程内共享的 PokeAPI 客户端（首次调用时按当前配置创建，复用连接池）"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = PokeAPIHttpClient.from_config()
+    return _shared_client
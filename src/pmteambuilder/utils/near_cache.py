@@ -0,0 +1,246 @@
+"""
+进程内近端缓存（Redis 前的一级缓存）
+
+团队广场等页面一次请求会读取几十个缓存键，每次都要访问 Redis。近端缓存在每个 worker 进程内
+保存最近读取的值，命中时不离开进程：
+    - LRU 淘汰，按字节数（键 + 值）计量，总量不超过 NEAR_CACHE_MAX_BYTES，单个过大的值不进入近端缓存
+    - 每个条目带最长存活时间 NEAR_CACHE_MAX_AGE，作为丢失失效消息时的兜底
+    - 调用 invalidate() 时通过 Redis pub/sub 广播失效消息，所有进程的监听线程收到后删除对应条目；
+      数据集版本号递增时 publish_version() 广播新版本号，各进程的监听线程调用 add_version_listener() 注册的回调
+      （数据集缓存据此立即切换版本并删除旧版本条目，不必等到下次轮询版本号）；
+      监听连接重新订阅成功后清空本地缓存，因为断开期间的消息可能已经丢失；
+      断开期间（Redis 故障）保留已有条目，作为 Redis 不可用时的本地兜底
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from redis.exceptions import RedisError
+
+from .redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = 'cache:invalidate'
+# 失效消息中表示清空全部条目的键
+ALL_KEYS = '*'
+
+# 每个条目的估算固定开销（OrderedDict 节点、元组、时间戳等）
+_ENTRY_OVERHEAD = 96
+
+
+class NearCache:
+    """按字节数限制大小的 LRU 缓存，值为 Redis 返回的 bytes"""
+
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+    DEFAULT_MAX_AGE = 300
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self, max_bytes=None, max_age=None):
+        self._max_bytes = max_bytes
+        self._max_age = max_age
+        self._entries = OrderedDict()  # key -> (value, size, stored_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._origin = uuid.uuid4().hex
+        self._listener_pid = None
+        self._stopped = None
+        self._version_listeners = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _config(name, default):
+        if has_app_context():
+            return current_app.config.get(name, default)
+        return default
+
+    @property
+    def enabled(self):
+        return bool(self._config('NEAR_CACHE_ENABLED', True))
+
+    @property
+    def max_bytes(self):
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return self._config('NEAR_CACHE_MAX_BYTES', self.DEFAULT_MAX_BYTES)
+
+    @property
+    def max_age(self):
+        if self._max_age is not None:
+            return self._max_age
+        return self._config('NEAR_CACHE_MAX_AGE', self.DEFAULT_MAX_AGE)
+
+    # ---- 读写 ----
+
+    def get(self, key):
+        """命中返回 bytes，未命中或已超过最长存活时间返回 None"""
+        self._ensure_listener()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, stored_at = entry
+            if time.monotonic() - stored_at > self.max_age:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """放入一个值；None 不缓存，超过总容量 1/8 的单个值也不缓存，避免挤掉大量小条目"""
+        if value is None:
+            return
+        size = len(key) + len(value) + _ENTRY_OVERHEAD
+        limit = self.max_bytes
+        if size > limit // 8:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic())
+            self._bytes += size
+            while self._bytes > limit and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def discard(self, *keys):
+        """只删除本进程的条目"""
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+    def discard_matching(self, predicate):
+        """只删除本进程中键满足 predicate 的条目，返回删除数量"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    # ---- 集群失效 ----
+
+    def invalidate(self, *keys):
+        """删除本进程的条目并广播给其他进程；不传键时清空全部"""
+        if keys:
+            self.discard(*keys)
+        else:
+            self.clear()
+        message = json.dumps({'origin': self._origin, 'keys': list(keys) or [ALL_KEYS]})
+        try:
+            redis_service.redis_client.publish(INVALIDATION_CHANNEL, message)
+        except (RedisError, AttributeError) as e:
+            logger.warning(f"[NearCache] 广播失效消息失败: {e}")
+
+    def add_version_listener(self, callback):
+        """注册数据集版本变化回调 callback(version)，在监听线程中收到其他进程的版本消息时调用"""
+        self._version_listeners.append(callback)
+
+    def publish_version(self, version):
+        """广播数据集版本号已变化；本进程由调用方自行处理，不触发回调"""
+        message = json.dumps({'origin': self._origin, 'version': version})
+        try:
+            redis_service.redis_client.publish(INVALIDATION_CHANNEL, message)
+        except (RedisError, AttributeError) as e:
+            logger.warning(f"[NearCache] 广播版本消息失败: {e}")
+
+    def _handle_message(self, data):
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if message.get('origin') == self._origin:
+            return
+        if 'version' in message:
+            for callback in self._version_listeners:
+                try:
+                    callback(message['version'])
+                except Exception as e:
+                    logger.warning(f"[NearCache] 处理版本消息失败: {e}")
+            return
+        keys = message.get('keys') or []
+        if ALL_KEYS in keys:
+            self.clear()
+        else:
+            self.discard(*keys)
+
+    def _ensure_listener(self):
+        """首次使用时启动监听线程；fork 出的子进程不会继承线程，按 pid 判断是否需要重新启动"""
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._lock:
+            if self._listener_pid == pid:
+                return
+            if self._listener_pid is not None:
+                # 子进程继承了父进程的条目，但父进程的监听线程不在，保守起见清空
+                self._entries.clear()
+                self._bytes = 0
+            self._listener_pid = pid
+            # 每个监听线程使用自己的停止事件，stop() 之后重新启动不会唤醒旧线程
+            self._stopped = stopped = threading.Event()
+            threading.Thread(target=self._listen, args=(stopped,), name='near-cache-invalidation', daemon=True).start()
+
+    def _listen(self, stopped):
+        while not stopped.is_set():
+            pubsub = None
+            try:
+                pubsub = redis_service.redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # 订阅成功前的失效消息收不到，清空一次，保证之后读到的都是订阅后写入的值
+                self.clear()
+                while not stopped.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get('type') == 'message':
+                        self._handle_message(message['data'])
+            except (RedisError, AttributeError, OSError) as e:
+                logger.warning(f"[NearCache] 失效消息订阅中断，{self.RECONNECT_DELAY}s 后重连: {e}")
+                stopped.wait(self.RECONNECT_DELAY)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except (RedisError, OSError):
+                        pass
+
+    def stop(self):
+        """停止监听线程（下次使用时会重新启动）"""
+        with self._lock:
+            if self._stopped is not None:
+                self._stopped.set()
+            self._listener_pid = None
+
+
+# 创建全局近端缓存实例
+near_cache = NearCache()
@@ -0,0 +1,93 @@
+"""
+基于 Redis 的令牌桶限流器
+
+同一台机器上的多个线程、进程（如多个同步 worker）共享同一个桶，
+整体请求速率不超过 rate 次/秒，允许最多 burst 次的突发。
+Redis 不可用时放行（fail-open），只记录一次警告，不阻塞数据同步。
+"""
+import asyncio
+import logging
+import time
+
+from redis.exceptions import RedisError
+
+from .redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+# 按经过的时间补充令牌后尝试取出；返回 0 表示成功，否则返回需要等待的毫秒数
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = burst
+    ts = now
+end
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait_ms = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait_ms = math.ceil((requested - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return wait_ms
+"""
+
+
+class RedisTokenBucket:
+    """Redis 令牌桶"""
+
+    def __init__(self, key, rate, burst=None, redis_client=None):
+        if rate <= 0:
+            raise ValueError("rate 必须大于 0")
+        self.key = key
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self._redis_client = redis_client
+        self._script = None
+        self._warned = False
+
+    @property
+    def redis(self):
+        return self._redis_client or redis_service.redis_client
+
+    def try_acquire(self, tokens=1):
+        """尝试取出令牌，成功返回 0，否则返回建议等待的秒数"""
+        try:
+            if self._script is None:
+                self._script = self.redis.register_script(_TOKEN_BUCKET_SCRIPT)
+            wait_ms = self._script(keys=[self.key], args=[self.rate, self.burst, time.time(), tokens])
+        except RedisError as e:
+            if not self._warned:
+                logger.warning(f"[RateLimiter] Redis 不可用，暂不限流: {e}")
+                self._warned = True
+            return 0
+        return int(wait_ms) / 1000.0
+
+    def acquire(self, tokens=1):
+        """阻塞直到取得令牌，返回累计等待的秒数"""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, tokens=1):
+        """协程版本的 acquire：Redis 调用放到线程池执行，取令牌和等待期间都不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        waited = 0.0
+        while True:
+            wait = await loop.run_in_executor(None, self.try_acquire, tokens)
+            if wait <= 0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
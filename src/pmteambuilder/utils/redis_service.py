@@ -1,31 +1,245 @@
 """
 Redis集成模块
+
+单键操作之外提供批量接口（get_many / set_many / delete_many，以及编码值版本 get_values / set_values），
+N 个键合并为一次往返；需要组合多条命令时使用 with redis_service.pipeline() as pipe: ...，退出时一次性执行。
+
+redis_client 的每条命令（以及 pipeline 的 execute、Lua 脚本调用）都经过熔断器：Redis 不可用时快速抛出 CircuitOpenError
+（RedisError 子类），由调用方回退到进程内缓存或数据库，而不是每个请求都等到 socket 超时。
+
+较短的 socket 超时与慢调用阈值只适合 Web 请求。数据同步中的大 pipeline、大值写入与批量删除在
+with redis_service.bulk(): 块内执行：本线程的命令改用 REDIS_BULK_SOCKET_TIMEOUT 的独立连接池，且不经过熔断器，
+不会因耗时较长而把熔断器打开，也不会在熔断期间写入失败。
 """
+import logging
+import threading
+from contextlib import contextmanager, nullcontext
+
 import redis
 from flask import current_app
 
+from .cache_codec import CacheCodecError, cache_codec
+from .circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+class _GuardedPipeline:
+    """pipeline 包装：排队命令原样转发，execute 经过熔断器"""
+
+    def __init__(self, pipeline, breaker):
+        self._pipeline = pipeline
+        self._breaker = breaker
+
+    def execute(self, *args, **kwargs):
+        return self._breaker.call(self._pipeline.execute, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._pipeline, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._pipeline.reset()
+
+
+class _GuardedScript:
+    """Lua 脚本包装：调用经过熔断器；批量模式下改用批量连接且不经过熔断器"""
+
+    def __init__(self, script, guard):
+        self._script = script
+        self._guard = guard
+
+    def __call__(self, keys=None, args=None, client=None):
+        if client is not None:
+            return self._script(keys=keys, args=args, client=client)
+        if self._guard.bulk_mode:
+            return self._script(keys=keys, args=args, client=self._guard.bulk_client)
+        return self._guard.breaker.call(self._script, keys=keys, args=args)
+
+    def __getattr__(self, name):
+        return getattr(self._script, name)
+
+
+class _GuardedRedis:
+    """redis 客户端包装：每条命令经过熔断器；bulk() 块内本线程的命令改用批量客户端"""
+
+    # 不经过熔断器的属性：pubsub 由调用方自行处理重连
+    _PASSTHROUGH = frozenset({'pubsub', 'connection_pool', 'get_encoder', 'close'})
+
+    def __init__(self, client, breaker, bulk_client=None):
+        self._client = client
+        self._breaker = breaker
+        self._bulk_client = bulk_client or client
+        self._local = threading.local()
+
+    @property
+    def raw(self):
+        return self._client
+
+    @property
+    def breaker(self):
+        return self._breaker
+
+    @property
+    def bulk_client(self):
+        return self._bulk_client
+
+    @property
+    def bulk_mode(self):
+        return getattr(self._local, 'bulk', False)
+
+    @contextmanager
+    def bulk(self):
+        """本线程内的命令使用批量客户端（较长 socket 超时）且不经过熔断器，可嵌套"""
+        previous = self.bulk_mode
+        self._local.bulk = True
+        try:
+            yield
+        finally:
+            self._local.bulk = previous
+
+    def pipeline(self, *args, **kwargs):
+        if self.bulk_mode:
+            return self._bulk_client.pipeline(*args, **kwargs)
+        return _GuardedPipeline(self._client.pipeline(*args, **kwargs), self._breaker)
+
+    def register_script(self, script):
+        return _GuardedScript(self._client.register_script(script), self)
+
+    def __getattr__(self, name):
+        if self.bulk_mode and name not in self._PASSTHROUGH:
+            return getattr(self._bulk_client, name)
+        attr = getattr(self._client, name)
+        if name in self._PASSTHROUGH or not callable(attr):
+            return attr
+        breaker = self._breaker
+
+        def guarded(*args, **kwargs):
+            return breaker.call(attr, *args, **kwargs)
+        return guarded
+
+
 class RedisService:
     """Redis服务类，提供Redis操作的封装"""
     
-    def __init__(self, app=None):
+    def __init__(self, app=None, codec=None):
         self.redis_client = None
+        self.codec = codec or cache_codec
+        self.breaker = CircuitBreaker('redis')
         if app is not None:
             self.init_app(app)
     
     def init_app(self, app):
-        """初始化Redis客户端"""
-        self.redis_client = redis.from_url(app.config['REDIS_URL'])
+        """初始化Redis客户端（较短的 socket 超时配合熔断器，Redis 卡顿时快速失败）"""
+        config = app.config
+        self.breaker = CircuitBreaker(
+            'redis',
+            failure_rate=config.get('REDIS_BREAKER_FAILURE_RATE', 0.5),
+            slow_call_seconds=config.get('REDIS_BREAKER_SLOW_CALL_SECONDS', 0.25),
+            open_seconds=config.get('REDIS_BREAKER_OPEN_SECONDS', 5.0),
+        )
+        client = redis.from_url(
+            config['REDIS_URL'],
+            socket_timeout=config.get('REDIS_SOCKET_TIMEOUT'),
+            socket_connect_timeout=config.get('REDIS_SOCKET_CONNECT_TIMEOUT'),
+        )
+        if not config.get('REDIS_BREAKER_ENABLED', True):
+            self.redis_client = client
+            return
+        # 批量客户端使用独立的连接池，连接在首次进入 bulk() 时才建立，Web 进程不使用时没有开销
+        bulk_client = redis.from_url(
+            config['REDIS_URL'],
+            socket_timeout=config.get('REDIS_BULK_SOCKET_TIMEOUT', 10.0),
+            socket_connect_timeout=config.get('REDIS_SOCKET_CONNECT_TIMEOUT'),
+        )
+        self.redis_client = _GuardedRedis(client, self.breaker, bulk_client)
+
+    def bulk(self):
+        """
+        数据同步等后台批量任务使用：块内本线程的命令不经过熔断器，并使用较长的 socket 超时。
+        未启用熔断器时不做任何处理。
+        """
+        bulk = getattr(self.redis_client, 'bulk', None)
+        return bulk() if bulk is not None else nullcontext()
     
+    @contextmanager
+    def pipeline(self, transaction=False):
+        """
+        上下文管理的 pipeline：块内排队的命令在退出时一次往返执行，块内抛出异常时丢弃不执行。
+        transaction=True 时以 MULTI/EXEC 原子执行。执行结果可在退出后通过 pipe.results 读取。
+        """
+        pipe = self.redis_client.pipeline(transaction=transaction)
+        try:
+            yield pipe
+            pipe.results = pipe.execute()
+        finally:
+            pipe.reset()
+
+    @staticmethod
+    def _expire_for(expire, key):
+        """expire 可以是统一的秒数，也可以是 {键: 秒数}（未列出的键不过期）"""
+        if isinstance(expire, dict):
+            return expire.get(key) or None
+        return expire or None
+
     def set(self, key, value, expire=None):
-        """设置键值对"""
-        self.redis_client.set(key, value)
-        if expire:
-            self.redis_client.expire(key, expire)
+        """设置键值对（带过期时间时以 SET ... EX 原子写入）"""
+        self.redis_client.set(key, value, ex=expire or None)
     
     def get(self, key):
         """获取键值"""
         return self.redis_client.get(key)
+
+    def get_many(self, keys):
+        """一次 MGET 读取多个键，返回与 keys 顺序一致的列表（不存在为 None）"""
+        keys = list(keys)
+        if not keys:
+            return []
+        return self.redis_client.mget(keys)
+
+    def set_many(self, mapping, expire=None):
+        """一次往返写入多个键值对；expire 为统一秒数或 {键: 秒数}"""
+        if not mapping:
+            return
+        with self.pipeline() as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=self._expire_for(expire, key))
+
+    def delete_many(self, *keys):
+        """一次删除多个键，返回删除的数量"""
+        if not keys:
+            return 0
+        return self.redis_client.delete(*keys)
     
+    def encode(self, value):
+        """按缓存编解码器编码 Python 值"""
+        return self.codec.encode(value)
+
+    def decode(self, raw):
+        """解码缓存值；格式无法识别时记录日志并按未命中（None）处理"""
+        try:
+            return self.codec.decode(raw)
+        except (CacheCodecError, ValueError) as e:
+            logger.warning(f"[RedisService] 缓存值解码失败，按未命中处理: {e}")
+            return None
+
+    def set_value(self, key, value, expire=None):
+        """编码后写入 Python 值"""
+        self.redis_client.set(key, self.encode(value), ex=expire)
+
+    def get_value(self, key):
+        """读取并解码 Python 值，不存在时返回 None"""
+        return self.decode(self.redis_client.get(key))
+
+    def get_values(self, keys):
+        """get_many 的编码值版本"""
+        return [self.decode(raw) for raw in self.get_many(keys)]
+
+    def set_values(self, mapping, expire=None):
+        """set_many 的编码值版本"""
+        self.set_many({key: self.encode(value) for key, value in mapping.items()}, expire)
+
     def delete(self, key):
         """删除键值对"""
         self.redis_client.delete(key)
@@ -36,23 +250,23 @@ class RedisService:
     
     def set_list(self, key, values, expire=None):
         """设置列表"""
-        pipeline = self.redis_client.pipeline()
-        pipeline.delete(key)
-        if values:
-            pipeline.rpush(key, *values)
-            if expire:
-                pipeline.expire(key, expire)
-        pipeline.execute()
+        with self.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            if values:
+                pipe.rpush(key, *values)
+                if expire:
+                    pipe.expire(key, expire)
     
     def get_list(self, key):
         """获取列表所有元素"""
         return self.redis_client.lrange(key, 0, -1)
     
     def set_hash(self, key, mapping, expire=None):
-        """设置哈希表"""
-        self.redis_client.hmset(key, mapping)
-        if expire:
-            self.redis_client.expire(key, expire)
+        """设置哈希表（HSET mapping 与 EXPIRE 在同一事务中执行）"""
+        with self.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=mapping)
+            if expire:
+                pipe.expire(key, expire)
     
     def get_hash(self, key):
         """获取哈希表所有字段和值"""
@@ -0,0 +1,199 @@
+"""
+PokeAPI 响应磁盘缓存模块
+
+按 URL 建立索引，响应体按内容哈希（sha256）压缩存储，相同内容只保存一份：
+
+    <root>/index/ab/<sha256(url)>.json     元数据：url、body_sha256、fetched_at、etag、last_modified
+    <root>/objects/cd/<sha256(body)>.gz    gzip 压缩的响应体
+
+支持三种模式：
+    off        不读不写，直接走网络
+    readwrite  命中且未过期直接读盘；过期时带 If-None-Match / If-Modified-Since 重新验证
+    replay     只读缓存，未命中时抛出 ResponseCacheMiss，保证完全不访问网络
+
+同步（PokemonDataService._get_json）与异步（AsyncPokeAPIFetcher）两条拉取路径都通过
+cached_fetch / cached_fetch_async 走同一套 查找 -> 重新验证 -> 写入 流程，只各自提供发请求的 do_get。
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from flask import current_app, has_app_context
+
+from .sync_metrics import sync_metrics
+
+
+class ResponseCacheMiss(LookupError):
+    """replay 模式下缓存未命中"""
+
+
+class ResponseCache:
+    """URL -> 压缩响应体 的持久化存储"""
+
+    MODE_OFF = 'off'
+    MODE_READWRITE = 'readwrite'
+    MODE_REPLAY = 'replay'
+
+    def __init__(self, root, ttl=None, listing_ttl=None, mode=MODE_READWRITE):
+        if mode not in (self.MODE_OFF, self.MODE_READWRITE, self.MODE_REPLAY):
+            raise ValueError(f"未知的响应缓存模式: {mode}")
+        self.root = root
+        self.ttl = ttl or None
+        self.listing_ttl = listing_ttl or None
+        self.mode = mode
+
+    @classmethod
+    def from_config(cls):
+        """根据 Flask 配置创建缓存实例"""
+        if not has_app_context():
+            return cls(cls.default_root(), mode=cls.MODE_OFF)
+        config = current_app.config
+        return cls(
+            config.get('POKEAPI_CACHE_DIR') or cls.default_root(),
+            ttl=config.get('POKEAPI_CACHE_TTL'),
+            listing_ttl=config.get('POKEAPI_CACHE_LISTING_TTL'),
+            mode=config.get('POKEAPI_CACHE_MODE', cls.MODE_READWRITE),
+        )
+
+    @staticmethod
+    def default_root():
+        # 与 dev.db 一样放在 src/instance/ 下
+        return os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "instance", "pokeapi_cache"))
+
+    @property
+    def enabled(self):
+        return self.mode != self.MODE_OFF
+
+    @property
+    def replay_only(self):
+        return self.mode == self.MODE_REPLAY
+
+    @staticmethod
+    def _digest(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def _index_path(self, url):
+        key = self._digest(url.encode('utf-8'))
+        return os.path.join(self.root, 'index', key[:2], f"{key}.json")
+
+    def _object_path(self, body_sha256):
+        return os.path.join(self.root, 'objects', body_sha256[:2], f"{body_sha256}.gz")
+
+    @staticmethod
+    def _atomic_write(path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def lookup(self, url):
+        """返回 URL 对应的元数据字典，不存在时返回 None"""
+        if not self.enabled:
+            return None
+        try:
+            with open(self._index_path(url), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if not os.path.exists(self._object_path(meta['body_sha256'])):
+            return None
+        return meta
+
+    def is_fresh(self, meta):
+        """判断缓存是否仍然有效。
+
+        带查询参数的列表页（?limit=&offset=）会随新资源增加而变化，使用 listing_ttl；
+        单个资源基本不可变，未配置 ttl 时视为永久有效。
+        """
+        ttl = self.listing_ttl if '?' in meta.get('url', '') else self.ttl
+        if ttl is None:
+            return True
+        return time.time() - meta.get('fetched_at', 0) < ttl
+
+    def read(self, meta):
+        """读取并解析缓存的 JSON 响应体"""
+        with open(self._object_path(meta['body_sha256']), 'rb') as f:
+            return json.loads(gzip.decompress(f.read()))
+
+    @staticmethod
+    def conditional_headers(meta):
+        """生成重新验证所需的条件请求头"""
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def store(self, url, body, etag=None, last_modified=None):
+        """写入响应体（bytes）及其元数据"""
+        if not self.enabled or self.replay_only:
+            return
+        body_sha256 = self._digest(body)
+        object_path = self._object_path(body_sha256)
+        if not os.path.exists(object_path):
+            self._atomic_write(object_path, gzip.compress(body, compresslevel=6))
+        meta = {
+            'url': url,
+            'body_sha256': body_sha256,
+            'fetched_at': time.time(),
+            'etag': etag,
+            'last_modified': last_modified,
+        }
+        self._atomic_write(self._index_path(url), json.dumps(meta).encode('utf-8'))
+
+    def touch(self, url, meta):
+        """304 重新验证成功后刷新 fetched_at"""
+        if not self.enabled or self.replay_only:
+            return
+        meta = dict(meta, fetched_at=time.time())
+        self._atomic_write(self._index_path(url), json.dumps(meta).encode('utf-8'))
+
+    def miss(self, url):
+        """replay 模式下的未命中处理"""
+        raise ResponseCacheMiss(f"响应缓存未命中（replay 模式禁止联网）: {url}")
+
+    def _begin(self, url):
+        """查找缓存：返回 (命中, 缓存值, 元数据, 条件请求头)；replay 模式下未命中直接抛出 ResponseCacheMiss"""
+        meta = self.lookup(url)
+        if meta is not None and (self.replay_only or self.is_fresh(meta)):
+            sync_metrics.record_cache_hit()
+            return True, self.read(meta), meta, None
+        if self.replay_only:
+            self.miss(url)
+        return False, None, meta, self.conditional_headers(meta) if meta is not None else None
+
+    def _finish(self, url, meta, status, body, headers):
+        """处理响应：304 刷新 fetched_at 并读盘，否则写入缓存并解析响应体"""
+        if status == 304 and meta is not None:
+            self.touch(url, meta)
+            return self.read(meta)
+        self.store(url, body, etag=headers.get('ETag'), last_modified=headers.get('Last-Modified'))
+        return json.loads(body)
+
+    def cached_fetch(self, url, do_get):
+        """带缓存的同步拉取。
+
+        do_get(headers) 负责发出请求（含重试、限流、HTTP 指标），返回 (status, body, response_headers)；
+        headers 为重新验证用的条件请求头（无缓存时为 None），非 304 的错误状态应由 do_get 自行抛出。
+        """
+        hit, value, meta, headers = self._begin(url)
+        if hit:
+            return value
+        return self._finish(url, meta, *do_get(headers))
+
+    async def cached_fetch_async(self, url, do_get):
+        """cached_fetch 的异步版本，do_get 为 async 函数"""
+        hit, value, meta, headers = self._begin(url)
+        if hit:
+            return value
+        return self._finish(url, meta, *(await do_get(headers)))
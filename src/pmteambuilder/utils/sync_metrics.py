@@ -0,0 +1,332 @@
+"""
+数据同步指标采集模块
+
+按阶段（stage）统计同步过程中的吞吐与耗时，用于判断慢同步的瓶颈在网络、数据库还是锁：
+    - 条目数与 items/sec
+    - HTTP 请求延迟分位数（p50/p90/p99）、状态码分布、重试次数、缓存命中
+    - 每个批次的数据库写入耗时
+    - 锁/认领争用次数与限流等待时间
+    - 任务队列深度
+
+阶段结束与整轮同步结束时，以 JSON 行写入机器可读日志（默认 logs/sync_metrics.jsonl）；
+整轮汇总同时保存到 Redis，供 /api/admin/sync/metrics 查询。
+
+各写库步骤通过 record_changes() 上报实际新增、变更或删除的行数，累计到 Redis 中的待发布计数（所有同步进程共享）；
+协调者（refresh_all_data 或 sync_worker.py --enqueue）只在计数大于 0 时发布新的数据集版本。
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from flask import current_app, has_app_context
+from redis.exceptions import RedisError
+
+from .redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+CURRENT_RUN_KEY = 'sync:metrics:current'
+LAST_RUN_KEY = 'sync:metrics:last_run'
+RUN_HISTORY_KEY = 'sync:metrics:runs'
+RUN_HISTORY_SIZE = 20
+# 尚未发布的变更行数，由各同步进程累加，发布新版本后扣减
+PENDING_CHANGES_KEY = 'sync:pending_changes'
+
+# 扣减待发布计数，减到 0 及以下时删除
+_CLEAR_PENDING_SCRIPT = """
+if redis.call('DECRBY', KEYS[1], ARGV[1]) <= 0 then
+    redis.call('DEL', KEYS[1])
+end
+return 1
+"""
+
+
+class _Samples:
+    """固定容量的水塘抽样，用于估算分位数"""
+    __slots__ = ('capacity', 'count', 'values')
+
+    def __init__(self, capacity=5000):
+        self.capacity = capacity
+        self.count = 0
+        self.values = []
+
+    def add(self, value):
+        self.count += 1
+        if len(self.values) < self.capacity:
+            self.values.append(value)
+        else:
+            index = random.randrange(self.count)
+            if index < self.capacity:
+                self.values[index] = value
+
+    def summary(self):
+        if not self.values:
+            return {'count': 0}
+        ordered = sorted(self.values)
+
+        def pct(p):
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 2)
+
+        return {
+            'count': self.count,
+            'avg_ms': round(sum(ordered) / len(ordered) * 1000, 2),
+            'p50_ms': pct(0.50),
+            'p90_ms': pct(0.90),
+            'p99_ms': pct(0.99),
+            'max_ms': round(ordered[-1] * 1000, 2),
+        }
+
+
+class _StageStats:
+    """单个阶段的统计"""
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.time()
+        self.finished_at = None
+        self.items = 0
+        self.http = _Samples()
+        self.http_status = {}
+        self.http_errors = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.db_writes = _Samples()
+        self.db_rows = 0
+        self.db_seconds = 0.0
+        self.lock_contended = 0
+        self.rate_limit_wait = 0.0
+        self.changed_rows = 0
+
+    def to_dict(self):
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            'stage': self.name,
+            'elapsed_s': round(elapsed, 3),
+            'items': self.items,
+            'items_per_sec': round(self.items / elapsed, 2) if elapsed > 0 else None,
+            'http': dict(self.http.summary(), status=self.http_status, errors=self.http_errors, retries=self.retries, cache_hits=self.cache_hits),
+            'db_write': dict(self.db_writes.summary(), rows=self.db_rows, total_s=round(self.db_seconds, 3)),
+            'lock_contended': self.lock_contended,
+            'rate_limit_wait_s': round(self.rate_limit_wait, 3),
+            'changed_rows': self.changed_rows,
+            'finished': self.finished_at is not None,
+        }
+
+
+class SyncMetrics:
+    """进程内的同步指标收集器（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.run_id = None
+        self.run_started_at = None
+        self.stages = {}
+        self.queue_depth = {}
+        # Redis 不可用时本进程记录的变更行数，保证本进程作为协调者时仍能发布
+        self._local_changes = 0
+
+    # ---- 生命周期 ----
+
+    def start_run(self):
+        """开始新一轮同步，清空上一轮的统计"""
+        with self._lock:
+            self.run_id = uuid.uuid4().hex[:12]
+            self.run_started_at = time.time()
+            self.stages = {}
+            self.queue_depth = {}
+        return self.run_id
+
+    @contextmanager
+    def stage(self, name):
+        """阶段上下文：期间在本线程记录的 HTTP、写库等指标都归入该阶段"""
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None or stats.finished_at is not None:
+                stats = self.stages[name] = _StageStats(name)
+        previous = getattr(self._local, 'stage', None)
+        self._local.stage = name
+        try:
+            yield stats
+        finally:
+            self._local.stage = previous
+            stats.finished_at = time.time()
+            self._emit('stage', stats.to_dict())
+            self.publish()
+
+    def finish_run(self, status='ok'):
+        """结束本轮同步：写日志并在 Redis 中保存汇总，返回汇总字典"""
+        summary = self.snapshot()
+        summary['status'] = status
+        summary['finished_at'] = time.time()
+        self._emit('run', summary)
+        try:
+            payload = json.dumps(summary, ensure_ascii=False)
+            pipe = redis_service.redis_client.pipeline()
+            pipe.set(CURRENT_RUN_KEY, payload, ex=24 * 3600)
+            pipe.set(LAST_RUN_KEY, payload)
+            pipe.lpush(RUN_HISTORY_KEY, payload)
+            pipe.ltrim(RUN_HISTORY_KEY, 0, RUN_HISTORY_SIZE - 1)
+            pipe.execute()
+        except (RedisError, AttributeError) as e:
+            logger.warning(f"[SyncMetrics] 保存同步汇总失败: {e}")
+        return summary
+
+    # ---- 记录 ----
+
+    def _current(self):
+        name = getattr(self._local, 'stage', None) or 'default'
+        stats = self.stages.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self.stages.setdefault(name, _StageStats(name))
+        return stats
+
+    def record_items(self, count=1):
+        stats = self._current()
+        with self._lock:
+            stats.items += count
+
+    def record_http(self, seconds, status=None):
+        stats = self._current()
+        with self._lock:
+            stats.http.add(seconds)
+            if status is None:
+                stats.http_errors += 1
+            else:
+                stats.http_status[str(status)] = stats.http_status.get(str(status), 0) + 1
+
+    def record_retry(self):
+        stats = self._current()
+        with self._lock:
+            stats.retries += 1
+
+    def record_cache_hit(self):
+        stats = self._current()
+        with self._lock:
+            stats.cache_hits += 1
+
+    def record_db_write(self, seconds, rows=0):
+        stats = self._current()
+        with self._lock:
+            stats.db_writes.add(seconds)
+            stats.db_rows += rows
+            stats.db_seconds += seconds
+
+    def record_lock_contention(self, count=1):
+        stats = self._current()
+        with self._lock:
+            stats.lock_contended += count
+
+    def record_rate_limit_wait(self, seconds):
+        stats = self._current()
+        with self._lock:
+            stats.rate_limit_wait += seconds
+
+    def record_changes(self, count):
+        """记录已提交的新增、变更或删除行数，并累加到跨进程共享的待发布计数"""
+        if not count:
+            return
+        stats = self._current()
+        with self._lock:
+            stats.changed_rows += count
+            self._local_changes += count
+        try:
+            redis_service.redis_client.incrby(PENDING_CHANGES_KEY, count)
+        except (RedisError, AttributeError) as e:
+            logger.warning(f"[SyncMetrics] 记录待发布变更失败: {e}")
+
+    def pending_changes(self):
+        """尚未发布的变更行数（所有同步进程合计）；Redis 不可用时只统计本进程"""
+        try:
+            value = redis_service.redis_client.get(PENDING_CHANGES_KEY)
+        except (RedisError, AttributeError) as e:
+            logger.warning(f"[SyncMetrics] 读取待发布变更失败: {e}")
+            value = None
+        return max(int(value or 0), self._local_changes)
+
+    def clear_pending_changes(self, count):
+        """发布新版本后扣减已发布的变更行数；发布期间其他进程新增的变更保留到下次发布"""
+        with self._lock:
+            self._local_changes = 0
+        try:
+            redis_service.redis_client.eval(_CLEAR_PENDING_SCRIPT, 1, PENDING_CHANGES_KEY, count)
+        except (RedisError, AttributeError) as e:
+            logger.warning(f"[SyncMetrics] 扣减待发布变更失败: {e}")
+
+    def set_queue_depth(self, queue, depth):
+        with self._lock:
+            self.queue_depth[queue] = depth
+
+    @contextmanager
+    def time_db_write(self, rows=0):
+        """计时一次批量写库"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_db_write(time.perf_counter() - started, rows)
+
+    # ---- 导出 ----
+
+    def snapshot(self):
+        """当前一轮同步的指标快照"""
+        with self._lock:
+            stages = [stats.to_dict() for stats in self.stages.values()]
+            queue_depth = dict(self.queue_depth)
+        return {
+            'run_id': self.run_id,
+            'started_at': self.run_started_at,
+            'elapsed_s': round(time.time() - self.run_started_at, 3) if self.run_started_at else None,
+            'stages': stages,
+            'queue_depth': queue_depth,
+        }
+
+    def publish(self):
+        """将当前快照写入 Redis，供其他进程（如 Web 进程的指标接口）读取"""
+        try:
+            redis_service.redis_client.set(CURRENT_RUN_KEY, json.dumps(self.snapshot(), ensure_ascii=False), ex=24 * 3600)
+        except (RedisError, AttributeError) as e:
+            logger.warning(f"[SyncMetrics] 发布同步指标失败: {e}")
+
+    @staticmethod
+    def published():
+        """读取最近一次发布的快照（可能来自其他进程）"""
+        try:
+            data = redis_service.redis_client.get(CURRENT_RUN_KEY)
+        except (RedisError, AttributeError) as e:
+            logger.warning(f"[SyncMetrics] 读取同步指标失败: {e}")
+            return None
+        return json.loads(data) if data else None
+
+    @staticmethod
+    def history(limit=RUN_HISTORY_SIZE):
+        """最近若干轮同步的汇总（新的在前）"""
+        try:
+            return [json.loads(item) for item in redis_service.redis_client.lrange(RUN_HISTORY_KEY, 0, limit - 1)]
+        except (RedisError, AttributeError) as e:
+            logger.warning(f"[SyncMetrics] 读取同步汇总失败: {e}")
+            return []
+
+    def _emit(self, event, data):
+        """以 JSON 行写入指标日志"""
+        record = dict(data, event=event, run_id=self.run_id, ts=time.time())
+        path = None
+        if has_app_context():
+            path = current_app.config.get('SYNC_METRICS_LOG_FILE')
+        path = path or os.path.join(os.getcwd(), 'logs', 'sync_metrics.jsonl')
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except OSError as e:
+            logger.warning(f"[SyncMetrics] 写入指标日志失败: {e}")
+
+
+# 创建全局指标收集器
+sync_metrics = SyncMetrics()
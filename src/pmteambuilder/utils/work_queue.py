@@ -0,0 +1,213 @@
+"""
+基于 Redis 的分布式任务队列
+
+任务以 Redis 列表排队，被认领的任务进入以截止时间为分数的有序集合（可见性超时），处理期间由 heartbeat() 定期延长；
+worker 处理完成后确认（ack）；失败的任务按指数退避进入延迟集合，到期后排到队尾重试，超过最大尝试次数的任务进入死信列表。
+超时未确认的任务会被放回队列，由其他 worker 重新认领（至少一次投递，任务需幂等）。
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from redis.exceptions import RedisError
+
+from .redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+# 仅当任务ID首次出现时才入队，避免重复排队
+_ENQUEUE_SCRIPT = """
+local added = 0
+for i = 1, #ARGV, 2 do
+    if redis.call('HSETNX', KEYS[1], ARGV[i], ARGV[i + 1]) == 1 then
+        redis.call('LPUSH', KEYS[2], ARGV[i])
+        added = added + 1
+    end
+end
+redis.call('HINCRBY', KEYS[3], 'enqueued', added)
+return added
+"""
+
+# 超时重新入队后又被原 worker 确认的任务，任务数据已删除，队列中只剩残留ID，跳过
+_CLAIM_SCRIPT = """
+while true do
+    local task_id = redis.call('RPOP', KEYS[1])
+    if not task_id then
+        return nil
+    end
+    local payload = redis.call('HGET', KEYS[3], task_id)
+    if payload then
+        redis.call('ZADD', KEYS[2], ARGV[1], task_id)
+        local attempts = redis.call('HINCRBY', KEYS[4], task_id, 1)
+        return {task_id, payload, attempts}
+    end
+end
+"""
+
+_REQUEUE_EXPIRED_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+for _, task_id in ipairs(expired) do
+    redis.call('ZREM', KEYS[1], task_id)
+    redis.call('RPUSH', KEYS[2], task_id)
+end
+if #expired > 0 then
+    redis.call('HINCRBY', KEYS[3], 'expired', #expired)
+end
+local due = redis.call('ZRANGEBYSCORE', KEYS[4], '-inf', ARGV[1])
+for _, task_id in ipairs(due) do
+    redis.call('ZREM', KEYS[4], task_id)
+    redis.call('LPUSH', KEYS[2], task_id)
+end
+return #expired
+"""
+
+
+class ClaimedTask:
+    """被认领的任务"""
+    __slots__ = ('task_id', 'payload', 'attempts')
+
+    def __init__(self, task_id, payload, attempts):
+        self.task_id = task_id
+        self.payload = payload
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"<ClaimedTask {self.task_id} attempts={self.attempts}>"
+
+
+class RedisWorkQueue:
+    """Redis 任务队列"""
+
+    def __init__(self, name, visibility_timeout=600, max_attempts=3, retry_backoff=5.0, redis_client=None):
+        self.name = name
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self._redis_client = redis_client
+        prefix = f"queue:{name}"
+        self.pending_key = f"{prefix}:pending"
+        self.processing_key = f"{prefix}:processing"
+        self.delayed_key = f"{prefix}:delayed"
+        self.tasks_key = f"{prefix}:tasks"
+        self.attempts_key = f"{prefix}:attempts"
+        self.dead_key = f"{prefix}:dead"
+        self.stats_key = f"{prefix}:stats"
+
+    @property
+    def redis(self):
+        return self._redis_client or redis_service.redis_client
+
+    def enqueue(self, tasks):
+        """批量入队，tasks 为 (task_id, payload) 列表，返回新入队的数量"""
+        total = 0
+        script = self.redis.register_script(_ENQUEUE_SCRIPT)
+        tasks = list(tasks)
+        for i in range(0, len(tasks), 500):
+            args = []
+            for task_id, payload in tasks[i:i + 500]:
+                args.extend([str(task_id), json.dumps(payload)])
+            total += script(keys=[self.tasks_key, self.pending_key, self.stats_key], args=args)
+        return total
+
+    def claim(self):
+        """认领一个任务，队列为空时返回 None；已被确认（任务数据已删除）的残留ID会被跳过"""
+        script = self.redis.register_script(_CLAIM_SCRIPT)
+        deadline = time.time() + self.visibility_timeout
+        result = script(keys=[self.pending_key, self.processing_key, self.tasks_key, self.attempts_key], args=[deadline])
+        if not result:
+            return None
+        task_id, payload, attempts = result
+        task_id = task_id.decode('utf-8') if isinstance(task_id, bytes) else task_id
+        return ClaimedTask(task_id, json.loads(payload) if payload else None, int(attempts))
+
+    def extend(self, task):
+        """延长任务的可见性超时（由 heartbeat() 在处理期间定期调用）"""
+        self.redis.zadd(self.processing_key, {task.task_id: time.time() + self.visibility_timeout}, xx=True)
+
+    @contextmanager
+    def heartbeat(self, task, interval=None):
+        """处理任务期间在后台线程中每隔 interval 秒（默认可见性超时的 1/3）延长一次，长任务不会被重新入队、被其他 worker 重复处理"""
+        interval = interval or max(self.visibility_timeout / 3, 1)
+        stopped = threading.Event()
+
+        def beat():
+            while not stopped.wait(interval):
+                try:
+                    self.extend(task)
+                except RedisError as e:
+                    logger.warning(f"[WorkQueue:{self.name}] 延长任务 {task.task_id} 的可见性超时失败: {e}")
+
+        thread = threading.Thread(target=beat, name=f'work-queue-heartbeat-{self.name}', daemon=True)
+        thread.start()
+        try:
+            yield task
+        finally:
+            stopped.set()
+            thread.join()
+
+    def ack(self, task):
+        """确认任务完成"""
+        pipe = self.redis.pipeline()
+        pipe.zrem(self.processing_key, task.task_id)
+        pipe.hdel(self.tasks_key, task.task_id)
+        pipe.hdel(self.attempts_key, task.task_id)
+        pipe.hincrby(self.stats_key, 'acked', 1)
+        pipe.execute()
+
+    def nack(self, task, error=None):
+        """
+        任务失败：未达最大尝试次数时按 retry_backoff * 2^(attempts-1) 秒退避后排到队尾重试（由 requeue_expired 放回），
+        否则移入死信列表。返回 True 表示将重试
+        """
+        retry = task.attempts < self.max_attempts
+        pipe = self.redis.pipeline()
+        pipe.zrem(self.processing_key, task.task_id)
+        if retry:
+            delay = min(self.retry_backoff * 2 ** (task.attempts - 1), self.visibility_timeout)
+            pipe.zadd(self.delayed_key, {task.task_id: time.time() + delay})
+            pipe.hincrby(self.stats_key, 'retried', 1)
+        else:
+            pipe.lpush(self.dead_key, json.dumps({'task_id': task.task_id, 'payload': task.payload, 'error': str(error) if error else None}))
+            pipe.hdel(self.tasks_key, task.task_id)
+            pipe.hdel(self.attempts_key, task.task_id)
+            pipe.hincrby(self.stats_key, 'dead', 1)
+        pipe.execute()
+        return retry
+
+    def requeue_expired(self):
+        """将可见性超时的任务放回队列（返回数量），同时把退避到期的失败任务排到队尾"""
+        script = self.redis.register_script(_REQUEUE_EXPIRED_SCRIPT)
+        return script(keys=[self.processing_key, self.pending_key, self.stats_key, self.delayed_key], args=[time.time()])
+
+    def progress(self):
+        """队列进度汇总"""
+        pipe = self.redis.pipeline()
+        pipe.llen(self.pending_key)
+        pipe.zcard(self.processing_key)
+        pipe.zcard(self.delayed_key)
+        pipe.llen(self.dead_key)
+        pipe.hgetall(self.stats_key)
+        pending, processing, delayed, dead, stats = pipe.execute()
+        stats = {k.decode('utf-8') if isinstance(k, bytes) else k: int(v) for k, v in stats.items()}
+        return {
+            'queue': self.name,
+            'pending': pending,
+            'processing': processing,
+            'delayed': delayed,
+            'dead': dead,
+            'enqueued': stats.get('enqueued', 0),
+            'acked': stats.get('acked', 0),
+            'retried': stats.get('retried', 0),
+            'expired': stats.get('expired', 0),
+        }
+
+    def is_drained(self):
+        """队列中既没有待处理、处理中的任务，也没有等待重试的任务"""
+        progress = self.progress()
+        return progress['pending'] == 0 and progress['processing'] == 0 and progress['delayed'] == 0
+
+    def purge(self):
+        """清空队列及统计"""
+        self.redis.delete(self.pending_key, self.processing_key, self.delayed_key, self.tasks_key, self.attempts_key, self.dead_key, self.stats_key)
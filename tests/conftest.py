@@ -0,0 +1,28 @@
+import pytest
+from flask import Flask
+
+from pmteambuilder.models import db
+
+
+@pytest.fixture
+def app():
+    """使用内存 SQLite 的最小应用，测试期间保持应用上下文"""
+    app = Flask(__name__)
+    app.config.update(TESTING=True, SQLALCHEMY_DATABASE_URI='sqlite://')
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    """用 fakeredis 替换全局 redis_service 的客户端"""
+    import fakeredis
+    from pmteambuilder.utils.redis_service import redis_service
+
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(redis_service, 'redis_client', client)
+    return client
@@ -0,0 +1,75 @@
+from contextlib import contextmanager
+
+import pytest
+
+from pmteambuilder.models import db, Ability
+from pmteambuilder.models.sync_fingerprint import SyncFingerprint
+from pmteambuilder.services import pokemon_service
+from pmteambuilder.services.pokemon_service import PokemonDataService
+
+
+def _detail(ability_id, name, generation):
+    return {
+        'id': ability_id,
+        'name': name,
+        'names': [{'name': f'特性{ability_id}', 'language': {'name': 'zh-Hans'}}],
+        'flavor_text_entries': [{'flavor_text': f'说明{ability_id}', 'language': {'name': 'zh-Hans'}}],
+        'effect_entries': [{'effect': f'effect {ability_id}', 'language': {'name': 'en'}}],
+        'generation': {'name': generation},
+    }
+
+
+class _Fetcher:
+    """按 URL 返回详情；不在 details 中的 URL 视为拉取失败，与 iter_json 一样跳过"""
+
+    def __init__(self, details):
+        self.details = details
+        self.requested = []
+
+    def iter_json(self, urls):
+        for url in urls:
+            self.requested.append(url)
+            ability_id = int(url.rstrip('/').rsplit('/', 1)[1])
+            if ability_id in self.details:
+                yield self.details[ability_id]
+
+
+@pytest.fixture
+def fetcher(app, redis_client, monkeypatch):
+    fetcher = _Fetcher({})
+
+    @contextmanager
+    def from_config():
+        yield fetcher
+
+    monkeypatch.setattr(pokemon_service.AsyncPokeAPIFetcher, 'from_config', staticmethod(from_config))
+    db.session.add_all([
+        Ability(id=1, name='stench'),
+        Ability(id=2, name='drizzle'),
+        Ability(id=9, name='static', generation='generation-iii'),
+    ])
+    db.session.commit()
+    return fetcher
+
+
+def test_failed_fetches_remain_pending(fetcher):
+    fetcher.details = {1: _detail(1, 'stench', 'generation-iii')}
+    assert PokemonDataService.fetch_and_sync_ability_generations() == 1
+    assert {ab.id: ab.generation for ab in Ability.query} == {1: 'generation-iii', 2: None, 9: 'generation-iii'}
+    assert fetcher.requested[-2:] == [f"{PokemonDataService.POKEAPI_BASE_URL}/ability/1", f"{PokemonDataService.POKEAPI_BASE_URL}/ability/2"]
+
+    fetcher.details = {2: _detail(2, 'drizzle', 'generation-iii')}
+    fetcher.requested = []
+    assert PokemonDataService.fetch_and_sync_ability_generations() == 0
+    assert fetcher.requested == [f"{PokemonDataService.POKEAPI_BASE_URL}/ability/2"]
+    assert PokemonDataService.fetch_and_sync_ability_generations() == 0
+
+
+def test_backfill_records_fingerprints(fetcher):
+    fetcher.details = {1: _detail(1, 'stench', 'generation-iii'), 2: _detail(2, 'drizzle', 'generation-iii')}
+    PokemonDataService.fetch_and_sync_ability_generations()
+    assert db.session.get(Ability, 1).name_zh_hans == '特性1'
+    assert {fp.resource_id for fp in SyncFingerprint.query.filter_by(entity=Ability.__tablename__)} == {'1', '2'}
+    # 之后的完整特性同步按指纹跳过未变化的行
+    result = PokemonDataService.sync_abilities_to_db([PokemonDataService._parse_ability_detail(fetcher.details[1])])
+    assert (result.inserted, result.updated, result.unchanged) == (0, 0, 1)
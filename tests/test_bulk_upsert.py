@@ -0,0 +1,78 @@
+from pmteambuilder.models import db, SyncCheckpoint, Type
+from pmteambuilder.utils.bulk_upsert import bulk_upsert
+
+
+def _types():
+    return {t.id: (t.name, t.name_zh_hans) for t in Type.query.order_by(Type.id)}
+
+
+def test_inserts_new_rows(app):
+    result = bulk_upsert(Type, [
+        {'id': 1, 'name': 'normal', 'name_zh_hans': '一般'},
+        {'id': 2, 'name': 'fire', 'name_zh_hans': '火'},
+    ])
+    db.session.commit()
+    assert (result.inserted, result.updated, result.unchanged) == (2, 0, 0)
+    assert result.changed_keys == [1, 2]
+    assert _types() == {1: ('normal', '一般'), 2: ('fire', '火')}
+
+
+def test_counts_updated_and_unchanged_rows(app):
+    bulk_upsert(Type, [
+        {'id': 1, 'name': 'normal', 'name_zh_hans': '一般'},
+        {'id': 2, 'name': 'fire', 'name_zh_hans': None},
+    ])
+    db.session.commit()
+    result = bulk_upsert(Type, [
+        {'id': 1, 'name': 'normal', 'name_zh_hans': '一般'},
+        {'id': 2, 'name': 'fire', 'name_zh_hans': '火'},
+        {'id': 3, 'name': 'water', 'name_zh_hans': '水'},
+    ])
+    db.session.commit()
+    assert result.to_dict() == {'inserted': 1, 'updated': 1, 'unchanged': 1}
+    assert result.total == 3
+    assert sorted(result.changed_keys) == [2, 3]
+    assert _types()[2] == ('fire', '火')
+
+
+def test_duplicate_keys_in_batch_keep_last_row(app):
+    result = bulk_upsert(Type, [
+        {'id': 1, 'name': 'normal', 'name_zh_hans': 'x'},
+        {'id': 1, 'name': 'normal', 'name_zh_hans': '一般'},
+    ])
+    db.session.commit()
+    assert result.inserted == 1
+    assert _types() == {1: ('normal', '一般')}
+
+
+def test_partial_rows_leave_other_columns_untouched(app):
+    bulk_upsert(Type, [{'id': 1, 'name': 'normal', 'name_zh_hans': '一般'}])
+    db.session.commit()
+    result = bulk_upsert(Type, [{'id': 1, 'name': 'normal-type'}])
+    db.session.commit()
+    assert result.updated == 1
+    assert _types() == {1: ('normal-type', '一般')}
+
+
+def test_chunks_respect_chunk_size(app):
+    rows = [{'id': i, 'name': f'type-{i}'} for i in range(1, 26)]
+    result = bulk_upsert(Type, rows, chunk_size=7)
+    db.session.commit()
+    assert result.inserted == 25
+    assert Type.query.count() == 25
+
+
+def test_composite_key(app):
+    key = ('entity', 'stage', 'resource_id')
+    rows = [{'entity': 'move', 'stage': 'sync', 'resource_id': str(i), 'status': 'done'} for i in (1, 2)]
+    assert bulk_upsert(SyncCheckpoint, rows, key=key).inserted == 2
+    db.session.commit()
+    rows[1]['status'] = 'failed'
+    result = bulk_upsert(SyncCheckpoint, rows, key=key)
+    db.session.commit()
+    assert result.to_dict() == {'inserted': 0, 'updated': 1, 'unchanged': 1}
+    assert result.changed_keys == [('move', 'sync', '2')]
+
+
+def test_empty_rows(app):
+    assert bulk_upsert(Type, []).total == 0
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from pmteambuilder.api.bundles import bundles_bp
+from pmteambuilder.services.reference_bundles import MANIFEST_NAME
+
+
+@pytest.fixture
+def client(app, tmp_path):
+    app.config.update(REFERENCE_BUNDLE_DIR=str(tmp_path), REFERENCE_BUNDLE_MANIFEST_MAX_AGE=30)
+    app.register_blueprint(bundles_bp, url_prefix='/api/bundles')
+    client = app.test_client()
+    client.root = tmp_path
+    return client
+
+
+def _write_manifest(root, version):
+    manifest = {'version': version, 'built_at': 0, 'bundles': {'all/zh': {'file': f'all-zh.{version:016x}.json'}}}
+    (root / MANIFEST_NAME).write_text(json.dumps(manifest))
+
+
+def test_missing_manifest(client):
+    response = client.get('/api/bundles/manifest')
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
+
+
+def test_etag_follows_manifest_content(client):
+    _write_manifest(client.root, 1)
+    response = client.get('/api/bundles/manifest')
+    assert response.status_code == 200
+    assert response.get_json()['base_url'] == '/api/bundles/files/'
+    assert response.headers['Cache-Control'] == 'public, max-age=30'
+    etag = response.headers['ETag']
+
+    assert client.get('/api/bundles/manifest', headers={'If-None-Match': etag}).status_code == 304
+
+    _write_manifest(client.root, 2)
+    response = client.get('/api/bundles/manifest', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['version'] == 2
@@ -0,0 +1,78 @@
+import json
+import zlib
+
+import pytest
+
+from pmteambuilder.utils.cache_codec import (
+    COMPRESSION_NONE, COMPRESSION_ZLIB, MAGIC, SERIALIZER_JSON, SERIALIZER_MSGPACK, CacheCodec, CacheCodecError,
+)
+
+VALUE = {'items': [{'id': 25, 'name': 'pikachu', 'name_zh': '皮卡丘', 'types': ['electric'], 'stats': [35, 55.5, None, True]}]}
+LARGE_VALUE = {'moves': [{'id': i, 'name': f'move-{i}', 'desc': '招式说明' * 4} for i in range(200)]}
+
+
+def _header(raw):
+    assert raw[0] == MAGIC
+    return raw[1] >> 4, raw[1] & 0x0F
+
+
+@pytest.mark.parametrize('serializer, serializer_id', [('msgpack', SERIALIZER_MSGPACK), ('json', SERIALIZER_JSON)])
+def test_round_trip(serializer, serializer_id):
+    raw = CacheCodec(serializer=serializer, compress_threshold=-1).encode(VALUE)
+    assert _header(raw) == (serializer_id, COMPRESSION_NONE)
+    assert CacheCodec.decode(raw) == VALUE
+
+
+@pytest.mark.parametrize('serializer', ['msgpack', 'json'])
+def test_compresses_above_threshold(serializer):
+    codec = CacheCodec(serializer=serializer, compress_threshold=1024)
+    raw = codec.encode(LARGE_VALUE)
+    assert _header(raw)[1] == COMPRESSION_ZLIB
+    assert CacheCodec.decode(raw) == LARGE_VALUE
+
+    small = codec.encode(VALUE)
+    assert _header(small)[1] == COMPRESSION_NONE
+    assert CacheCodec.decode(small) == VALUE
+
+
+def test_skips_compression_when_it_does_not_help():
+    raw = CacheCodec(serializer='json', compress_threshold=0).encode('a')
+    assert _header(raw) == (SERIALIZER_JSON, COMPRESSION_NONE)
+    assert CacheCodec.decode(raw) == 'a'
+
+
+@pytest.mark.parametrize('legacy', [
+    json.dumps(VALUE).encode('utf-8'),
+    json.dumps(VALUE, ensure_ascii=False),
+    b'1',
+    b'[]',
+])
+def test_decodes_legacy_json_without_header(legacy):
+    assert CacheCodec.decode(legacy) == json.loads(legacy)
+
+
+def test_none_passes_through():
+    assert CacheCodec.decode(None) is None
+
+
+def test_serializer_follows_app_config(app):
+    app.config['CACHE_CODEC'] = 'json'
+    with app.app_context():
+        raw = CacheCodec().encode(VALUE)
+    assert _header(raw)[0] == SERIALIZER_JSON
+
+
+def test_unknown_serializer_name():
+    with pytest.raises(CacheCodecError):
+        CacheCodec(serializer='pickle').encode(VALUE)
+
+
+@pytest.mark.parametrize('raw', [
+    bytes((MAGIC, SERIALIZER_JSON << 4 | 0x0F)) + b'{}',
+    bytes((MAGIC, 0x0F << 4 | COMPRESSION_NONE)) + b'{}',
+    bytes((MAGIC, SERIALIZER_JSON << 4 | COMPRESSION_ZLIB)) + b'not zlib',
+    bytes((MAGIC, 0x0F << 4 | COMPRESSION_ZLIB)) + zlib.compress(b'{}'),
+])
+def test_unknown_format_raises(raw):
+    with pytest.raises(CacheCodecError):
+        CacheCodec.decode(raw)
@@ -0,0 +1,128 @@
+from types import SimpleNamespace
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError, RedisError, ResponseError, TimeoutError as RedisTimeoutError
+
+from pmteambuilder.utils import circuit_breaker as circuit_breaker_module
+from pmteambuilder.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """替换模块内的 time，由测试推进时间"""
+    now = SimpleNamespace(value=1000.0)
+    fake_time = SimpleNamespace(monotonic=lambda: now.value, perf_counter=lambda: now.value)
+    monkeypatch.setattr(circuit_breaker_module, 'time', fake_time)
+    return now
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(name='test', window=10, min_calls=4, failure_rate=0.5, slow_call_seconds=0.25, open_seconds=5.0)
+
+
+def _fail(exc=RedisConnectionError):
+    def func():
+        raise exc('boom')
+    return func
+
+
+def _trip(breaker):
+    for _ in range(breaker.min_calls):
+        with pytest.raises(RedisConnectionError):
+            breaker.call(_fail())
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_stays_closed_below_min_calls_and_rate(breaker):
+    for _ in range(3):
+        with pytest.raises(RedisConnectionError):
+            breaker.call(_fail())
+    assert breaker.state == CircuitBreaker.CLOSED
+    for _ in range(4):
+        assert breaker.call(lambda: 'ok') == 'ok'
+    with pytest.raises(RedisTimeoutError):
+        breaker.call(_fail(RedisTimeoutError))
+    # 8 次中 4 次失败，达到 0.5
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_opens_after_failure_rate_and_rejects(breaker):
+    _trip(breaker)
+    called = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(called.append, 1)
+    assert called == []
+    assert isinstance(CircuitOpenError('x'), RedisError)
+    assert breaker.stats()['trips'] == 1
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_half_open_allows_single_probe(breaker, clock):
+    _trip(breaker)
+    clock.value += 5.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    assert breaker.allow() is False
+
+
+def test_probe_success_closes_and_clears_window(breaker, clock):
+    _trip(breaker)
+    clock.value += 5.0
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()['recent_calls'] == 0
+
+
+def test_probe_failure_reopens(breaker, clock):
+    _trip(breaker)
+    clock.value += 5.0
+    with pytest.raises(RedisConnectionError):
+        breaker.call(_fail())
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()['trips'] == 2
+    clock.value += 4.9
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: 'ok')
+
+
+def test_slow_call_counts_as_failure(breaker, clock):
+    def slow():
+        clock.value += 0.3
+        return 'ok'
+
+    for _ in range(3):
+        assert breaker.call(slow) == 'ok'
+    assert breaker.stats()['recent_failures'] == 3
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.call(slow)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_slow_probe_reopens(breaker, clock):
+    _trip(breaker)
+    clock.value += 5.0
+    assert breaker.allow() is True
+    breaker.record_success(0.3)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_command_error_counts_as_success(breaker):
+    for _ in range(6):
+        with pytest.raises(ResponseError):
+            breaker.call(_fail(ResponseError))
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats() == {'state': 'closed', 'recent_calls': 6, 'recent_failures': 0, 'trips': 0, 'rejected': 0}
+
+
+def test_caller_exception_releases_probe(breaker, clock):
+    _trip(breaker)
+    clock.value += 5.0
+    with pytest.raises(ValueError):
+        breaker.call(_fail(ValueError))
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.stats()['recent_calls'] == breaker.min_calls
+    # 探测名额已归还，下一次调用可以继续探测
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,57 @@
+import pytest
+
+from pmteambuilder.utils.dataset_cache import DATASET_VERSION_KEY, LEASE_PREFIX, DatasetCache
+
+
+@pytest.fixture
+def cache(app, redis_client):
+    app.config.update(DATASET_VERSION_CHECK_INTERVAL=0, NEAR_CACHE_ENABLED=False, DATASET_CACHE_FILL_WAIT=0.2)
+    redis_client.set(DATASET_VERSION_KEY, 2)
+    cache = DatasetCache()
+    cache.set('moves', ['old'])
+    redis_client.set(DATASET_VERSION_KEY, 3)
+    # 其他进程持有版本 3 的填充租约
+    redis_client.set(f"{LEASE_PREFIX}:{cache.key('moves')}", 'other')
+    return cache
+
+
+def test_serves_previous_version_while_another_process_fills(cache):
+    assert cache.get_or_fill('moves', lambda: ['new']) == ['old']
+
+
+def test_pinned_version_never_serves_previous_version(cache):
+    cache.pin(3)
+    try:
+        assert cache.get_or_fill('moves', lambda: ['new']) == ['new']
+    finally:
+        cache.unpin()
+    assert cache.get('moves') == ['new']
+
+
+def test_bump_notifies_other_processes(app, redis_client, monkeypatch):
+    from pmteambuilder.utils import dataset_cache as dataset_cache_module
+    from pmteambuilder.utils.near_cache import INVALIDATION_CHANNEL, NearCache
+
+    app.config.update(DATASET_VERSION_CHECK_INTERVAL=3600)
+    local, remote = NearCache(), NearCache()
+    monkeypatch.setattr(dataset_cache_module, 'near_cache', local)
+    monkeypatch.setattr(DatasetCache, 'collect_garbage', staticmethod(lambda version: 0))
+    other = DatasetCache()
+    remote.add_version_listener(other.on_remote_version)
+    redis_client.set(DATASET_VERSION_KEY, 1)
+    assert other.version() == 1
+
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(INVALIDATION_CHANNEL)
+    assert DatasetCache().bump() == 2
+    message = None
+    for _ in range(3):
+        message = message or pubsub.get_message(timeout=1.0)
+    # 另一个进程的监听线程收到消息：不等检查间隔，立即读取新版本号
+    remote._handle_message(message['data'])
+    assert other.version() == 2
+    # 发出消息的进程忽略自己的消息
+    received = []
+    local.add_version_listener(received.append)
+    local._handle_message(message['data'])
+    assert received == []
@@ -0,0 +1,85 @@
+import pytest
+from flask import g, jsonify, request
+
+from pmteambuilder.utils.dataset_cache import DATASET_VERSION_KEY, dataset_cache
+from pmteambuilder.utils.decorators import reference_cache
+
+
+@pytest.fixture
+def client(app, redis_client, monkeypatch):
+    """快照关闭、每次都从 Redis 读取版本号的应用；calls 记录视图实际执行时看到的版本号"""
+    app.config.update(REFERENCE_SNAPSHOT_ENABLED=False, DATASET_VERSION_CHECK_INTERVAL=0,
+                      REFERENCE_CACHE_MAX_AGE=60, REFERENCE_CACHE_STALE_WHILE_REVALIDATE=600)
+    monkeypatch.setattr(dataset_cache, '_version', None)
+    monkeypatch.setattr(dataset_cache, '_checked_at', 0.0)
+    redis_client.set(DATASET_VERSION_KEY, 7)
+    calls = []
+
+    @app.route('/types')
+    @reference_cache
+    def types():
+        calls.append(dataset_cache.version())
+        if request.args.get('missing'):
+            return jsonify({'error': 'not found'}), 404
+        return jsonify({'version': dataset_cache.version()})
+
+    client = app.test_client()
+    client.calls = calls
+    return client
+
+
+def test_sets_etag_and_cache_control(client):
+    response = client.get('/types')
+    assert response.status_code == 200
+    assert response.headers['ETag'].startswith('"v7-')
+    assert response.headers['Cache-Control'] == 'public, max-age=60, stale-while-revalidate=600'
+
+
+def test_matching_etag_returns_304_without_running_view(client):
+    etag = client.get('/types').headers['ETag']
+    assert len(client.calls) == 1
+    response = client.get('/types', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+    assert 'max-age=60' in response.headers['Cache-Control']
+    assert len(client.calls) == 1
+
+
+def test_etag_depends_on_query_but_not_its_order(client):
+    plain = client.get('/types').headers['ETag']
+    first = client.get('/types?a=1&b=2').headers['ETag']
+    assert first != plain
+    assert client.get('/types?b=2&a=1').headers['ETag'] == first
+
+
+def test_new_dataset_version_changes_etag(client, redis_client):
+    old = client.get('/types').headers['ETag']
+    redis_client.incr(DATASET_VERSION_KEY)
+    response = client.get('/types', headers={'If-None-Match': old})
+    assert response.status_code == 200
+    assert response.headers['ETag'].startswith('"v8-')
+    assert response.get_json() == {'version': 8}
+
+
+def test_error_responses_are_not_cached(client):
+    response = client.get('/types?missing=1')
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
+    assert 'Cache-Control' not in response.headers
+
+
+def test_view_reads_pinned_version(client, redis_client, monkeypatch):
+    @reference_cache
+    def bump_during_view():
+        # 视图执行期间版本号递增，视图与 ETag 仍使用请求开始时固定的版本
+        redis_client.incr(DATASET_VERSION_KEY)
+        return jsonify({'version': dataset_cache.version()})
+
+    monkeypatch.setitem(client.application.view_functions, 'types', bump_during_view)
+    response = client.get('/types')
+    assert response.headers['ETag'].startswith('"v7-')
+    assert response.get_json() == {'version': 7}
+    # 请求结束后解除固定
+    assert 'dataset_version' not in g
+    assert dataset_cache.version() == 8
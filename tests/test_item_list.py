@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+
+from pmteambuilder.models import db, Generation, Item
+from pmteambuilder.services.pokemon_service import PokemonDataService
+from pmteambuilder.services.reference_snapshot import ItemRecord
+
+ITEMS = [
+    (1, 'leftovers', 'held-items', 'generation-ii'),
+    (2, 'life-orb', 'held-items', 'generation-iv'),
+    (3, 'choice-scarf', 'choice', 'generation-iv'),
+    (4, 'mystery-item', 'held-items', None),
+    (5, 'poke-ball', 'standard-balls', 'generation-i'),
+]
+GENERATIONS = [(1, 'generation-i'), (2, 'generation-ii'), (3, 'generation-iii'), (4, 'generation-iv')]
+
+
+def _ids(items):
+    return [item['id'] for item in items]
+
+
+@pytest.fixture
+def snapshot():
+    return SimpleNamespace(
+        items={i: ItemRecord(i, name, None, category, None, None, None, generation) for i, name, category, generation in ITEMS},
+        generations={gen_id: SimpleNamespace(id=gen_id, name=name) for gen_id, name in GENERATIONS},
+    )
+
+
+@pytest.fixture
+def database(app, redis_client):
+    app.config.update(REFERENCE_SNAPSHOT_ENABLED=False, NEAR_CACHE_ENABLED=False)
+    db.session.add_all(Generation(id=gen_id, name=name) for gen_id, name in GENERATIONS)
+    db.session.add_all(Item(id=i, name=name, category=category, generation=generation) for i, name, category, generation in ITEMS)
+    db.session.commit()
+
+
+@pytest.mark.parametrize('generation_id, expected', [
+    (None, [1, 2, 3, 4]),
+    (2, [1, 4]),
+    (3, [1, 4]),
+    (4, [1, 2, 3, 4]),
+])
+def test_snapshot_items_introduced_by_generation(snapshot, generation_id, expected):
+    assert _ids(PokemonDataService._item_list_from_snapshot(snapshot, 10000, 0, generation_id)) == expected
+
+
+def test_snapshot_categories_and_paging(snapshot):
+    assert _ids(PokemonDataService._item_list_from_snapshot(snapshot, 10000, 0, 4, ['choice'])) == [3]
+    assert _ids(PokemonDataService._item_list_from_snapshot(snapshot, 1, 1, 4)) == [2]
+
+
+@pytest.mark.parametrize('generation_id, expected', [
+    (None, [1, 2, 3, 4]),
+    (3, [1, 4]),
+])
+def test_database_items_introduced_by_generation(database, generation_id, expected):
+    assert _ids(PokemonDataService.get_item_list(generation_id=generation_id)) == expected
+
+
+def test_database_paging_applies_after_generation_filter(database):
+    assert _ids(PokemonDataService.get_item_list(limit=1, offset=1, generation_id=3)) == [4]
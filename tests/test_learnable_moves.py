@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import event
+
+from pmteambuilder.models import db, Move, PokemonMoveLearnset
+from pmteambuilder.services.pokemon_service import PokemonDataService
+
+
+@pytest.fixture
+def learnsets(app, redis_client):
+    app.config.update(REFERENCE_SNAPSHOT_ENABLED=False, NEAR_CACHE_ENABLED=False)
+    db.session.add_all([
+        Move(id=85, name='thunderbolt', name_zh_hans='十万伏特', type='electric', category='special', power=90, accuracy=100, pp=15, description_zh_hans='电击\n对手'),
+        Move(id=98, name='quick-attack', name_zh_hans='电光一闪', type='normal', category='physical', power=40, accuracy=100, pp=30),
+    ])
+    db.session.add_all([
+        PokemonMoveLearnset(pokemon_species_id=25, move_id=85, version_group_id=20, learn_method='machine'),
+        PokemonMoveLearnset(pokemon_species_id=25, move_id=98, version_group_id=20, learn_method='level-up', level=1),
+        PokemonMoveLearnset(pokemon_species_id=25, move_id=98, version_group_id=20, learn_method='egg'),
+        PokemonMoveLearnset(pokemon_species_id=26, move_id=85, version_group_id=20, learn_method='machine'),
+        PokemonMoveLearnset(pokemon_species_id=26, move_id=98, version_group_id=19, learn_method='machine'),
+    ])
+    db.session.commit()
+
+
+@pytest.fixture
+def statements():
+    executed = []
+    engine = db.engine
+
+    def listener(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', listener)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', listener)
+
+
+def test_batch_loads_missing_species_with_one_query(learnsets, statements):
+    results = PokemonDataService.get_pokemon_learnable_moves_batch([25, 26, 27, 25], 20)
+    assert sum('pokemon_move_learnset' in statement for statement in statements) == 1
+    assert {species_id: [move['id'] for move in moves] for species_id, moves in results.items()} == {25: [85, 98], 26: [85], 27: []}
+    assert results[25][0]['desc'] == '电击对手'
+
+    statements.clear()
+    assert PokemonDataService.get_pokemon_learnable_moves_batch([25, 26, 27], 20) == results
+    assert statements == []
+
+
+def test_single_species_matches_batch(learnsets):
+    assert PokemonDataService._load_learnable_moves(25, 20) == PokemonDataService.get_pokemon_learnable_moves_batch([25], 20)[25]
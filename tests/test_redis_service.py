@@ -0,0 +1,53 @@
+import fakeredis
+import pytest
+
+from pmteambuilder.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from pmteambuilder.utils.redis_service import _GuardedRedis
+
+SCRIPT = "return redis.call('INCR', KEYS[1])"
+
+
+@pytest.fixture
+def guarded():
+    server = fakeredis.FakeServer()
+    breaker = CircuitBreaker('test', min_calls=1, open_seconds=60)
+    return _GuardedRedis(fakeredis.FakeRedis(server=server), breaker, fakeredis.FakeRedis(server=server))
+
+
+def _open(breaker):
+    breaker.record_failure('test')
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_scripts_go_through_breaker(guarded):
+    script = guarded.register_script(SCRIPT)
+    assert script(keys=['n']) == 1
+    _open(guarded.breaker)
+    with pytest.raises(CircuitOpenError):
+        script(keys=['n'])
+
+
+def test_bulk_mode_bypasses_breaker(guarded):
+    script = guarded.register_script(SCRIPT)
+    _open(guarded.breaker)
+    with pytest.raises(CircuitOpenError):
+        guarded.set('k', 'v')
+    with guarded.bulk():
+        guarded.set('k', 'v')
+        assert script(keys=['n']) == 1
+        pipe = guarded.pipeline()
+        pipe.get('k')
+        assert pipe.execute() == [b'v']
+    assert guarded.bulk_mode is False
+    with pytest.raises(CircuitOpenError):
+        guarded.get('k')
+
+
+def test_slow_bulk_calls_do_not_open_breaker(guarded, monkeypatch):
+    monkeypatch.setattr(guarded.breaker, 'slow_call_seconds', -1)
+    with guarded.bulk():
+        for _ in range(5):
+            guarded.set('k', 'v')
+    assert guarded.breaker.state == CircuitBreaker.CLOSED
+    guarded.set('k', 'v')
+    assert guarded.breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import pytest
+
+from pmteambuilder.utils.response_cache import ResponseCache, ResponseCacheMiss
+
+URL = 'https://pokeapi.co/api/v2/pokemon/25/'
+BODY = json.dumps({'id': 25, 'name': 'pikachu'}).encode('utf-8')
+
+
+class FakeGet:
+    """记录收到的条件请求头，按预设返回 (status, body, headers)"""
+
+    def __init__(self, status=200, body=BODY, headers=None):
+        self.result = (status, body, headers or {'ETag': '"v1"'})
+        self.calls = []
+
+    def __call__(self, headers):
+        self.calls.append(headers)
+        return self.result
+
+
+def test_miss_fetches_and_stores(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    do_get = FakeGet()
+
+    assert cache.cached_fetch(URL, do_get) == {'id': 25, 'name': 'pikachu'}
+    assert do_get.calls == [None]
+    assert cache.lookup(URL)['etag'] == '"v1"'
+
+
+def test_fresh_hit_skips_request(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.store(URL, BODY)
+    do_get = FakeGet()
+
+    assert cache.cached_fetch(URL, do_get)['name'] == 'pikachu'
+    assert do_get.calls == []
+
+
+def test_stale_entry_revalidates_with_304(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=60)
+    cache.store(URL, BODY, etag='"v1"')
+    stale = dict(cache.lookup(URL), fetched_at=0)
+    cache._atomic_write(cache._index_path(URL), json.dumps(stale).encode('utf-8'))
+    do_get = FakeGet(status=304, body=None, headers={})
+
+    assert cache.cached_fetch(URL, do_get)['name'] == 'pikachu'
+    assert do_get.calls == [{'If-None-Match': '"v1"'}]
+    assert cache.is_fresh(cache.lookup(URL))
+
+
+def test_replay_miss_raises_without_request(tmp_path):
+    cache = ResponseCache(str(tmp_path), mode=ResponseCache.MODE_REPLAY)
+    do_get = FakeGet()
+
+    with pytest.raises(ResponseCacheMiss):
+        cache.cached_fetch(URL, do_get)
+    assert do_get.calls == []
+
+
+def test_async_path_shares_revalidation(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    do_get = FakeGet()
+
+    async def async_get(headers):
+        return do_get(headers)
+
+    assert asyncio.run(cache.cached_fetch_async(URL, async_get))['id'] == 25
+    assert asyncio.run(cache.cached_fetch_async(URL, async_get))['id'] == 25
+    assert do_get.calls == [None]
+
+
+def test_off_mode_always_requests(tmp_path):
+    cache = ResponseCache(str(tmp_path), mode=ResponseCache.MODE_OFF)
+    do_get = FakeGet()
+
+    cache.cached_fetch(URL, do_get)
+    cache.cached_fetch(URL, do_get)
+    assert do_get.calls == [None, None]
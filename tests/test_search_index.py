@@ -0,0 +1,144 @@
+from types import SimpleNamespace
+
+import pytest
+
+from pmteambuilder.services.reference_snapshot import AbilityRecord, ItemRecord, MoveRecord, PokemonRecord, SpeciesRecord
+from pmteambuilder.services.search_index import DeletionIndex, SearchIndex, build_documents, edit_distance, pinyin_tokens
+
+
+def _form(id, species_id, name, is_default, form_name_zh=None):
+    return PokemonRecord(id, species_id, name, None, form_name_zh, is_default, None, 'electric', None, 0, 0, 0, 0, 0, 0, None)
+
+
+@pytest.fixture(scope='module')
+def snapshot():
+    forms = [
+        _form(25, 25, 'pikachu', True),
+        _form(26, 26, 'raichu', True),
+        _form(10100, 26, 'raichu-alola', False, '阿罗拉的样子'),
+    ]
+    return SimpleNamespace(
+        species={25: SpeciesRecord(25, 'pikachu', '皮卡丘', 4), 26: SpeciesRecord(26, 'raichu', '雷丘', 4)},
+        pokemon={form.id: form for form in forms},
+        forms_by_species={25: (forms[0],), 26: (forms[1], forms[2])},
+        moves={85: MoveRecord(85, 'thunderbolt', '十万伏特', 'electric', 'special', 90, 100, 15, None, None, 'generation-i')},
+        abilities={9: AbilityRecord(9, 'static', '静电', None, None, 'generation-iii')},
+        items={236: ItemRecord(236, 'light-ball', '电气球', 'held-items', None, None, None, 'generation-ii')},
+    )
+
+
+@pytest.fixture(scope='module')
+def index(snapshot):
+    return SearchIndex(1, build_documents(snapshot))
+
+
+def _hits(results):
+    return [(r['kind'], r['id']) for r in results]
+
+
+def test_pinyin_tokens():
+    assert pinyin_tokens('皮卡丘') == ['pi', 'ka', 'qiu']
+    assert pinyin_tokens('多边兽2型') == ['duo', 'bian', 'shou', '2', 'xing']
+    assert pinyin_tokens('') == []
+
+
+def test_documents_cover_alternate_forms_only(index):
+    docs = {(doc.kind, doc.id): doc for doc in index.documents}
+    assert ('pokemon', 25) not in docs
+    alola = docs[('pokemon', 10100)]
+    assert alola.name_zh == '雷丘阿罗拉的样子'
+    assert (docs[('species', 25)].pinyin, docs[('species', 25)].initials) == ('pikaqiu', 'pkq')
+
+
+@pytest.mark.parametrize('query', ['pikachu', 'pika', 'Pika', '皮卡丘', '皮卡', '卡丘', 'pikaqiu', 'pikaq', 'pkq', 'pk'])
+def test_matches_english_chinese_and_pinyin(index, query):
+    assert _hits(index.search(query))[0] == ('species', 25)
+
+
+def test_english_names_ignore_hyphens_and_spaces(index):
+    assert _hits(index.search('Light Ball')) == [('item', 236)]
+    assert _hits(index.search('light-b')) == [('item', 236)]
+
+
+def test_exact_match_ranks_before_prefix(index):
+    results = index.search('lq')
+    assert _hits(results)[0] == ('species', 26)
+    assert results[0]['score'] > results[1]['score']
+    assert ('pokemon', 10100) in _hits(results)
+
+
+def test_kinds_filter(index):
+    assert _hits(index.search('dian', kinds=['item'])) == [('item', 236)]
+    assert _hits(index.search('jd', kinds=['ability'])) == [('ability', 9)]
+    assert index.search('pkq', kinds=['move']) == []
+
+
+def test_limit_and_empty_query(index):
+    assert len(index.search('l', limit=1)) == 1
+    assert index.search('   ') == []
+
+
+def test_match_pokemon_forms_expands_species(index, snapshot):
+    assert index.match_pokemon_forms('leiqiu', snapshot) == {26, 10100}
+    assert index.match_pokemon_forms('alola', snapshot) == {10100}
+
+
+def test_json_round_trip(index):
+    restored = SearchIndex.from_json(index.to_json())
+    assert restored.version == 1
+    assert restored.documents == index.documents
+    assert restored.search('pkq') == index.search('pkq')
+
+
+@pytest.mark.parametrize('a, b, distance', [
+    ('pikachu', 'pikachu', 0),
+    ('pikchu', 'pikachu', 1),
+    ('thunderblot', 'thunderbolt', 2),
+    ('', 'abc', 3),
+    ('kitten', 'sitting', 3),
+])
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b) == distance
+    assert edit_distance(b, a) == distance
+
+
+def test_deletion_index_respects_max_distance():
+    fuzzy = DeletionIndex([('pikachu', 1), ('raichu', 2), ('pichu', 3)], max_distance=2)
+    assert sorted(fuzzy.search('pikchu')) == [(1, 1), (1, 3)]
+    assert sorted(fuzzy.search('pkchu')) == [(1, 3), (2, 1)]
+    assert fuzzy.search('pkchu', max_distance=1) == [(1, 3)]
+    assert fuzzy.search('rachu', max_distance=1) == [(1, 2)]
+    assert fuzzy.search('zzzzzz') == []
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('pikchu', ('species', 25)),
+    ('thunderblot', ('move', 85)),
+    ('statc', ('ability', 9)),
+])
+def test_suggest_corrects_typos(index, query, expected):
+    assert index.search(query) == []
+    results = index.suggest(query)
+    assert _hits(results)[0] == expected
+
+
+def test_suggest_prefers_direct_matches_over_typos(index):
+    results = index.suggest('rai')
+    assert _hits(results)[0] == ('species', 26)
+    assert all(r['score'] > 0 for r in results)
+
+
+def test_suggest_fuzzy_is_english_only_and_needs_three_characters(index):
+    assert index.suggest('pk') == index.search('pk')
+    assert index.suggest('xq') == []
+    assert index.suggest('皮卡球') == []
+
+
+def test_suggest_fuzzy_respects_kinds(index):
+    assert index.suggest('thunderblot', kinds=['species']) == []
+    assert _hits(index.suggest('pikchu', kinds=['species'])) == [('species', 25)]
+
+
+def test_suggest_short_terms_allow_one_edit(index):
+    # 长度 ≤ 4 只容错 1：'sttc' 与 'static' 相差 2
+    assert index.suggest('sttc') == []
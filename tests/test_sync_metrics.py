@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+import pytest
+
+from pmteambuilder.utils.sync_metrics import PENDING_CHANGES_KEY, SyncMetrics
+
+
+@pytest.fixture
+def metrics(redis_client):
+    metrics = SyncMetrics()
+    metrics.start_run()
+    return metrics
+
+
+def test_record_changes_accumulates_across_processes(metrics, redis_client):
+    metrics.record_changes(0)
+    assert redis_client.get(PENDING_CHANGES_KEY) is None
+    metrics.record_changes(3)
+    # 其他 worker 进程的变更
+    redis_client.incrby(PENDING_CHANGES_KEY, 4)
+    assert metrics.pending_changes() == 7
+    assert metrics.snapshot()['stages'][0]['changed_rows'] == 3
+
+
+def test_clear_keeps_changes_recorded_during_publish(metrics, redis_client):
+    metrics.record_changes(5)
+    pending = metrics.pending_changes()
+    redis_client.incrby(PENDING_CHANGES_KEY, 2)
+    metrics.clear_pending_changes(pending)
+    assert metrics.pending_changes() == 2
+    metrics.clear_pending_changes(2)
+    assert redis_client.get(PENDING_CHANGES_KEY) is None
+    assert metrics.pending_changes() == 0
+
+
+def test_local_count_used_when_redis_lost_changes(metrics, redis_client):
+    metrics.record_changes(2)
+    redis_client.delete(PENDING_CHANGES_KEY)
+    assert metrics.pending_changes() == 2
+    metrics.clear_pending_changes(2)
+    assert metrics.pending_changes() == 0
+    assert redis_client.get(PENDING_CHANGES_KEY) is None
+
+
+def test_publish_only_when_changed(app, redis_client, monkeypatch):
+    from pmteambuilder.services import pokemon_service
+    from pmteambuilder.services.pokemon_service import PokemonDataService
+    from pmteambuilder.utils.sync_metrics import sync_metrics
+
+    published = []
+
+    def publish():
+        published.append('snapshot')
+        return SimpleNamespace(version=len(published))
+
+    monkeypatch.setattr(pokemon_service.reference_snapshot, 'publish', publish)
+    monkeypatch.setattr(pokemon_service.search_index, 'publish', lambda snapshot: None)
+    monkeypatch.setattr('pmteambuilder.services.reference_bundles.publish_reference_bundles', lambda snapshot: None)
+    monkeypatch.setattr(sync_metrics, '_local_changes', 0)
+
+    assert PokemonDataService.publish_reference_data() is False
+    assert published == []
+
+    sync_metrics.record_changes(1)
+    assert PokemonDataService.publish_reference_data() is True
+    assert published == ['snapshot']
+    assert PokemonDataService.publish_reference_data() is False
+    assert published == ['snapshot']
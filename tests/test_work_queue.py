@@ -0,0 +1,130 @@
+import time
+
+import pytest
+
+from pmteambuilder.utils.work_queue import RedisWorkQueue
+
+
+@pytest.fixture
+def queue(redis_client):
+    return RedisWorkQueue('test', visibility_timeout=60, max_attempts=3, retry_backoff=10)
+
+
+def _ids(queue):
+    claimed = []
+    while (task := queue.claim()) is not None:
+        claimed.append(task.task_id)
+        queue.ack(task)
+    return claimed
+
+
+def test_enqueue_is_idempotent_and_fifo(queue):
+    assert queue.enqueue([(i, {'species_id': i}) for i in (1, 2, 3)]) == 3
+    assert queue.enqueue([(2, {'species_id': 2}), (4, {'species_id': 4})]) == 1
+    assert _ids(queue) == ['1', '2', '3', '4']
+
+
+def test_claim_returns_payload_and_attempts(queue):
+    queue.enqueue([(1, {'species_id': 1})])
+    task = queue.claim()
+    assert (task.task_id, task.payload, task.attempts) == ('1', {'species_id': 1}, 1)
+    assert queue.progress()['processing'] == 1
+    assert queue.claim() is None
+
+
+def test_ack_completes_task(queue):
+    queue.enqueue([(1, {'species_id': 1})])
+    queue.ack(queue.claim())
+    progress = queue.progress()
+    assert (progress['pending'], progress['processing'], progress['acked']) == (0, 0, 1)
+    assert queue.is_drained()
+
+
+def test_nack_delays_retry_behind_other_tasks(queue):
+    queue.enqueue([(1, {}), (2, {})])
+    first = queue.claim()
+    assert queue.nack(first, error='429') is True
+    # 退避期间不会被立即重新认领，其余任务照常处理
+    assert queue.progress()['delayed'] == 1
+    assert not queue.is_drained()
+    assert _ids(queue) == ['2']
+
+
+def test_nack_retry_goes_to_tail_after_backoff(queue, redis_client):
+    queue.enqueue([(1, {}), (2, {})])
+    failed = queue.claim()
+    queue.nack(failed)
+    redis_client.zadd(queue.delayed_key, {failed.task_id: time.time() - 1})
+    queue.requeue_expired()
+    assert _ids(queue) == ['2', '1']
+
+
+def test_backoff_doubles_per_attempt_up_to_visibility_timeout(redis_client):
+    queue = RedisWorkQueue('test', visibility_timeout=30, max_attempts=5, retry_backoff=10)
+    queue.enqueue([(1, {})])
+    delays = []
+    for _ in range(3):
+        task = queue.claim()
+        started = time.time()
+        queue.nack(task)
+        delays.append(round(redis_client.zscore(queue.delayed_key, '1') - started))
+        redis_client.zadd(queue.delayed_key, {'1': 0})
+        queue.requeue_expired()
+    assert delays == [10, 20, 30]
+
+
+def test_nack_moves_task_to_dead_letter_after_max_attempts(queue, redis_client):
+    queue.enqueue([(1, {'species_id': 1})])
+    for attempt in range(1, 4):
+        task = queue.claim()
+        assert task.attempts == attempt
+        retried = queue.nack(task, error='boom')
+        if retried:
+            redis_client.zadd(queue.delayed_key, {'1': 0})
+            queue.requeue_expired()
+    assert retried is False
+    progress = queue.progress()
+    assert (progress['pending'], progress['delayed'], progress['dead']) == (0, 0, 1)
+    assert queue.is_drained()
+
+
+def test_requeue_expired_returns_timed_out_tasks(redis_client):
+    queue = RedisWorkQueue('test', visibility_timeout=0.05)
+    queue.enqueue([(1, {})])
+    task = queue.claim()
+    time.sleep(0.1)
+    assert queue.requeue_expired() == 1
+    again = queue.claim()
+    assert (again.task_id, again.attempts) == (task.task_id, 2)
+
+
+def test_claim_skips_task_acked_after_requeue(redis_client):
+    queue = RedisWorkQueue('test', visibility_timeout=0.05)
+    queue.enqueue([(1, {'species_id': 1}), (2, {'species_id': 2})])
+    slow = queue.claim()
+    time.sleep(0.1)
+    queue.requeue_expired()
+    # 原 worker 在重新入队之后才确认，队列中只剩残留ID
+    queue.ack(slow)
+    task = queue.claim()
+    assert (task.task_id, task.payload) == ('2', {'species_id': 2})
+    assert queue.claim() is None
+
+
+def test_heartbeat_keeps_long_task_claimed(redis_client):
+    queue = RedisWorkQueue('test', visibility_timeout=0.3)
+    queue.enqueue([(1, {})])
+    task = queue.claim()
+    with queue.heartbeat(task, interval=0.05):
+        time.sleep(0.5)
+        assert queue.requeue_expired() == 0
+    queue.ack(task)
+    assert queue.is_drained()
+
+
+def test_purge(queue):
+    queue.enqueue([(1, {}), (2, {})])
+    queue.nack(queue.claim())
+    queue.purge()
+    assert queue.progress()['pending'] == 0
+    assert queue.is_drained()